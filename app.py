@@ -5,7 +5,10 @@ import os
 import json
 import re
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, NavigableString, FeatureNotFound
+from bs4.element import PreformattedString
 from PyPDF2 import PdfReader
 from pptx import Presentation
 from docx import Document
@@ -13,6 +16,20 @@ from PIL import Image
 import pytesseract
 import io
 import time
+import zipfile
+import hashlib
+import math
+import random
+import html
+import functools
+from jinja2 import Environment
+from markupsafe import Markup
+from types import SimpleNamespace
+import sqlite3
+import threading
+from collections import OrderedDict
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, wait, as_completed, FIRST_COMPLETED
 
 # 설정
 st.set_page_config(page_title="CAMPER - Final Enhanced", page_icon="📧", layout="wide")
@@ -106,97 +123,187 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# OpenAI 클라이언트 초기화 및 연결 테스트
-def initialize_openai_client():
-    """OpenAI 클라이언트를 초기화하고 연결을 테스트합니다."""
+# CLI 등 Streamlit UI 없이 실행되는 경우 (edm_generator.py가 설정)
+HEADLESS = os.getenv("EDM_HEADLESS") == "1"
+
+def resolve_openai_api_key():
+    """API 키 확인 (우선순위: secrets.toml > 환경변수 > .env 파일)"""
+    api_key = None
+    
+    # 1. Streamlit secrets에서 확인 (secrets.toml이 없으면 건너뜀)
     try:
-        # API 키 확인 (우선순위: secrets.toml > 환경변수 > .env 파일)
-        api_key = None
-        
-        # 1. Streamlit secrets에서 확인
+        api_key = st.secrets["openai"]["api_key"]
+    except Exception:
+        pass
+    
+    # 2. 환경변수에서 확인
+    if not api_key:
+        api_key = os.getenv("OPENAI_API_KEY")
+    
+    # 3. .env 파일에서 확인
+    if not api_key:
         try:
-            api_key = st.secrets["openai"]["api_key"]
-        except KeyError:
-            pass
-        
-        # 2. 환경변수에서 확인
-        if not api_key:
+            from dotenv import load_dotenv
+            load_dotenv()
             api_key = os.getenv("OPENAI_API_KEY")
-        
-        # 3. .env 파일에서 확인
-        if not api_key:
+        except ImportError:
+            pass
+    
+    return api_key
+
+@st.cache_resource
+def create_openai_client(api_key):
+    """OpenAI 클라이언트 (API 키별로 프로세스당 1회 생성)"""
+    return OpenAI(api_key=api_key)
+
+# 연결 상태 확인 결과 유지 시간(초)
+OPENAI_HEALTH_TTL = int(os.getenv("EDM_OPENAI_HEALTH_TTL", "600"))
+
+class OpenAIHealth:
+    """OpenAI 연결 상태 (백그라운드 확인 + 실제 호출 결과로 갱신, TTL 캐시)"""
+
+    def __init__(self, ttl=OPENAI_HEALTH_TTL):
+        self.ttl = ttl
+        self.status = "unknown"  # unknown / checking / ok / error
+        self.message = ""
+        self.checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def mark(self, status, message=""):
+        with self._lock:
+            self.status = status
+            self.message = message
+            self.checked_at = time.time()
+
+    def ensure_fresh(self, client, model="gpt-4"):
+        """결과가 없거나 TTL이 지났으면 백그라운드 스레드에서 확인 (토큰을 쓰지 않는 모델 조회)"""
+        with self._lock:
+            if self.status == "checking":
+                return
+            max_age = self.ttl if self.status == "ok" else 30  # 오류 상태는 30초 후 재확인
+            if self.status != "unknown" and (time.time() - self.checked_at) <= max_age:
+                return
+            self.status = "checking"
+
+        def check():
             try:
-                from dotenv import load_dotenv
-                load_dotenv()
-                api_key = os.getenv("OPENAI_API_KEY")
-            except ImportError:
-                pass
-        
-        if not api_key:
-            st.error("❌ OpenAI API 키가 설정되지 않았습니다.")
-            st.markdown("""
-            **API 키 설정 방법:**
-            1. `.streamlit/secrets.toml` 파일에 설정 (권장)
-            2. 환경변수 `OPENAI_API_KEY` 설정
-            3. `.env` 파일에 설정
-            """)
-            st.stop()
-        
-        # OpenAI 클라이언트 초기화
-        client = OpenAI(api_key=api_key)
-        
-        # 연결 테스트
-        try:
-            test_response = client.chat.completions.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": "Hello"}],
-                max_tokens=5
-            )
-            return client
-            
-        except Exception as e:
-            error_msg = str(e)
-            if "insufficient_quota" in error_msg or "quota" in error_msg.lower():
-                st.error("❌ OpenAI API 사용량 한도를 초과했습니다. 새로운 API 키가 필요합니다.")
-            elif "invalid_api_key" in error_msg or "authentication" in error_msg.lower():
-                st.error("❌ OpenAI API 키가 유효하지 않습니다. API 키를 확인해주세요.")
-            elif "model_not_found" in error_msg:
-                st.error("❌ GPT-4 모델에 접근할 수 없습니다. API 키 권한을 확인해주세요.")
-            else:
-                st.error(f"❌ OpenAI API 연결 오류: {error_msg}")
-            
-            st.markdown("""
-            **문제 해결 방법:**
-            1. API 키가 유효한지 확인
-            2. API 사용량 한도 확인
-            3. GPT-4 모델 접근 권한 확인
-            4. 인터넷 연결 상태 확인
-            """)
-            st.stop()
-            
+                client.models.retrieve(model)
+                self.mark("ok")
+            except Exception as e:
+                self.mark("error", str(e))
+
+        threading.Thread(target=check, daemon=True).start()
+
+    def snapshot(self):
+        with self._lock:
+            return {"status": self.status, "message": self.message, "checked_at": self.checked_at}
+
+@st.cache_resource
+def get_openai_health():
+    """OpenAI 연결 상태 (프로세스당 1회 생성)"""
+    return OpenAIHealth()
+
+# OpenAI 클라이언트 초기화 (연결 테스트는 get_openai_health가 백그라운드에서 수행)
+def initialize_openai_client():
+    """OpenAI 클라이언트를 가져옵니다 (재실행 시에는 캐시된 클라이언트 재사용)."""
+    api_key = resolve_openai_api_key()
+    
+    if not api_key:
+        if HEADLESS:
+            raise RuntimeError("OpenAI API 키가 설정되지 않았습니다. OPENAI_API_KEY 환경변수를 설정해주세요.")
+        st.error("❌ OpenAI API 키가 설정되지 않았습니다.")
+        st.markdown("""
+        **API 키 설정 방법:**
+        1. `.streamlit/secrets.toml` 파일에 설정 (권장)
+        2. 환경변수 `OPENAI_API_KEY` 설정
+        3. `.env` 파일에 설정
+        """)
+        st.stop()
+    
+    try:
+        return create_openai_client(api_key)
     except Exception as e:
+        if HEADLESS:
+            raise
         st.error(f"❌ OpenAI 클라이언트 초기화 실패: {str(e)}")
         st.stop()
 
+def render_openai_status_badge():
+    """OpenAI 연결 상태 배지 표시 (확인이 필요하면 백그라운드에서 시작)"""
+    health = get_openai_health()
+    health.ensure_fresh(client, get_model_route("content_body")["model"])
+    state = health.snapshot()
+    
+    if state["status"] == "ok":
+        label, color = "🟢 OpenAI 연결 정상", "#2e7d32"
+    elif state["status"] == "error":
+        message = state["message"]
+        if "insufficient_quota" in message or "quota" in message.lower():
+            label = "🔴 OpenAI API 사용량 한도 초과"
+        elif "invalid_api_key" in message or "authentication" in message.lower():
+            label = "🔴 OpenAI API 키가 유효하지 않음"
+        elif "model_not_found" in message or "does not exist" in message:
+            label = "🔴 GPT-4 모델 접근 권한 없음"
+        else:
+            label = "🔴 OpenAI 연결 오류"
+        color = "#c62828"
+    else:
+        label, color = "🟡 OpenAI 연결 확인 중", "#f9a825"
+    
+    st.markdown(
+        f'<div style="text-align:right;"><span title="{html.escape(state["message"])}" '
+        f'style="display:inline-block; padding:4px 12px; border-radius:12px; font-size:0.85em; '
+        f'border:1px solid {color}; color:{color};">{label}</span></div>',
+        unsafe_allow_html=True
+    )
+
 # OpenAI 클라이언트 초기화
 client = initialize_openai_client()
 
 # OpenAI API 호출을 위한 안전한 래퍼 함수
-def safe_openai_call(messages, model="gpt-4", max_tokens=None, temperature=0.7, max_retries=3):
+def safe_openai_call(messages, model=None, max_tokens=None, temperature=0.7, max_retries=3,
+                     cache_site=None, prompt_version=None, bypass_cache=None, task=None, json_schema=None):
     """
     OpenAI API를 안전하게 호출하는 래퍼 함수
     
     Args:
         messages: 메시지 리스트
-        model: 사용할 모델 (기본값: gpt-4)
-        max_tokens: 최대 토큰 수
+        model: 사용할 모델 (기본값: task의 라우팅 모델, 없으면 gpt-4)
+        max_tokens: 최대 토큰 수 (기본값: task의 라우팅 설정)
         temperature: 창의성 수준
         max_retries: 최대 재시도 횟수
+        cache_site: 응답 캐시 사용 시 호출 위치 이름 (LLM_CACHE_TTLS 키, None이면 캐시 미사용)
+        prompt_version: 프롬프트 템플릿 버전 (변경 시 이전 캐시 무시)
+        bypass_cache: True면 캐시 조회 없이 새로 생성 (None이면 화면 설정/환경변수 따름)
+        task: 작업 이름 (MODEL_ROUTES 키) - 모델/최대 토큰/타임아웃 선택과 작업별 지표 집계에 사용
+        json_schema: (이름, JSON 스키마) - 모델이 지원하면 구조화 출력/JSON 모드로 요청
     
     Returns:
         API 응답 또는 None (실패 시)
     """
+    route = get_model_route(task) if task else {}
+    model = model or route.get("model") or DEFAULT_MODEL
+    max_tokens = max_tokens or route.get("max_tokens")
+    request_timeout = route.get("timeout")
+    route_metrics = get_route_metrics()
+    response_format = json_response_format(model, *json_schema) if json_schema else None
+    
+    cache_key = None
+    if cache_site:
+        llm_cache = get_llm_cache()
+        cache_key = llm_cache_key(model, messages, temperature, max_tokens, prompt_version or LLM_CACHE_PROMPT_VERSION,
+                                  response_format)
+        if not (llm_cache_bypassed() if bypass_cache is None else bypass_cache):
+            cached_content = llm_cache.lookup(cache_site, cache_key, LLM_CACHE_TTLS.get(cache_site, 24 * 3600))
+            if cached_content is not None:
+                return cached_completion(cached_content)
+    
+    rate_limiter = get_rate_limiter()
+    estimated_tokens = estimate_request_tokens(messages, max_tokens)
+    
     for attempt in range(max_retries):
+        rate_limiter.acquire(model, estimated_tokens)
+        started_at = time.perf_counter()
         try:
             kwargs = {
                 "model": model,
@@ -206,21 +313,35 @@ def safe_openai_call(messages, model="gpt-4", max_tokens=None, temperature=0.7,
             
             if max_tokens:
                 kwargs["max_tokens"] = max_tokens
+            if request_timeout:
+                kwargs["timeout"] = request_timeout
+            if response_format:
+                kwargs["response_format"] = response_format
             
-            response = client.chat.completions.create(**kwargs)
-            return response
+            raw_response = client.chat.completions.with_raw_response.create(**kwargs)
+            response = raw_response.parse()
             
         except Exception as e:
+            route_metrics.record(task or "default", model, time.perf_counter() - started_at, ok=False)
             error_msg = str(e).lower()
+            is_quota = "insufficient_quota" in error_msg or "quota" in error_msg
+            is_rate_limited = not is_quota and (
+                getattr(e, "status_code", None) == 429 or "rate_limit" in error_msg or "too_many_requests" in error_msg
+            )
+            rate_limiter.release(model, estimated_tokens, throttled=is_rate_limited)
+            if any(keyword in error_msg for keyword in ("quota", "invalid_api_key", "authentication", "model_not_found")):
+                get_openai_health().mark("error", str(e))
             
-            if attempt < max_retries - 1:  # 마지막 시도가 아닌 경우
-                if "rate_limit" in error_msg or "too_many_requests" in error_msg:
-                    st.warning(f"⚠️ API 요청 한도 초과. {attempt + 1}초 후 재시도... ({attempt + 1}/{max_retries})")
-                    time.sleep(attempt + 1)  # 점진적 대기
+            if attempt < max_retries - 1:  # 마지막 시도가 아닌 경우 (화면 경고 없이 로그만 남기고 재시도)
+                if is_rate_limited:
+                    delay = retry_delay(attempt, e)
+                    rate_limiter.block(model, delay)
+                    print(f"API 요청 한도 초과 ({model}): {delay:.1f}초 후 재시도 ({attempt + 1}/{max_retries})")
                     continue
-                elif "timeout" in error_msg or "connection" in error_msg:
-                    st.warning(f"⚠️ 네트워크 오류. 재시도 중... ({attempt + 1}/{max_retries})")
-                    time.sleep(1)
+                elif "timeout" in error_msg or "connection" in error_msg or getattr(e, "status_code", 0) in (500, 502, 503):
+                    delay = retry_delay(attempt, e)
+                    print(f"네트워크/서버 오류 ({model}): {delay:.1f}초 후 재시도 ({attempt + 1}/{max_retries})")
+                    time.sleep(delay)
                     continue
             
             # 최종 실패 또는 재시도 불가능한 오류
@@ -241,13 +362,855 @@ def safe_openai_call(messages, model="gpt-4", max_tokens=None, temperature=0.7,
                 st.markdown("**해결방법:** 네트워크 연결을 확인하고 다시 시도해주세요.")
             
             return None
+        
+        else:
+            # 성공한 시도는 여기서만 지표 기록/동시 요청 반환 (후처리 오류로 중복 반환되지 않도록)
+            route_metrics.record(task or "default", model, time.perf_counter() - started_at, response)
+            try:
+                rate_limiter.update_from_headers(model, raw_response.headers)
+            except Exception as e:
+                print(f"요청 한도 헤더 처리 오류 ({model}): {str(e)}")
+            usage = getattr(response, "usage", None)
+            rate_limiter.release(model, estimated_tokens, getattr(usage, "total_tokens", None))
+            get_openai_health().mark("ok")
+            try:
+                if cache_key and response.choices and response.choices[0].message.content:
+                    llm_cache.set(cache_key, response.choices[0].message.content, namespace=cache_site)
+            except Exception as e:
+                print(f"LLM 응답 캐시 저장 오류: {str(e)}")
+            return response
     
     return None
 
+def safe_openai_stream(messages, model=None, max_tokens=None, temperature=0.7, on_delta=None, task=None,
+                       json_schema=None):
+    """
+    OpenAI API 스트리밍 호출 (토큰이 도착할 때마다 누적 텍스트로 on_delta 호출)
+    
+    Args:
+        messages: 메시지 리스트
+        model: 사용할 모델 (기본값: gpt-4)
+        max_tokens: 최대 토큰 수
+        temperature: 창의성 수준
+        on_delta: 누적 응답 텍스트를 받는 콜백
+        task: 작업 이름 (MODEL_ROUTES 키)
+        json_schema: (이름, JSON 스키마) - 모델이 지원하면 구조화 출력/JSON 모드로 요청
+    
+    Returns:
+        전체 응답 텍스트 또는 None (실패 시 - 호출 측에서 safe_openai_call로 대체)
+    """
+    route = get_model_route(task) if task else {}
+    model = model or route.get("model") or DEFAULT_MODEL
+    max_tokens = max_tokens or route.get("max_tokens")
+    started_at = time.perf_counter()
+    try:
+        kwargs = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "stream": True
+        }
+        
+        if max_tokens:
+            kwargs["max_tokens"] = max_tokens
+        if route.get("timeout"):
+            kwargs["timeout"] = route["timeout"]
+        response_format = json_response_format(model, *json_schema) if json_schema else None
+        if response_format:
+            kwargs["response_format"] = response_format
+        
+        parts = []
+        rate_limiter = get_rate_limiter()
+        estimated_tokens = estimate_request_tokens(messages, max_tokens)
+        rate_limiter.acquire(model, estimated_tokens)
+        throttled = False
+        try:
+            for chunk in client.chat.completions.create(**kwargs):
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    if on_delta:
+                        on_delta("".join(parts))
+        except Exception as e:
+            throttled = getattr(e, "status_code", None) == 429
+            raise
+        finally:
+            rate_limiter.release(model, estimated_tokens, throttled=throttled)
+        get_route_metrics().record(task or "default", model, time.perf_counter() - started_at)
+        return "".join(parts)
+    except Exception as e:
+        get_route_metrics().record(task or "default", model, time.perf_counter() - started_at, ok=False)
+        print(f"스트리밍 호출 실패 (일반 호출로 대체): {str(e)}")
+        return None
+
+def extract_partial_json_fields(text, keys):
+    """스트리밍 중인 (닫히지 않은) JSON 텍스트에서 문자열 필드 값 추출"""
+    fields = {}
+    for key in keys:
+        match = re.search(r'"%s"\s*:\s*"((?:[^"\\]|\\.)*)' % re.escape(key), text)
+        if not match:
+            continue
+        value = match.group(1)  # 끝에 잘린 이스케이프 문자는 패턴에서 제외됨
+        try:
+            fields[key] = json.loads(f'"{value}"')
+        except json.JSONDecodeError:
+            fields[key] = value.replace('\\n', '\n').replace('\\"', '"')
+    return fields
+
 import time  # time 모듈 import 추가
 
 os.makedirs("images", exist_ok=True)
 
+# 영구 캐시 저장 위치 (번역/응답 캐시 등)
+CACHE_DIR = os.getenv("EDM_CACHE_DIR", ".edm_cache")
+
+class PersistentCache:
+    """SQLite 기반 영구 캐시 (메모리 LRU + 디스크 LRU/TTL 제거, 적중률 집계)"""
+
+    def __init__(self, name, max_entries=20000, ttl=None, memory_entries=2000):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        self.path = os.path.join(CACHE_DIR, f"{name}.sqlite3")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.memory_entries = memory_entries
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._memory = OrderedDict()  # key -> (value, namespace, created_at)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                namespace TEXT NOT NULL DEFAULT '',
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries(accessed_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_namespace ON entries(namespace)")
+        self._conn.commit()
+
+    def _expired(self, created_at, ttl):
+        ttl = self.ttl if ttl is None else ttl
+        return bool(ttl) and (time.time() - created_at) > ttl
+
+    def _remember(self, key, value, namespace, created_at):
+        self._memory[key] = (value, namespace, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key, default=None, ttl=None):
+        """캐시 조회 (메모리 → 디스크 순, 만료된 항목은 삭제)"""
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                value, namespace, created_at = cached
+                if not self._expired(created_at, ttl):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._memory[key]
+
+            try:
+                row = self._conn.execute(
+                    "SELECT value, namespace, created_at FROM entries WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value_json, namespace, created_at = row
+                    if self._expired(created_at, ttl):
+                        self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                        self._conn.commit()
+                    else:
+                        self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+                        self._conn.commit()
+                        value = json.loads(value_json)
+                        self._remember(key, value, namespace, created_at)
+                        self.hits += 1
+                        return value
+            except sqlite3.Error as e:
+                print(f"캐시 조회 오류 ({self.path}): {str(e)}")
+
+            self.misses += 1
+            return default
+
+    def set(self, key, value, namespace=""):
+        """캐시 저장 (항목 수가 한도를 넘으면 오래 사용되지 않은 항목부터 제거)"""
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, namespace, now)
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, namespace, value, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, namespace, json.dumps(value, ensure_ascii=False), now, now)
+                )
+                self._writes += 1
+                if self._writes % 100 == 0:
+                    self._evict()
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"캐시 저장 오류 ({self.path}): {str(e)}")
+
+    def _evict(self):
+        if self.ttl:
+            self._conn.execute("DELETE FROM entries WHERE created_at < ?", (time.time() - self.ttl,))
+        count = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed_at ASC LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+    def invalidate(self, namespace=None):
+        """네임스페이스 단위(또는 전체) 캐시 무효화"""
+        with self._lock:
+            try:
+                if namespace is None:
+                    self._memory.clear()
+                    self._conn.execute("DELETE FROM entries")
+                else:
+                    for key in [k for k, v in self._memory.items() if v[1] == namespace]:
+                        del self._memory[key]
+                    self._conn.execute("DELETE FROM entries WHERE namespace = ?", (namespace,))
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"캐시 무효화 오류 ({self.path}): {str(e)}")
+
+    def stats(self):
+        """적중/실패 횟수와 저장 항목 수"""
+        with self._lock:
+            try:
+                entries = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            except sqlite3.Error:
+                entries = len(self._memory)
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+            "entries": entries
+        }
+
+# LLM 응답 캐시 - 호출 위치별 유지 시간(초)과 프롬프트 템플릿 버전
+LLM_CACHE_TTLS = {
+    "pdf_structure": 7 * 24 * 3600,
+    "feature_desc": 24 * 3600,
+    "expected_effects": 24 * 3600,
+    "banner_svg": 24 * 3600,
+    "banner_scene": 24 * 3600,
+}
+LLM_CACHE_PROMPT_VERSION = "v1"
+
+class LLMResponseCache(PersistentCache):
+    """LLM 응답 캐시 (호출 위치별 적중률 집계)"""
+
+    def __init__(self):
+        super().__init__("llm_responses", max_entries=5000, memory_entries=500)
+        self.site_counts = {}
+
+    def lookup(self, site, key, ttl):
+        """캐시 조회 후 호출 위치별 적중/실패 기록"""
+        value = self.get(key, ttl=ttl)
+        with self._lock:
+            counts = self.site_counts.setdefault(site, {"hits": 0, "misses": 0})
+            counts["hits" if value is not None else "misses"] += 1
+        return value
+
+    def site_stats(self):
+        """호출 위치별 적중/실패 횟수와 적중률"""
+        with self._lock:
+            rows = []
+            for site, counts in sorted(self.site_counts.items()):
+                total = counts["hits"] + counts["misses"]
+                rows.append({
+                    "site": site,
+                    "hits": counts["hits"],
+                    "misses": counts["misses"],
+                    "hit_rate": round(counts["hits"] / total, 3) if total else 0.0
+                })
+            return rows
+
+@st.cache_resource
+def get_llm_cache():
+    """LLM 응답 캐시 (프로세스당 1회 생성)"""
+    return LLMResponseCache()
+
+def llm_cache_key(model, messages, temperature, max_tokens, prompt_version, response_format=None):
+    """(모델, 메시지, temperature, max_tokens, 프롬프트 버전, 응답 형식)의 정규화 해시"""
+    canonical = json.dumps(
+        {"model": model, "messages": messages, "temperature": temperature,
+         "max_tokens": max_tokens, "version": prompt_version, "response_format": response_format},
+        sort_keys=True, ensure_ascii=False, separators=(",", ":")
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def llm_cache_bypassed():
+    """의도적인 재생성 여부 (환경변수 EDM_LLM_CACHE_BYPASS=1 또는 화면의 '새로 생성' 옵션)"""
+    if os.getenv("EDM_LLM_CACHE_BYPASS") == "1":
+        return True
+    try:
+        return bool(st.session_state.get("bypass_llm_cache", False))
+    except Exception:
+        return False
+
+def cached_completion(content):
+    """캐시된 응답을 ChatCompletion과 같은 형태로 감싸기 (토큰 사용량 없음)"""
+    message = SimpleNamespace(role="assistant", content=content)
+    return SimpleNamespace(choices=[SimpleNamespace(index=0, message=message, finish_reason="stop")],
+                           usage=None, cached=True)
+
+# OpenAI 요청 한도 기본값 (응답의 x-ratelimit-* 헤더를 받으면 실제 한도로 갱신)
+OPENAI_DEFAULT_RPM = int(os.getenv("EDM_OPENAI_RPM", "500"))
+OPENAI_DEFAULT_TPM = int(os.getenv("EDM_OPENAI_TPM", "30000"))
+OPENAI_MAX_IN_FLIGHT = int(os.getenv("EDM_OPENAI_MAX_IN_FLIGHT", "8"))
+
+def parse_reset_duration(value):
+    """x-ratelimit-reset-* 값("6m0s", "1.5s", "20ms")을 초 단위로 변환"""
+    if not value:
+        return None
+    units = {"h": 3600, "m": 60, "s": 1, "ms": 0.001}
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", str(value))
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return sum(float(amount) * units[unit] for amount, unit in parts)
+
+class RateLimiter:
+    """모델별 RPM/TPM 토큰 버킷 + Retry-After 대기 + AIMD 동시 요청 수 조절"""
+
+    def __init__(self, rpm=OPENAI_DEFAULT_RPM, tpm=OPENAI_DEFAULT_TPM, max_in_flight=OPENAI_MAX_IN_FLIGHT):
+        self.default_rpm = rpm
+        self.default_tpm = tpm
+        self.max_in_flight = max_in_flight
+        self.models = {}
+        self._lock = threading.Lock()
+
+    def _state(self, model):
+        state = self.models.get(model)
+        if state is None:
+            state = self.models[model] = {
+                "rpm": self.default_rpm, "tpm": self.default_tpm,
+                "requests": float(self.default_rpm), "tokens": float(self.default_tpm),
+                "updated_at": time.monotonic(), "blocked_until": 0.0,
+                "in_flight": 0, "concurrency": float(self.max_in_flight),
+                "throttled": 0
+            }
+        return state
+
+    def _refill(self, state):
+        now = time.monotonic()
+        elapsed = now - state["updated_at"]
+        state["requests"] = min(state["rpm"], state["requests"] + elapsed * state["rpm"] / 60)
+        state["tokens"] = min(state["tpm"], state["tokens"] + elapsed * state["tpm"] / 60)
+        state["updated_at"] = now
+
+    def acquire(self, model, estimated_tokens):
+        """요청/토큰 예산과 동시 요청 한도가 허용될 때까지 대기 후 예산 차감"""
+        while True:
+            with self._lock:
+                state = self._state(model)
+                self._refill(state)
+                now = time.monotonic()
+                tokens_needed = min(estimated_tokens, state["tpm"])
+                if now < state["blocked_until"]:
+                    delay = state["blocked_until"] - now
+                elif state["in_flight"] >= max(1, int(state["concurrency"])):
+                    delay = 0.05
+                elif state["requests"] < 1:
+                    delay = (1 - state["requests"]) * 60 / state["rpm"]
+                elif state["tokens"] < tokens_needed:
+                    delay = (tokens_needed - state["tokens"]) * 60 / state["tpm"]
+                else:
+                    state["requests"] -= 1
+                    state["tokens"] -= tokens_needed
+                    state["in_flight"] += 1
+                    return
+            time.sleep(min(max(delay, 0.01), 2.0))
+
+    def release(self, model, estimated_tokens, used_tokens=None, throttled=False):
+        """요청 종료 - 실제 토큰 사용량으로 예산 보정, 성공 시 동시 요청 수 증가(+), 제한 시 절반(x0.5)"""
+        with self._lock:
+            state = self._state(model)
+            state["in_flight"] = max(0, state["in_flight"] - 1)
+            if used_tokens is not None:
+                state["tokens"] = min(state["tpm"], state["tokens"] + estimated_tokens - used_tokens)
+            if throttled:
+                state["concurrency"] = max(1.0, state["concurrency"] / 2)
+                state["throttled"] += 1
+            else:
+                state["concurrency"] = min(self.max_in_flight, state["concurrency"] + 1 / state["concurrency"])
+
+    def update_from_headers(self, model, headers):
+        """x-ratelimit-* 응답 헤더로 한도와 남은 예산 동기화"""
+        if not headers:
+            return
+        with self._lock:
+            state = self._state(model)
+            self._refill(state)
+            try:
+                if headers.get("x-ratelimit-limit-requests"):
+                    state["rpm"] = max(1, int(headers["x-ratelimit-limit-requests"]))
+                if headers.get("x-ratelimit-limit-tokens"):
+                    state["tpm"] = max(1, int(headers["x-ratelimit-limit-tokens"]))
+                if headers.get("x-ratelimit-remaining-requests"):
+                    state["requests"] = min(state["requests"], float(headers["x-ratelimit-remaining-requests"]))
+                if headers.get("x-ratelimit-remaining-tokens"):
+                    state["tokens"] = min(state["tokens"], float(headers["x-ratelimit-remaining-tokens"]))
+            except ValueError:
+                pass
+
+    def block(self, model, seconds):
+        """Retry-After 동안 해당 모델 요청 중단"""
+        with self._lock:
+            state = self._state(model)
+            state["blocked_until"] = max(state["blocked_until"], time.monotonic() + seconds)
+
+    def stats(self):
+        """모델별 한도, 남은 예산, 현재 동시 요청 한도"""
+        with self._lock:
+            return [
+                {"model": model, "rpm": state["rpm"], "tpm": state["tpm"],
+                 "requests_left": int(state["requests"]), "tokens_left": int(state["tokens"]),
+                 "concurrency": round(state["concurrency"], 2), "throttled": state["throttled"]}
+                for model, state in sorted(self.models.items())
+            ]
+
+@st.cache_resource
+def get_rate_limiter():
+    """OpenAI 요청 한도 관리자 (모든 세션이 공유, 프로세스당 1회 생성)"""
+    return RateLimiter()
+
+def estimate_request_tokens(messages, max_tokens=None):
+    """요청 토큰 수 추정 (문자 수 기반, 응답 최대 토큰 포함)"""
+    prompt_chars = sum(len(str(message.get("content", ""))) for message in messages)
+    return prompt_chars // 2 + (max_tokens or 512)
+
+def retry_delay(attempt, error=None, base=1.0, cap=30.0):
+    """재시도 대기 시간 - Retry-After 헤더 우선, 없으면 지수 백오프 + 지터"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    return random.uniform(0, min(cap, base * (2 ** attempt))) + base / 2
+
+# HTTP 가져오기 설정 (디스크 캐시 총 용량 / 응답 최대 크기)
+HTTP_CACHE_MAX_BYTES = int(os.getenv("EDM_HTTP_CACHE_MB", "200")) * 1024 * 1024
+HTTP_MAX_RESPONSE_BYTES = int(os.getenv("EDM_HTTP_MAX_MB", "20")) * 1024 * 1024
+
+class HttpFetcher:
+    """공유 HTTP 가져오기 계층 (호스트별 연결 풀, ETag/Last-Modified 조건부 GET, 크기 제한 디스크 캐시)"""
+
+    def __init__(self, cache_max_bytes=HTTP_CACHE_MAX_BYTES, max_response_bytes=HTTP_MAX_RESPONSE_BYTES,
+                 pool_maxsize=10):
+        self.cache_max_bytes = cache_max_bytes
+        self.max_response_bytes = max_response_bytes
+        self.body_dir = os.path.join(CACHE_DIR, "http")
+        os.makedirs(self.body_dir, exist_ok=True)
+        self.index = PersistentCache("http", max_entries=5000, memory_entries=500)
+        self.counts = {"requests": 0, "fresh": 0, "not_modified": 0, "downloaded_bytes": 0}
+        self._lock = threading.Lock()
+
+        self.session = requests.Session()
+        retry = Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504),
+                      allowed_methods=("GET", "HEAD"))
+        adapter = HTTPAdapter(pool_connections=20, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["User-Agent"] = "edm-generator/1.0"
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.counts[name] += amount
+
+    @staticmethod
+    def _freshness(headers):
+        """Cache-Control 헤더 기준 신선도(초), no-store면 None"""
+        cache_control = headers.get("Cache-Control", "").lower()
+        if "no-store" in cache_control:
+            return None
+        if "no-cache" in cache_control:
+            return 0
+        match = re.search(r"max-age=(\d+)", cache_control)
+        return int(match.group(1)) if match else 0
+
+    def fetch(self, url, timeout=10, max_age=0):
+        """URL 본문을 디스크 캐시에 받아 파일 경로 반환
+        
+        Args:
+            url: 가져올 URL
+            timeout: 연결/읽기 타임아웃(초)
+            max_age: 이 시간(초) 이내에 받은 본문은 재검증 없이 사용
+        
+        Returns:
+            str: 본문이 저장된 캐시 파일 경로
+        """
+        self._count("requests")
+        entry = self.index.get(url)
+        body_path = os.path.join(self.body_dir, hashlib.sha256(url.encode("utf-8")).hexdigest())
+        cached = entry is not None and os.path.exists(body_path)
+
+        if cached:
+            fresh_for = max(max_age, entry.get("fresh_for", 0))
+            if fresh_for and time.time() - entry["fetched_at"] < fresh_for:
+                self._count("fresh")
+                return body_path
+
+        headers = {}
+        if cached:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        with self.session.get(url, timeout=timeout, headers=headers, stream=True) as response:
+            if response.status_code == 304 and cached:
+                self._count("not_modified")
+                entry["fetched_at"] = time.time()
+                entry["fresh_for"] = self._freshness(response.headers) or entry.get("fresh_for", 0)
+                self.index.set(url, entry)
+                os.utime(body_path)
+                return body_path
+
+            response.raise_for_status()
+            content_length = int(response.headers.get("Content-Length") or 0)
+            if content_length > self.max_response_bytes:
+                raise ValueError(f"응답 크기 초과 ({content_length} bytes > {self.max_response_bytes} bytes): {url}")
+
+            # 본문을 메모리에 모으지 않고 임시 파일로 스트리밍
+            tmp_path = f"{body_path}.{threading.get_ident()}.tmp"
+            size = 0
+            try:
+                with open(tmp_path, "wb") as f:
+                    for chunk in response.iter_content(chunk_size=64 * 1024):
+                        size += len(chunk)
+                        if size > self.max_response_bytes:
+                            raise ValueError(f"응답 크기 초과 (> {self.max_response_bytes} bytes): {url}")
+                        f.write(chunk)
+                os.replace(tmp_path, body_path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+            self._count("downloaded_bytes", size)
+            freshness = self._freshness(response.headers)
+            if freshness is not None:  # no-store 응답은 재검증 정보를 남기지 않음
+                self.index.set(url, {
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                    "content_type": response.headers.get("Content-Type", ""),
+                    "size": size,
+                    "fetched_at": time.time(),
+                    "fresh_for": freshness
+                })
+
+        self._enforce_cache_size()
+        return body_path
+
+    def fetch_bytes(self, url, timeout=10, max_age=0):
+        """URL 본문 바이트 반환 (fetch 결과 파일 읽기)"""
+        with open(self.fetch(url, timeout=timeout, max_age=max_age), "rb") as f:
+            return f.read()
+
+    def _enforce_cache_size(self):
+        """디스크 캐시 총 용량이 한도를 넘으면 오래 사용되지 않은 본문부터 삭제"""
+        with self._lock:
+            try:
+                files = []
+                for name in os.listdir(self.body_dir):
+                    if name.endswith(".tmp"):
+                        continue
+                    path = os.path.join(self.body_dir, name)
+                    stat = os.stat(path)
+                    files.append((stat.st_mtime, stat.st_size, path))
+                total = sum(size for _, size, _ in files)
+                for _, size, path in sorted(files):
+                    if total <= self.cache_max_bytes:
+                        break
+                    os.remove(path)
+                    total -= size
+            except OSError as e:
+                print(f"HTTP 캐시 정리 오류: {str(e)}")
+
+    def stats(self):
+        """요청 수, 재검증 없이 사용한 횟수, 304 응답 수, 다운로드 바이트"""
+        with self._lock:
+            return dict(self.counts)
+
+@st.cache_resource
+def get_http_fetcher():
+    """공유 HTTP 가져오기 계층 (프로세스당 1회 생성, 세션/연결 풀 재사용)"""
+    return HttpFetcher()
+
+# 동시에 실행할 LLM 작업 수 / 작업별 기본 타임아웃(초)
+LLM_MAX_CONCURRENCY = int(os.getenv("EDM_LLM_CONCURRENCY", "6"))
+LLM_TASK_TIMEOUT = float(os.getenv("EDM_LLM_TASK_TIMEOUT", "120"))
+
+def _attach_script_run_ctx(ctx):
+    """작업 스레드에 Streamlit 실행 컨텍스트 연결 (st.* 호출 허용)"""
+    if ctx is None:
+        return
+    try:
+        from streamlit.runtime.scriptrunner import add_script_run_ctx
+        add_script_run_ctx(threading.current_thread(), ctx)
+    except ImportError:
+        pass
+
+def _current_script_run_ctx():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        return get_script_run_ctx()
+    except ImportError:
+        return None
+
+class TaskScheduler:
+    """의존성 기반 병렬 작업 스케줄러 (스레드 풀, 작업별 타임아웃, 실행 기록)"""
+
+    def __init__(self, max_workers=None, default_timeout=None):
+        self.max_workers = max_workers or LLM_MAX_CONCURRENCY
+        self.default_timeout = default_timeout or LLM_TASK_TIMEOUT
+        self.tasks = {}
+        self.trace = []
+
+    def add(self, name, fn, deps=(), timeout=None, default=None):
+        """작업 등록 - fn은 의존 작업 결과를 deps 순서대로 위치 인자로 받음
+        
+        실패하거나 타임아웃된 작업의 결과는 default로 대체됩니다.
+        """
+        self.tasks[name] = {
+            "fn": fn,
+            "deps": tuple(deps),
+            "timeout": timeout or self.default_timeout,
+            "default": default
+        }
+        return name
+
+    def run(self, on_result=None, on_tick=None, tick_interval=0.25):
+        """의존성이 충족된 작업부터 병렬 실행 후 {작업명: 결과} 반환
+        
+        on_result(name, value)는 작업이 끝날 때마다, on_tick()은 tick_interval초마다
+        호출 스레드에서 실행됩니다 (진행 상황 미리보기 갱신용).
+        """
+        for name, task in self.tasks.items():
+            unknown = [dep for dep in task["deps"] if dep not in self.tasks]
+            if unknown:
+                raise ValueError(f"작업 '{name}'의 의존 작업이 없습니다: {unknown}")
+        
+        results = {}
+        pending = dict(self.tasks)
+        running = {}  # future -> (name, started_at)
+        run_started = time.perf_counter()
+        executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_attach_script_run_ctx,
+            initargs=(_current_script_run_ctx(),)
+        )
+        
+        def finish(name, started_at, status, value):
+            ended_at = time.perf_counter()
+            results[name] = value
+            self.trace.append({
+                "task": name,
+                "start": round(started_at - run_started, 3),
+                "end": round(ended_at - run_started, 3),
+                "duration": round(ended_at - started_at, 3),
+                "status": status
+            })
+            if on_result:
+                try:
+                    on_result(name, value)
+                except Exception as e:
+                    print(f"작업 결과 콜백 오류 ({name}): {str(e)}")
+        
+        try:
+            while pending or running:
+                # 의존 작업이 모두 끝난 작업 제출
+                for name in [n for n, t in pending.items() if all(dep in results for dep in t["deps"])]:
+                    task = pending.pop(name)
+                    args = [results[dep] for dep in task["deps"]]
+                    running[executor.submit(task["fn"], *args)] = (name, time.perf_counter())
+                
+                if not running:
+                    raise ValueError(f"순환 의존성이 있는 작업: {list(pending)}")
+                
+                now = time.perf_counter()
+                next_deadline = min(started + self.tasks[name]["timeout"] for name, started in running.values())
+                wait_timeout = max(0.0, next_deadline - now)
+                if on_tick:
+                    wait_timeout = min(wait_timeout, tick_interval)
+                done, _ = wait(list(running), timeout=wait_timeout, return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    name, started_at = running.pop(future)
+                    try:
+                        finish(name, started_at, "ok", future.result())
+                    except Exception as e:
+                        print(f"작업 실패 ({name}): {str(e)}")
+                        finish(name, started_at, "error", self.tasks[name]["default"])
+                
+                # 타임아웃된 작업은 기본값으로 대체 (스레드 결과는 무시)
+                now = time.perf_counter()
+                for future, (name, started_at) in list(running.items()):
+                    if now - started_at >= self.tasks[name]["timeout"]:
+                        running.pop(future)
+                        future.cancel()
+                        print(f"작업 타임아웃 ({name}): {self.tasks[name]['timeout']}초")
+                        finish(name, started_at, "timeout", self.tasks[name]["default"])
+                
+                if on_tick:
+                    try:
+                        on_tick()
+                    except Exception as e:
+                        print(f"진행 상황 콜백 오류: {str(e)}")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        return results
+
+# 모델별 토큰 단가 (USD / 1K 토큰: 입력, 출력) - 비용 추정용
+MODEL_PRICING = {
+    "gpt-4": (0.03, 0.06),
+    "gpt-4-turbo": (0.01, 0.03),
+    "gpt-4o": (0.0025, 0.01),
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-3.5-turbo": (0.0005, 0.0015)
+}
+
+def record_usage(usage, response, task=None):
+    """응답의 토큰 사용량을 usage 딕셔너리에 누적 (합계 + usage['routes'][작업]에 작업별 모델과 사용량)"""
+    if usage is None or response is None:
+        return
+    response_usage = getattr(response, "usage", None)
+    targets = [usage]
+    if task:
+        route_usage = usage.setdefault("routes", {}).setdefault(task, {"model": get_model_route(task)["model"]})
+        targets.append(route_usage)
+    for target in targets:
+        target["requests"] = target.get("requests", 0) + 1
+        if response_usage:
+            target["prompt_tokens"] = target.get("prompt_tokens", 0) + (response_usage.prompt_tokens or 0)
+            target["completion_tokens"] = target.get("completion_tokens", 0) + (response_usage.completion_tokens or 0)
+
+def estimate_cost(model, usage):
+    """토큰 사용량 기반 예상 비용 (USD)"""
+    input_price, output_price = MODEL_PRICING.get(model, MODEL_PRICING["gpt-4"])
+    return (usage.get("prompt_tokens", 0) * input_price + usage.get("completion_tokens", 0) * output_price) / 1000
+
+def estimate_usage_cost(usage, default_task=None):
+    """record_usage로 누적한 사용량의 예상 비용 (작업별로 실제 호출한 모델 단가 적용)
+    
+    작업별 기록이 없으면 default_task의 라우팅 모델(없으면 기본 모델) 단가로 계산합니다.
+    """
+    routes = usage.get("routes")
+    if routes:
+        return sum(estimate_cost(route_usage["model"], route_usage) for route_usage in routes.values())
+    model = get_model_route(default_task)["model"] if default_task else DEFAULT_MODEL
+    return estimate_cost(model, usage)
+
+# 작업별 모델 라우팅 (모델, 최대 토큰, 타임아웃(초)) - 배포 환경별로 EDM_MODEL_ROUTES 또는 secrets의 [model_routes]로 재정의
+DEFAULT_MODEL = "gpt-4"
+MODEL_ROUTES = {
+    "icon_pick": {"model": "gpt-4o-mini", "max_tokens": 50, "timeout": 20},
+    "title_refine": {"model": "gpt-4o-mini", "max_tokens": 100, "timeout": 30},
+    "translate_short": {"model": "gpt-4o-mini", "max_tokens": 500, "timeout": 30},
+    "translate_long": {"model": "gpt-4o", "max_tokens": 4000, "timeout": 90},
+    "feature_desc": {"model": "gpt-4o-mini", "max_tokens": 100, "timeout": 30},
+    "expected_effects": {"model": "gpt-4o", "max_tokens": 800, "timeout": 60},
+    "summarize": {"model": "gpt-4o-mini", "max_tokens": 300, "timeout": 30},
+    "pdf_structure": {"model": "gpt-4o-mini", "max_tokens": 500, "timeout": 60},
+    "svg_banner": {"model": "gpt-4", "max_tokens": 1500, "timeout": 90},
+    "svg_scene": {"model": "gpt-4o", "max_tokens": 700, "timeout": 45},
+    "content_body": {"model": "gpt-4", "max_tokens": None, "timeout": 120},
+    "edit": {"model": "gpt-4", "max_tokens": None, "timeout": 120},
+}
+
+def _load_route_overrides():
+    """EDM_MODEL_ROUTES(JSON 문자열 또는 JSON 파일 경로)와 secrets의 [model_routes] 설정 읽기"""
+    overrides = {}
+    try:
+        overrides.update({task: dict(route) for task, route in st.secrets["model_routes"].items()})
+    except Exception:
+        pass
+    
+    raw = os.getenv("EDM_MODEL_ROUTES")
+    if raw:
+        try:
+            if os.path.exists(raw):
+                with open(raw, encoding="utf-8") as f:
+                    raw = f.read()
+            for task, route in json.loads(raw).items():
+                overrides.setdefault(task, {}).update(route)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"EDM_MODEL_ROUTES 설정 오류 (기본 라우팅 사용): {str(e)}")
+    return overrides
+
+@st.cache_resource
+def get_model_routes():
+    """기본 라우팅에 배포 설정을 덮어쓴 작업별 라우팅 (프로세스당 1회 로드)"""
+    routes = {task: dict(route) for task, route in MODEL_ROUTES.items()}
+    for task, override in _load_route_overrides().items():
+        routes.setdefault(task, {"model": DEFAULT_MODEL, "max_tokens": None, "timeout": None}).update(override)
+    return routes
+
+def get_model_route(task):
+    """작업의 (model, max_tokens, timeout) 설정 (등록되지 않은 작업은 기본 모델)"""
+    return get_model_routes().get(task) or {"model": DEFAULT_MODEL, "max_tokens": None, "timeout": None}
+
+class RouteMetrics:
+    """작업별 호출 수, 지연 시간, 토큰 사용량, 예상 비용 집계 (라우팅 조정용)"""
+
+    def __init__(self):
+        self.tasks = {}
+        self._lock = threading.Lock()
+
+    def record(self, task, model, seconds, response=None, ok=True):
+        usage = getattr(response, "usage", None)
+        with self._lock:
+            metrics = self.tasks.setdefault(task, {"model": model, "calls": 0, "errors": 0, "seconds": 0.0,
+                                                   "prompt_tokens": 0, "completion_tokens": 0})
+            metrics["model"] = model
+            metrics["calls"] += 1
+            metrics["errors"] += 0 if ok else 1
+            metrics["seconds"] += seconds
+            if usage:
+                metrics["prompt_tokens"] += usage.prompt_tokens or 0
+                metrics["completion_tokens"] += usage.completion_tokens or 0
+
+    def summary(self):
+        """작업별 평균 지연 시간과 누적 예상 비용"""
+        with self._lock:
+            return [
+                {"task": task, "model": m["model"], "calls": m["calls"], "errors": m["errors"],
+                 "avg_seconds": round(m["seconds"] / m["calls"], 2) if m["calls"] else 0.0,
+                 "tokens": m["prompt_tokens"] + m["completion_tokens"],
+                 "cost_usd": round(estimate_cost(m["model"], m), 4)}
+                for task, m in sorted(self.tasks.items())
+            ]
+
+@st.cache_resource
+def get_route_metrics():
+    """작업별 호출 지표 (프로세스당 1회 생성)"""
+    return RouteMetrics()
+
+# 기본 회사 로고 (웅진IT)
+DEFAULT_COMPANY_LOGO_LIGHT_URL = "https://raw.githubusercontent.com/Gina-cloud/edm-generator/main/woongjinit_logo1.png"  # 어두운 배경용 (밝은 로고)
+DEFAULT_COMPANY_LOGO_DARK_URL = "https://raw.githubusercontent.com/Gina-cloud/edm-generator/main/woongjinit_logo2.png"   # 밝은 배경용 (어두운 로고)
+
 # Bootstrap Icons 매핑 (주요 비즈니스/IT 관련 아이콘들)
 BOOTSTRAP_ICONS = {
     # 데이터 & 분석
@@ -341,14 +1304,153 @@ BOOTSTRAP_ICONS = {
     "솔루션": "puzzle-fill"
 }
 
-def select_bootstrap_icon(keyword):
-    """키워드를 기반으로 적절한 Bootstrap Icon 선택"""
-    keyword_lower = keyword.lower()
-    
-    # 직접 매칭 시도
+# 동의어/영문 표현 → BOOTSTRAP_ICONS 키워드
+ICON_SYNONYMS = {
+    "data": "데이터", "analytics": "분석", "analysis": "분석", "realtime": "실시간", "real-time": "실시간",
+    "monitoring": "모니터링", "dashboard": "대시보드", "report": "리포트", "보고서": "리포트", "statistics": "통계",
+    "cloud": "클라우드", "server": "서버", "database": "데이터베이스", "db": "데이터베이스", "storage": "저장",
+    "스토리지": "저장", "backup": "백업", "sync": "동기화", "integration": "연동", "통합": "연동",
+    "security": "보안", "authentication": "인증", "로그인": "인증", "permission": "권한", "encryption": "암호화",
+    "firewall": "방화벽", "access": "접근제어", "automation": "자동화", "rpa": "자동화", "workflow": "워크플로우",
+    "process": "프로세스", "schedule": "스케줄", "일정": "스케줄", "batch": "배치", "task": "작업",
+    "network": "네트워크", "connection": "연결", "interface": "인터페이스", "web": "웹서비스", "웹": "웹서비스",
+    "management": "관리", "operation": "운영", "control": "제어", "settings": "설정", "deploy": "배포",
+    "warehouse": "창고", "wms": "창고", "inventory": "재고", "logistics": "물류", "delivery": "배송",
+    "shipping": "배송", "tracking": "추적", "accounting": "회계", "finance": "재무", "payment": "결제",
+    "invoice": "청구", "budget": "예산", "cost": "비용", "원가": "비용", "user": "사용자", "customer": "고객",
+    "crm": "고객", "team": "팀", "collaboration": "협업", "communication": "커뮤니케이션", "메신저": "커뮤니케이션",
+    "notification": "알림", "performance": "성능", "optimization": "최적화", "efficiency": "효율",
+    "speed": "속도", "quality": "품질", "improvement": "개선", "business": "비즈니스", "strategy": "전략",
+    "goal": "목표", "achievement": "성과", "innovation": "혁신", "ai": "혁신", "인공지능": "혁신",
+    "solution": "솔루션", "erp": "솔루션",
+}
+
+# 전체 Bootstrap Icons 이름 목록 (HTML에서 사용하는 CSS와 같은 버전)
+BOOTSTRAP_ICONS_JSON_URL = "https://cdn.jsdelivr.net/npm/bootstrap-icons@1.11.0/font/bootstrap-icons.json"
+DEFAULT_ICON = "gear-fill"
+
+def normalize_icon_keyword(text):
+    """아이콘 키워드 정규화 (소문자, 기호 제거, 공백 정리)"""
+    text = re.sub(r"[^0-9a-z가-힣\s-]", " ", (text or "").lower())
+    return re.sub(r"\s+", " ", text).strip()
+
+def _char_ngrams(text, n=2):
+    compact = text.replace(" ", "")
+    if len(compact) < n:
+        return {compact} if compact else set()
+    return {compact[i:i + n] for i in range(len(compact) - n + 1)}
+
+@st.cache_resource
+def get_icon_index():
+    """아이콘 매칭 인덱스 (정규화 용어, n-gram, 동의어, 전체 아이콘 이름; 프로세스당 1회 생성)"""
+    terms = {}
     for key, icon in BOOTSTRAP_ICONS.items():
-        if key in keyword_lower or keyword_lower in key:
-            return icon
+        terms[normalize_icon_keyword(key)] = icon
+    for synonym, key in ICON_SYNONYMS.items():
+        terms.setdefault(normalize_icon_keyword(synonym), BOOTSTRAP_ICONS[key])
+    
+    ngrams = {}
+    for term in terms:
+        for gram in _char_ngrams(term):
+            ngrams.setdefault(gram, set()).add(term)
+    
+    icon_names = set(BOOTSTRAP_ICONS.values()) | {DEFAULT_ICON}
+    try:
+        icon_names |= set(json.loads(get_http_fetcher().fetch_bytes(BOOTSTRAP_ICONS_JSON_URL, max_age=30 * 24 * 3600)))
+    except Exception as e:
+        print(f"Bootstrap Icons 목록 로드 실패 (기본 목록 사용): {str(e)}")
+    
+    # 영문 토큰 → 아이콘 이름 (채워진 아이콘, 짧은 이름 우선)
+    name_tokens = {}
+    for name in sorted(icon_names, key=lambda n: (not n.endswith("-fill"), len(n), n)):
+        for token in name.split("-"):
+            if len(token) > 2 and not token.isdigit():
+                name_tokens.setdefault(token, name)
+    
+    # 길이가 긴 용어부터 부분 일치 검사 ("데이터베이스"가 "데이터"보다 먼저)
+    ordered_terms = sorted(terms, key=len, reverse=True)
+    return {"terms": terms, "ordered_terms": ordered_terms, "ngrams": ngrams,
+            "icon_names": icon_names, "name_tokens": name_tokens}
+
+def _find_icon_term(term, text):
+    """text에서 용어 위치 (한글 용어는 부분 일치, 영문 용어는 단어 단위 일치), 없으면 -1"""
+    if re.search(r"[가-힣]", term):
+        return text.find(term)
+    match = re.search(rf"(?<![a-z0-9]){re.escape(term)}(?![a-z0-9])", text)
+    return match.start() if match else -1
+
+def match_icon_keyword(keyword, index=None):
+    """인덱스 기반 결정적 아이콘 매칭 (일치하는 아이콘이 없으면 None)"""
+    index = index or get_icon_index()
+    normalized = normalize_icon_keyword(keyword)
+    if not normalized:
+        return None
+    terms = index["terms"]
+    
+    # 1. 정확히 일치 / 아이콘 이름 자체
+    if normalized in terms:
+        return terms[normalized]
+    if normalized.replace(" ", "-") in index["icon_names"]:
+        return normalized.replace(" ", "-")
+    
+    # 2. 키워드에 포함된 용어 (긴 용어, 앞쪽 용어 우선), 용어에 포함된 키워드
+    #    ("ai"가 "email"에 걸리지 않도록 영문은 단어 단위로만 일치)
+    positions = {term: _find_icon_term(term, normalized) for term in index["ordered_terms"]}
+    contained = [term for term, position in positions.items() if position >= 0]
+    if contained:
+        return terms[max(contained, key=lambda term: (len(term), -positions[term]))]
+    for term in index["ordered_terms"]:
+        if _find_icon_term(normalized, term) >= 0:
+            return terms[term]
+    
+    # 3. 토큰 단위 일치 (영문 토큰은 아이콘 이름에서 검색)
+    for token in normalized.split():
+        if token in terms:
+            return terms[token]
+        if token in index["name_tokens"]:
+            return index["name_tokens"][token]
+    
+    # 4. 문자 bigram 유사도
+    keyword_grams = _char_ngrams(normalized)
+    candidates = {}
+    for gram in keyword_grams:
+        for term in index["ngrams"].get(gram, ()):
+            candidates[term] = candidates.get(term, 0) + 1
+    best_term, best_score = None, 0.0
+    for term, shared in candidates.items():
+        score = shared / len(keyword_grams | _char_ngrams(term))
+        if score > best_score or (score == best_score and best_term and len(term) > len(best_term)):
+            best_term, best_score = term, score
+    if best_term and best_score >= 0.5:
+        return terms[best_term]
+    return None
+
+@st.cache_resource
+def get_icon_memo():
+    """AI로 결정한 키워드 → 아이콘 매핑 (영구 저장)"""
+    return PersistentCache("icon_memo", max_entries=10000)
+
+def resolve_icon_locally(keyword):
+    """AI 호출 없이 아이콘 결정 (인덱스 매칭 → AI 결과 메모), 없으면 None"""
+    icon = match_icon_keyword(keyword)
+    if icon:
+        return icon
+    normalized = normalize_icon_keyword(keyword)
+    return get_icon_memo().get(normalized) if normalized else DEFAULT_ICON
+
+def remember_icon_choice(keyword, selected_key):
+    """AI가 고른 아이콘 키워드를 아이콘으로 변환해 메모 (다음부터 AI 호출 생략)"""
+    icon = BOOTSTRAP_ICONS.get(selected_key) or match_icon_keyword(selected_key) or DEFAULT_ICON
+    normalized = normalize_icon_keyword(keyword)
+    if normalized:
+        get_icon_memo().set(normalized, icon)
+    return icon
+
+def select_bootstrap_icon(keyword):
+    """키워드를 기반으로 적절한 Bootstrap Icon 선택 (인덱스 매칭 → AI 결과 메모 → AI 호출)"""
+    icon = resolve_icon_locally(keyword)
+    if icon:
+        return icon
     
     # AI를 통한 매칭
     try:
@@ -364,27 +1466,28 @@ def select_bootstrap_icon(keyword):
         
         response = safe_openai_call(
             messages=[{"role": "user", "content": prompt}],
-            model="gpt-4",
-            max_tokens=50
+            task="icon_pick"
         )
         
         if response:
             selected_key = response.choices[0].message.content.strip().strip('"')
-            
-            # 선택된 키워드가 사용 가능한 키워드인지 확인
-            if selected_key in BOOTSTRAP_ICONS:
-                return BOOTSTRAP_ICONS[selected_key]
-            
-            # 부분 매칭 시도
-            for key, icon in BOOTSTRAP_ICONS.items():
-                if key in selected_key or selected_key in key:
-                    return icon
+            return remember_icon_choice(keyword, selected_key)
                 
     except Exception as e:
         print(f"아이콘 선택 오류: {str(e)}")
     
-    # 기본 아이콘 반환
-    return "gear-fill"
+    # 기본 아이콘 반환 (AI 호출 실패 시에는 메모하지 않음)
+    return DEFAULT_ICON
+
+def clean_feature_description(enhanced_desc, feature_desc):
+    """AI 기능 설명 후처리 (따옴표 제거, "기능명: 설명" 형식 정리, 비어 있으면 원래 설명)"""
+    enhanced_desc = (enhanced_desc or "").strip()
+    # 따옴표 제거
+    enhanced_desc = enhanced_desc.replace('"', '').replace("'", '')
+    # 콜론 이후 부분만 추출 (만약 "기능명: 설명" 형식이 나온다면)
+    if ':' in enhanced_desc and enhanced_desc.count(':') == 1:
+        enhanced_desc = enhanced_desc.split(':', 1)[1].strip()
+    return enhanced_desc if enhanced_desc else feature_desc
 
 def generate_enhanced_feature_description(feature_name, feature_desc, material_summary):
     """기능 설명을 AI로 향상시키기 (따옴표 제거, 단일 문장)"""
@@ -411,24 +1514,58 @@ def generate_enhanced_feature_description(feature_name, feature_desc, material_s
     try:
         response = safe_openai_call(
             messages=[{"role": "user", "content": prompt}],
-            model="gpt-4",
-            max_tokens=100
+            task="feature_desc",
+            cache_site="feature_desc"
         )
         
         if response:
-            enhanced_desc = response.choices[0].message.content.strip()
-            # 따옴표 제거
-            enhanced_desc = enhanced_desc.replace('"', '').replace("'", '')
-            # 콜론 이후 부분만 추출 (만약 "기능명: 설명" 형식이 나온다면)
-            if ':' in enhanced_desc and enhanced_desc.count(':') == 1:
-                enhanced_desc = enhanced_desc.split(':', 1)[1].strip()
-            return enhanced_desc if enhanced_desc else feature_desc
+            return clean_feature_description(response.choices[0].message.content, feature_desc)
         else:
             return feature_desc
     except Exception as e:
         print(f"기능 설명 향상 오류: {str(e)}")
         return feature_desc
 
+def normalize_effect_lines(enhanced_text, expected_effects):
+    """AI 기대효과 후처리 - 완성형 문장 보장 (이모티콘, 마침표, 콜론 뒤 공백)"""
+    enhanced_text = (enhanced_text or "").strip()
+    
+    # 응답 후처리 - 완성형 문장 보장
+    lines = [line.strip() for line in enhanced_text.split('\n') if line.strip()]
+    corrected_lines = []
+    
+    for line in lines:
+        # 이모티콘으로 시작하는지 확인
+        if not re.match(r'^[\U0001F300-\U0001F9FF]', line):
+            # 이모티콘이 없으면 적절한 이모티콘 추가
+            if '효율' in line or '관리' in line:
+                line = f"📈 {line}"
+            elif '비용' in line or '절감' in line:
+                line = f"💰 {line}"
+            elif '데이터' in line or '정보' in line:
+                line = f"📊 {line}"
+            elif '속도' in line or '빠른' in line:
+                line = f"⚡ {line}"
+            elif '품질' in line or '향상' in line:
+                line = f"🎯 {line}"
+            else:
+                line = f"🔧 {line}"
+        
+        # 마침표로 끝나는지 확인
+        if not line.endswith('.') and not line.endswith('다') and not line.endswith('니다'):
+            if line.endswith('습니다') or line.endswith('됩니다') or line.endswith('있습니다'):
+                line += "."
+            elif not line.endswith('.'):
+                line += "."
+        
+        # 콜론 뒤에 공백 확인
+        if ':' in line and not ': ' in line:
+            line = line.replace(':', ': ')
+        
+        corrected_lines.append(line)
+    
+    return '\n'.join(corrected_lines) if corrected_lines else expected_effects
+
 def generate_enhanced_expected_effects(expected_effects, material_summary):
     """기대효과를 AI로 향상시키기 (완성형 문장으로 개선)"""
     if not expected_effects.strip():
@@ -461,46 +1598,10 @@ def generate_enhanced_expected_effects(expected_effects, material_summary):
         response = safe_openai_call([
             {"role": "system", "content": "당신은 마케팅 전문가입니다. 기대효과를 구체적이고 설득력 있는 완성형 문장으로 작성해주세요."},
             {"role": "user", "content": prompt}
-        ], max_tokens=800)
+        ], task="expected_effects", cache_site="expected_effects")
         
         if response and response.choices:
-            enhanced_text = response.choices[0].message.content.strip()
-            
-            # 응답 후처리 - 완성형 문장 보장
-            lines = [line.strip() for line in enhanced_text.split('\n') if line.strip()]
-            corrected_lines = []
-            
-            for line in lines:
-                # 이모티콘으로 시작하는지 확인
-                if not re.match(r'^[\U0001F300-\U0001F9FF]', line):
-                    # 이모티콘이 없으면 적절한 이모티콘 추가
-                    if '효율' in line or '관리' in line:
-                        line = f"📈 {line}"
-                    elif '비용' in line or '절감' in line:
-                        line = f"💰 {line}"
-                    elif '데이터' in line or '정보' in line:
-                        line = f"📊 {line}"
-                    elif '속도' in line or '빠른' in line:
-                        line = f"⚡ {line}"
-                    elif '품질' in line or '향상' in line:
-                        line = f"🎯 {line}"
-                    else:
-                        line = f"🔧 {line}"
-                
-                # 마침표로 끝나는지 확인
-                if not line.endswith('.') and not line.endswith('다') and not line.endswith('니다'):
-                    if line.endswith('습니다') or line.endswith('됩니다') or line.endswith('있습니다'):
-                        line += "."
-                    elif not line.endswith('.'):
-                        line += "."
-                
-                # 콜론 뒤에 공백 확인
-                if ':' in line and not ': ' in line:
-                    line = line.replace(':', ': ')
-                
-                corrected_lines.append(line)
-            
-            return '\n'.join(corrected_lines) if corrected_lines else expected_effects
+            return normalize_effect_lines(response.choices[0].message.content, expected_effects)
             
     except Exception as e:
         print(f"기대효과 향상 오류: {str(e)}")
@@ -551,24 +1652,143 @@ def optimize_title_length(title, max_length=20):
     # 여전히 길면 자르기
     return title[:max_length-3] + "..."
 
-def translate_text(text, target_language="en"):
-    """텍스트를 지정된 언어로 번역 (Translation: 텍스트 제거)"""
+# 번역 프롬프트가 바뀌면 버전을 올려 기존 캐시와 분리
+TRANSLATION_PROMPT_VERSION = "v1"
+
+@st.cache_resource
+def get_translation_cache():
+    """번역 캐시 (프로세스당 1회 생성, 30일 TTL)"""
+    return PersistentCache("translations", max_entries=50000, ttl=30 * 24 * 3600)
+
+def translation_model_tag():
+    """번역에 사용하는 라우팅 모델 조합 (라우팅이 바뀌면 번역 캐시도 분리)"""
+    return "+".join(sorted({get_model_route("translate_short")["model"], get_model_route("translate_long")["model"]}))
+
+def translation_cache_key(text, target_language, model=None):
+    """(원문 해시, 대상 언어, 모델, 프롬프트 버전) 기반 캐시 키"""
+    model = model or translation_model_tag()
+    text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return f"{TRANSLATION_PROMPT_VERSION}:{model}:{target_language}:{text_hash}"
+
+def invalidate_translation_cache(target_language=None):
+    """특정 언어(또는 전체)의 번역 캐시 삭제"""
+    get_translation_cache().invalidate(target_language)
+
+# 번역 지원 언어
+TRANSLATION_LANGUAGES = {
+    "en": "영어",
+    "ja": "일본어", 
+    "zh": "중국어",
+    "es": "스페인어",
+    "fr": "프랑스어",
+    "ms": "말레이시아어"  # 말레이시아어 추가
+}
+
+def strip_translation_prefix(translated):
+    """"Translation:", "번역:", "Translated:" 등 접두어 제거"""
+    prefixes_to_remove = [
+        "Translation:", "translation:", "TRANSLATION:",
+        "번역:", "Translated:", "translated:", "TRANSLATED:",
+        "Result:", "result:", "RESULT:"
+    ]
+    
+    for prefix in prefixes_to_remove:
+        if translated.startswith(prefix):
+            translated = translated[len(prefix):].strip()
+    
+    return translated
+
+# 번역하지 않는 브랜드/고유명사 (EDM_DO_NOT_TRANSLATE에 쉼표로 추가)
+DO_NOT_TRANSLATE = {
+    term.strip().casefold()
+    for term in ["㈜웅진", "웅진", "Woongjin", *os.getenv("EDM_DO_NOT_TRANSLATE", "").split(",")]
+    if term.strip()
+}
+
+# 언어와 무관한 세그먼트 (시간/날짜, 전화번호, URL, 이메일)
+NON_LINGUISTIC_PATTERNS = [
+    re.compile(r"^(?=.*\d)[\d\s:./\-~–—()+,]*(?:[ap]\.?m\.?)?[\d\s:./\-~–—()+,]*$", re.IGNORECASE),  # 14:00-15:00, 2025.07.07, 02-2250-1000
+    re.compile(r"^(?:tel|fax|phone|t|f)\s*[.:]?\s*\+?[\d\s().\-]{7,}$", re.IGNORECASE),
+    re.compile(r"^(?:https?://|www\.)\S+$", re.IGNORECASE),
+    re.compile(r"^[\w\-]+(?:\.[\w\-]+)*\.[a-z]{2,}(?:/\S*)?$", re.IGNORECASE),  # woongjin.com/edm
+    re.compile(r"^[\w.+\-]+@[\w\-]+(?:\.[\w\-]+)+$")
+]
+
+HANGUL_PATTERN = re.compile(r"[\uac00-\ud7a3\u3131-\u318e]")
+KANA_PATTERN = re.compile(r"[\u3040-\u30ff]")
+HAN_PATTERN = re.compile(r"[\u4e00-\u9fff]")
+LATIN_WORD_PATTERN = re.compile(r"[a-zà-ÿ]+")
+
+# 영어 CTA 동사/마케팅 문구 ("Learn More", "Get Started Now" 등을 영어로 판별)
+ENGLISH_MARKETING_WORDS = {
+    "get", "start", "started", "learn", "more", "contact", "book", "demo", "register", "sign", "up", "join", "now",
+    "today", "free", "try", "download", "read", "view", "see", "apply", "request", "buy", "shop", "order", "discover",
+    "explore", "subscribe", "click", "here", "new", "details", "info", "information", "welcome", "thank", "thanks",
+    "event", "seminar", "webinar", "invitation", "schedule", "session", "speaker", "agenda", "features", "benefits",
+    "solution", "solutions", "service", "services", "product", "products", "news", "offer", "inquiry", "overview"
+}
+
+# 라틴 문자 언어 판별용 기능어 (단어 단위 언어 식별)
+LATIN_LANGUAGE_PROFILES = {
+    "en": {"the", "a", "an", "and", "or", "of", "to", "for", "with", "your", "our", "us", "is", "are", "be", "in", "on", "at",
+           "by", "from", "this", "it", "you", "we", "will"} | ENGLISH_MARKETING_WORDS,
+    "es": {"el", "la", "los", "las", "de", "del", "y", "para", "con", "su", "sus", "es", "en", "por", "una", "que", "nuestro", "nuestra"},
+    "fr": {"le", "la", "les", "de", "des", "du", "et", "pour", "avec", "votre", "vos", "est", "une", "dans", "sur", "que", "nous", "notre"},
+    "ms": {"dan", "untuk", "dengan", "yang", "anda", "kami", "ini", "di", "ke", "dari", "pada", "akan", "adalah", "lebih", "kepada", "dalam"}
+}
+
+def detect_latin_language(text):
+    """라틴 문자 텍스트의 언어 추정 (기능어 일치 수 기준, 판별 불가 시 None)"""
+    words = LATIN_WORD_PATTERN.findall(text.casefold())
+    scores = {lang: sum(word in profile for word in words) for lang, profile in LATIN_LANGUAGE_PROFILES.items()}
+    best = max(scores, key=scores.get)
+    return best if scores[best] else None
+
+def needs_translation(text, target_language):
+    """번역 API 호출이 필요한 세그먼트인지 로컬에서 판별
+    
+    시간/날짜, 연락처, URL, 이메일, DO_NOT_TRANSLATE 브랜드명, 이미 대상 언어(문자 체계)로 된 텍스트는
+    번역하지 않습니다. 언어를 판별할 수 없는 라틴 문자 텍스트는 번역합니다.
+    """
+    stripped = (text or "").strip()
+    if not stripped:
+        return False
+    if stripped.strip(" .,:;!?·-").casefold() in DO_NOT_TRANSLATE:
+        return False
+    if any(pattern.match(stripped) for pattern in NON_LINGUISTIC_PATTERNS):
+        return False
+    if not re.search(r"[^\W\d_]", stripped):  # 문자 없음 (기호, 이모지 등)
+        return False
+    if HANGUL_PATTERN.search(stripped):
+        return True
+    
+    if KANA_PATTERN.search(stripped):
+        return target_language != "ja"
+    if HAN_PATTERN.search(stripped):
+        return target_language not in ("zh", "ja")
+    
+    return detect_latin_language(stripped) != target_language
+
+def translate_text(text, target_language="en", usage=None):
+    """텍스트를 지정된 언어로 번역 (Translation: 텍스트 제거, usage에 translate_short 사용량 누적)"""
     if not text or not text.strip() or target_language == "ko":
         return text
+    if not needs_translation(text, target_language):
+        return text
     
-    language_map = {
-        "en": "영어",
-        "ja": "일본어", 
-        "zh": "중국어",
-        "es": "스페인어",
-        "fr": "프랑스어",
-        "ms": "말레이시아어"  # 말레이시아어 추가
-    }
+    language_map = TRANSLATION_LANGUAGES
     
     # 지원하지 않는 언어인 경우 원문 반환
     if target_language not in language_map:
         return text
     
+    # 캐시 확인 (반복되는 회사명, 주소, 고정 제목 등)
+    cache = get_translation_cache()
+    cache_key = translation_cache_key(text, target_language)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
     prompt = f"""다음 한국어 텍스트를 {language_map.get(target_language, '영어')}로 번역해주세요. 
 비즈니스 마케팅 맥락을 고려하여 전문적이고 자연스럽게 번역하세요.
 
@@ -581,24 +1801,15 @@ def translate_text(text, target_language="en"):
     try:
         response = safe_openai_call(
             messages=[{"role": "user", "content": prompt}],
-            model="gpt-4",
-            max_tokens=500
+            task="translate_short"
         )
+        record_usage(usage, response, "translate_short")
         
         if response and response.choices and response.choices[0].message.content:
-            translated = response.choices[0].message.content.strip()
-            
-            # "Translation:", "번역:", "Translated:" 등 접두어 제거
-            prefixes_to_remove = [
-                "Translation:", "translation:", "TRANSLATION:",
-                "번역:", "Translated:", "translated:", "TRANSLATED:",
-                "Result:", "result:", "RESULT:"
-            ]
-            
-            for prefix in prefixes_to_remove:
-                if translated.startswith(prefix):
-                    translated = translated[len(prefix):].strip()
+            translated = strip_translation_prefix(response.choices[0].message.content.strip())
             
+            if translated:
+                cache.set(cache_key, translated, namespace=target_language)
             return translated if translated else text
         else:
             print(f"번역 실패: {text[:50]}... (원문 유지)")
@@ -607,6 +1818,234 @@ def translate_text(text, target_language="en"):
         print(f"번역 오류: {str(e)}")
         return text
 
+def parse_json_response(text):
+    """LLM 응답에서 JSON 객체 추출 (```json 블록 또는 첫 '{' ~ 마지막 '}')"""
+    if not text:
+        return None
+    
+    if "```json" in text:
+        json_start = text.find("```json") + 7
+        json_end = text.find("```", json_start)
+        text = text[json_start:json_end if json_end != -1 else None]
+    
+    json_start = text.find("{")
+    json_end = text.rfind("}") + 1
+    if json_start == -1 or json_end <= json_start:
+        return None
+    
+    try:
+        return json.loads(text[json_start:json_end])
+    except json.JSONDecodeError:
+        return None
+
+# 구조화 출력(json_schema) / JSON 모드를 지원하는 모델 (접두어 기준)
+JSON_SCHEMA_MODEL_PREFIXES = ("gpt-4o", "gpt-4.1", "gpt-5", "o1", "o3", "o4")
+JSON_MODE_MODEL_PREFIXES = ("gpt-4-turbo", "gpt-4-1106", "gpt-4-0125", "gpt-3.5-turbo")
+
+def json_response_format(model, name, schema):
+    """모델이 지원하는 응답 형식 (json_schema > json_object > None)"""
+    if model.startswith(JSON_SCHEMA_MODEL_PREFIXES):
+        return {"type": "json_schema", "json_schema": {"name": name, "strict": True, "schema": schema}}
+    if model.startswith(JSON_MODE_MODEL_PREFIXES):
+        return {"type": "json_object"}
+    return None
+
+def string_fields_schema(fields):
+    """필수 문자열 필드로만 구성된 JSON 스키마"""
+    return {
+        "type": "object",
+        "properties": {field: {"type": "string"} for field in fields},
+        "required": list(fields),
+        "additionalProperties": False
+    }
+
+def validate_json_fields(data, schema):
+    """스키마 기준 검증 - (유효한 필드 딕셔너리, 누락/잘못된 필드 목록)"""
+    if not isinstance(data, dict):
+        return {}, list(schema["required"])
+    valid, invalid = {}, []
+    for field in schema["required"]:
+        value = data.get(field)
+        expected = schema["properties"][field].get("type")
+        if expected == "string" and isinstance(value, str) and value.strip():
+            valid[field] = value.strip()
+        elif expected == "array" and isinstance(value, list):
+            valid[field] = value
+        elif expected in ("number", "integer") and isinstance(value, (int, float)) and not isinstance(value, bool):
+            valid[field] = value
+        else:
+            invalid.append(field)
+    return valid, invalid
+
+def request_structured_json(messages, name, schema, task=None, response_text=None, max_repairs=1, **call_kwargs):
+    """스키마 기반 JSON 요청 후 검증, 잘못된 필드만 다시 요청
+    
+    Args:
+        messages: 메시지 리스트
+        name: 스키마 이름
+        schema: JSON 스키마 (필수 필드 목록 포함)
+        task: 작업 이름 (MODEL_ROUTES 키)
+        response_text: 이미 받은 응답 (스트리밍 등) - 있으면 첫 요청 생략
+        max_repairs: 잘못된 필드 재요청 횟수
+    
+    Returns:
+        (유효한 필드 딕셔너리, 끝까지 유효하지 않은 필드 목록)
+    """
+    if response_text is None:
+        response = safe_openai_call(messages, task=task, json_schema=(name, schema), **call_kwargs)
+        response_text = response.choices[0].message.content if response and response.choices else None
+    
+    valid, invalid = validate_json_fields(parse_json_response(response_text), schema)
+    
+    for attempt in range(max_repairs):
+        if not invalid or response_text is None:
+            break
+        print(f"JSON 응답 필드 재요청 ({name}): {invalid} ({attempt + 1}/{max_repairs})")
+        repair_schema = {
+            "type": "object",
+            "properties": {field: schema["properties"][field] for field in invalid},
+            "required": list(invalid),
+            "additionalProperties": False
+        }
+        repair_messages = list(messages) + [
+            {"role": "assistant", "content": response_text},
+            {"role": "user", "content": f"응답에서 다음 필드가 누락되었거나 형식이 잘못되었습니다: {', '.join(invalid)}\n"
+                                        f"이 필드만 포함한 JSON 객체로 다시 응답해주세요."}
+        ]
+        response = safe_openai_call(repair_messages, task=task, json_schema=(f"{name}_repair", repair_schema),
+                                    **call_kwargs)
+        response_text = response.choices[0].message.content if response and response.choices else None
+        repaired, invalid = validate_json_fields(parse_json_response(response_text), repair_schema)
+        valid.update(repaired)
+    
+    return valid, invalid
+
+def _chunk_segments(segment_ids, texts, max_segments=40, max_chars=2500):
+    """세그먼트를 요청 단위(개수/글자 수 제한)로 분할"""
+    chunk, chunk_chars = [], 0
+    for segment_id in segment_ids:
+        length = len(texts[segment_id])
+        if chunk and (len(chunk) >= max_segments or chunk_chars + length > max_chars):
+            yield chunk
+            chunk, chunk_chars = [], 0
+        chunk.append(segment_id)
+        chunk_chars += length
+    if chunk:
+        yield chunk
+
+def _request_batch_translation(segments, target_language, usage=None):
+    """세그먼트 ID → 원문 딕셔너리를 한 번의 JSON 요청으로 번역, 유효한 ID만 반환"""
+    prompt = f"""다음 JSON 객체의 각 값(한국어 텍스트)을 {TRANSLATION_LANGUAGES[target_language]}로 번역해주세요.
+비즈니스 마케팅 맥락을 고려하여 전문적이고 자연스럽게 번역하세요.
+
+규칙:
+- 키(세그먼트 ID)는 절대 변경하지 말고 값만 번역
+- 입력의 모든 키를 빠짐없이 포함
+- 이모티콘, 숫자, URL, 이메일, 전화번호는 그대로 유지
+- "Translation:", "번역:" 등의 접두어는 절대 포함하지 마세요
+
+입력:
+{json.dumps(segments, ensure_ascii=False, indent=1)}
+
+같은 키를 가진 JSON 객체로만 응답해주세요."""
+
+    total_chars = sum(len(text) for text in segments.values())
+    response = safe_openai_call(
+        messages=[{"role": "user", "content": prompt}],
+        max_tokens=min(get_model_route("translate_long").get("max_tokens") or 4000, 200 + total_chars * 3),
+        task="translate_long",
+        temperature=0.3,
+        json_schema=("translation_segments", string_fields_schema(list(segments)))
+    )
+    record_usage(usage, response, "translate_long")
+    
+    if not (response and response.choices and response.choices[0].message.content):
+        return {}
+    
+    data = parse_json_response(response.choices[0].message.content)
+    if not isinstance(data, dict):
+        return {}
+    
+    # 요청한 ID이고 비어있지 않은 문자열인 값만 인정
+    valid = {}
+    for segment_id in segments:
+        value = data.get(segment_id)
+        if isinstance(value, str) and value.strip():
+            valid[segment_id] = strip_translation_prefix(value.strip())
+    return valid
+
+def translate_batch(texts, target_language, max_retries=2, usage=None):
+    """여러 텍스트를 세그먼트 ID 기반 JSON 요청으로 일괄 번역 (입력 순서대로 반환)
+    
+    Args:
+        texts: 번역할 텍스트 리스트
+        target_language: 대상 언어 코드
+        max_retries: 누락된 세그먼트만 다시 요청하는 최대 횟수
+        usage: 토큰 사용량을 누적할 딕셔너리 (선택)
+    
+    Returns:
+        번역된 텍스트 리스트 (번역 실패 시 원문 유지)
+    """
+    texts = list(texts)
+    if target_language == "ko" or target_language not in TRANSLATION_LANGUAGES:
+        return texts
+    
+    cache = get_translation_cache()
+    results = {}
+    pending = {}
+    pending_texts = set()
+    
+    # 중복 제거 + 번역 불필요 세그먼트 통과 + 캐시 조회
+    skipped = 0
+    for text in texts:
+        if not text or not isinstance(text, str) or not text.strip() or text in results or text in pending_texts:
+            continue
+        if not needs_translation(text, target_language):
+            results[text] = text
+            skipped += 1
+            continue
+        cached = cache.get(translation_cache_key(text, target_language))
+        if cached is not None:
+            results[text] = cached
+        else:
+            pending[f"s{len(pending)}"] = text
+            pending_texts.add(text)
+    
+    if skipped:
+        print(f"번역 불필요 세그먼트 {skipped}개 원문 유지 ({target_language})")
+    
+    missing = list(pending)
+    for attempt in range(max_retries + 1):
+        if not missing:
+            break
+        
+        still_missing = []
+        for chunk in _chunk_segments(missing, pending):
+            try:
+                translated = _request_batch_translation({sid: pending[sid] for sid in chunk}, target_language, usage)
+            except Exception as e:
+                print(f"일괄 번역 오류: {str(e)}")
+                translated = {}
+            
+            for segment_id in chunk:
+                if segment_id in translated:
+                    source = pending[segment_id]
+                    results[source] = translated[segment_id]
+                    cache.set(translation_cache_key(source, target_language), translated[segment_id], namespace=target_language)
+                else:
+                    still_missing.append(segment_id)
+        
+        if still_missing:
+            print(f"일괄 번역 누락 세그먼트 {len(still_missing)}개 재요청 ({attempt + 1}/{max_retries + 1})")
+        missing = still_missing
+    
+    # 재시도 후에도 누락된 세그먼트는 개별 번역
+    for segment_id in missing:
+        source = pending[segment_id]
+        results[source] = translate_text(source, target_language, usage=usage)
+    
+    return [results.get(text, text) if isinstance(text, str) else text for text in texts]
+
 def translate_all_content(content, target_language):
     """모든 콘텐츠를 완전히 번역"""
     if target_language == "ko":
@@ -615,13 +2054,12 @@ def translate_all_content(content, target_language):
     # 고정 텍스트들도 번역
     fixed_translations = get_fixed_translations(target_language)
     
-    # 콘텐츠 번역
-    translated_content = {}
-    for key, value in content.items():
-        if value and isinstance(value, str):
-            translated_content[key] = translate_text(value, target_language)
-        else:
-            translated_content[key] = value
+    # 콘텐츠 번역 (문자열 값 일괄 번역)
+    keys = [key for key, value in content.items() if value and isinstance(value, str)]
+    translated_values = translate_batch([content[key] for key in keys], target_language)
+    
+    translated_content = dict(content)
+    translated_content.update(zip(keys, translated_values))
     
     return translated_content, fixed_translations
 
@@ -726,8 +2164,8 @@ def get_fixed_translations(target_language):
 # 자료 처리 함수들
 def extract_text_from_url(url):
     try:
-        response = requests.get(url, timeout=10)
-        soup = BeautifulSoup(response.content, 'html.parser')
+        content = get_http_fetcher().fetch_bytes(url, timeout=10)
+        soup = BeautifulSoup(content, 'html.parser')
         for script in soup(["script", "style"]):
             script.decompose()
         text = soup.get_text()
@@ -776,16 +2214,14 @@ PDF 내용:
 - 비즈니스 B2B 톤으로 전문적으로 작성할 것"""
     
     try:
-        response = safe_openai_call(
-            messages=[{"role": "user", "content": prompt}],
-            model="gpt-4",
-            max_tokens=500
+        structured, invalid_fields = request_structured_json(
+            [{"role": "user", "content": prompt}], "pdf_structure", PDF_STRUCTURE_SCHEMA,
+            task="pdf_structure", cache_site="pdf_structure"
         )
         
-        if response:
-            json_match = re.search(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', response.choices[0].message.content, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group())
+        if structured:
+            structured.update({field: "" for field in invalid_fields})
+            return structured
     except Exception as e:
         print(f"PDF 구조화 오류: {str(e)}")
     
@@ -839,11 +2275,12 @@ def summarize_content(text):
 - 최대 250자 제한"""
     
     try:
-        r = client.chat.completions.create(
-            model="gpt-4", 
+        r = safe_openai_call(
             messages=[{"role": "user", "content": prompt}],
-            max_tokens=300
+            task="summarize"
         )
+        if not r:
+            return "요약 처리 중 오류가 발생했습니다."
         return r.choices[0].message.content.strip()
     except Exception as e:
         st.error(f"요약 처리 오류: {str(e)}")
@@ -898,33 +2335,9 @@ def analyze_svg_brightness(svg_content):
         return 128
 
 def analyze_image_brightness(image_path):
-    """업로드된 이미지의 평균 명도 분석"""
-    try:
-        from PIL import Image
-        import numpy as np
-        
-        # 이미지 로드
-        img = Image.open(image_path)
-        
-        # RGB로 변환
-        if img.mode != 'RGB':
-            img = img.convert('RGB')
-        
-        # 이미지를 작은 크기로 리사이즈 (성능 최적화)
-        img.thumbnail((100, 100))
-        
-        # numpy 배열로 변환
-        img_array = np.array(img)
-        
-        # 각 픽셀의 명도 계산 (Y = 0.299*R + 0.587*G + 0.114*B)
-        brightness = np.dot(img_array[...,:3], [0.299, 0.587, 0.114])
-        
-        # 평균 명도 반환
-        return float(np.mean(brightness))
-        
-    except Exception as e:
-        print(f"이미지 명도 분석 오류: {str(e)}")
-        return 128
+    """업로드된 이미지의 평균 명도 분석 (자산 저장소의 명도 메타데이터 재사용)"""
+    asset = load_image_asset(image_path)
+    return asset['brightness'] if asset else 128
 
 def select_logo_by_background_analysis(theme_color, bg_svg_code, bg_image_path, company_logo_light, company_logo_dark):
     """개선된 배경 분석 기반 로고 선택"""
@@ -987,422 +2400,181 @@ def select_logo_by_brightness(theme_color, light_logo, dark_logo):
     except Exception:
         return light_logo if light_logo else dark_logo
 
-def load_image_from_url(url):
-    """URL에서 이미지를 다운로드하고 base64로 변환"""
-    if not url:
-        return ""
-    
+# 이미지 자산 설정 (최대 크기 / URL 별칭 유지 시간)
+ASSET_MAX_SIZE = (800, 600)
+ASSET_URL_TTL = 24 * 3600
+
+@st.cache_resource
+def get_asset_store():
+    """이미지 자산 저장소 (원본 해시 → 인코딩 결과와 메타데이터, 프로세스당 1회 생성)"""
+    return PersistentCache("assets", max_entries=2000, memory_entries=200)
+
+def encode_image_asset(raw_bytes):
+    """이미지 원본을 1회 처리 (리사이즈/재인코딩 + 크기, 모드, 명도 메타데이터)"""
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
+        import numpy as np
         
-        image = Image.open(io.BytesIO(response.content))
+        image = Image.open(io.BytesIO(raw_bytes))
+        original_mode = image.mode
         
-        max_size = (800, 600)
-        if image.size[0] > max_size[0] or image.size[1] > max_size[1]:
-            image.thumbnail(max_size, Image.Resampling.LANCZOS)
+        if image.size[0] > ASSET_MAX_SIZE[0] or image.size[1] > ASSET_MAX_SIZE[1]:
+            image.thumbnail(ASSET_MAX_SIZE, Image.Resampling.LANCZOS)
         
+        output = io.BytesIO()
         if image.mode in ('RGBA', 'LA'):
-            output = io.BytesIO()
+            image_format = 'PNG'
             image.save(output, format='PNG', optimize=True)
-            output.seek(0)
-            return base64.b64encode(output.getvalue()).decode()
         else:
+            image_format = 'JPEG'
             if image.mode != 'RGB':
                 image = image.convert('RGB')
-            output = io.BytesIO()
             image.save(output, format='JPEG', quality=85, optimize=True)
-            output.seek(0)
-            return base64.b64encode(output.getvalue()).decode()
-            
-    except Exception as e:
-        print(f"URL 이미지 로드 오류: {str(e)}")
-        return ""
-
-def load_image_base64(file_obj_or_url):
-    """파일 객체 또는 URL을 base64로 변환"""
-    if file_obj_or_url is None:
-        return ""
-    
-    # URL인 경우
-    if isinstance(file_obj_or_url, str) and (file_obj_or_url.startswith('http://') or file_obj_or_url.startswith('https://')):
-        return load_image_from_url(file_obj_or_url)
-    
-    # 파일 객체인 경우
-    try:
-        file_obj_or_url.seek(0)
-        image = Image.open(file_obj_or_url)
         
-        max_size = (800, 600)
-        if image.size[0] > max_size[0] or image.size[1] > max_size[1]:
-            image.thumbnail(max_size, Image.Resampling.LANCZOS)
+        # 명도 분석 (analyze_image_brightness와 동일한 방식)
+        sample = image.convert('RGB')
+        sample.thumbnail((100, 100))
+        brightness = float(np.mean(np.dot(np.array(sample)[..., :3], [0.299, 0.587, 0.114])))
         
-        if image.mode in ('RGBA', 'LA'):
-            output = io.BytesIO()
-            image.save(output, format='PNG', optimize=True)
-            output.seek(0)
-            return base64.b64encode(output.getvalue()).decode()
-        else:
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-            output = io.BytesIO()
-            image.save(output, format='JPEG', quality=85, optimize=True)
-            output.seek(0)
-            return base64.b64encode(output.getvalue()).decode()
-            
+        return {
+            'b64': base64.b64encode(output.getvalue()).decode(),
+            'format': image_format,
+            'width': image.size[0],
+            'height': image.size[1],
+            'mode': original_mode,
+            'brightness': brightness
+        }
     except Exception as e:
         print(f"이미지 처리 오류: {str(e)}")
-        try:
-            file_obj_or_url.seek(0)
-            return base64.b64encode(file_obj_or_url.read()).decode()
-        except:
-            return ""
-
-def generate_enhanced_banner_svg(tone, color1, color2, bg_elements):
-    """AI 학습 개선된 배너 SVG 생성 (배경 효과별 전문 프롬프트)"""
-    
-    # 배경 효과별 전문 프롬프트 템플릿
-    effect_templates = {
-        "gradient": {
-            "description": "smooth linear and radial gradients with subtle color transitions",
-            "technical_specs": """
-            - Use linearGradient and radialGradient elements
-            - Apply multiple color stops with opacity variations
-            - Create depth with overlapping gradients
-            - Use transform attributes for dynamic angles
-            """,
-            "example_code": f"""
-            <defs>
-                <linearGradient id="grad1" x1="0%" y1="0%" x2="100%" y2="100%">
-                    <stop offset="0%" style="stop-color:{color1};stop-opacity:1" />
-                    <stop offset="50%" style="stop-color:{color1};stop-opacity:0.8" />
-                    <stop offset="100%" style="stop-color:{color2};stop-opacity:1" />
-                </linearGradient>
-                <radialGradient id="grad2" cx="30%" cy="30%">
-                    <stop offset="0%" style="stop-color:{color1};stop-opacity:0.3" />
-                    <stop offset="100%" style="stop-color:{color2};stop-opacity:0.1" />
-                </radialGradient>
-            </defs>
-            """
-        },
-        "sparkles": {
-            "description": "small sparkling star-like elements scattered across the background",
-            "technical_specs": """
-            - Use <circle> and <polygon> elements for sparkle shapes
-            - Apply random positioning with transform translate
-            - Use opacity and scale animations if needed
-            - Size range: 2-8px for sparkles
-            - Density: 15-25 sparkles total
-            """,
-            "example_code": f"""
-            <circle cx="50" cy="30" r="2" fill="{color1}" opacity="0.8"/>
-            <polygon points="100,20 102,26 108,26 103,30 105,36 100,32 95,36 97,30 92,26 98,26" 
-                     fill="{color2}" opacity="0.6" transform="scale(0.5)"/>
-            """
-        },
-        "bokeh": {
-            "description": "soft, blurred circular light effects with varying sizes and opacity",
-            "technical_specs": """
-            - Use <circle> elements with blur filters
-            - Apply Gaussian blur filter (stdDeviation: 3-8)
-            - Varying circle sizes: 20-80px radius
-            - Opacity range: 0.1-0.4
-            - Overlapping circles for depth effect
-            """,
-            "example_code": f"""
-            <defs>
-                <filter id="blur1">
-                    <feGaussianBlur stdDeviation="5"/>
-                </filter>
-            </defs>
-            <circle cx="150" cy="50" r="40" fill="{color1}" opacity="0.3" filter="url(#blur1)"/>
-            <circle cx="300" cy="120" r="25" fill="{color2}" opacity="0.2" filter="url(#blur1)"/>
-            """
-        },
-        "lines": {
-            "description": "flowing curved lines and smooth wave patterns",
-            "technical_specs": """
-            - Use <path> elements with smooth curves (cubic bezier)
-            - Apply stroke-width: 2-4px
-            - Use stroke-linecap: round
-            - Create flowing S-curves and wave patterns
-            - Vary opacity: 0.2-0.6
-            """,
-            "example_code": f"""
-            <path d="M0,100 Q175,50 350,100 T700,100" 
-                  stroke="{color1}" stroke-width="3" fill="none" opacity="0.4" stroke-linecap="round"/>
-            <path d="M0,150 Q200,80 400,150 T700,120" 
-                  stroke="{color2}" stroke-width="2" fill="none" opacity="0.3" stroke-linecap="round"/>
-            """
-        },
-        "abstract": {
-            "description": "geometric shapes with subtle glow effects and modern composition",
-            "technical_specs": """
-            - Use <rect>, <circle>, <polygon> with rounded corners
-            - Apply subtle drop-shadow filters
-            - Use transform: rotate() for dynamic angles
-            - Opacity: 0.1-0.3 for subtlety
-            - Geometric harmony with golden ratio proportions
-            """,
-            "example_code": f"""
-            <defs>
-                <filter id="glow">
-                    <feGaussianBlur stdDeviation="3"/>
-                    <feColorMatrix values="1 0 0 0 0  0 1 0 0 0  0 0 1 0 0  0 0 0 1 0"/>
-                </filter>
-            </defs>
-            <rect x="500" y="20" width="120" height="80" rx="10" 
-                  fill="{color1}" opacity="0.2" transform="rotate(15 560 60)" filter="url(#glow)"/>
-            """
+        return {
+            'b64': base64.b64encode(raw_bytes).decode(),
+            'format': None,
+            'width': None,
+            'height': None,
+            'mode': None,
+            'brightness': 128
         }
-    }
-    
-    # 선택된 배경 효과 분석
-    selected_effects = []
-    for element in bg_elements:
-        if "gradient" in element.lower():
-            selected_effects.append("gradient")
-        elif "sparkles" in element.lower():
-            selected_effects.append("sparkles")
-        elif "bokeh" in element.lower():
-            selected_effects.append("bokeh")
-        elif "lines" in element.lower():
-            selected_effects.append("lines")
-        elif "abstract" in element.lower():
-            selected_effects.append("abstract")
-    
-    # 기본값 설정
-    if not selected_effects:
-        selected_effects = ["gradient"]
-    
-    # 선택된 효과들의 상세 설명 조합
-    combined_description = []
-    combined_specs = []
-    combined_examples = []
-    
-    for effect in selected_effects:
-        if effect in effect_templates:
-            template = effect_templates[effect]
-            combined_description.append(template["description"])
-            combined_specs.append(template["technical_specs"])
-            combined_examples.append(template["example_code"])
-    
-    # Few-Shot Learning 프롬프트 구성
-    prompt = f"""You are an expert SVG designer specializing in professional B2B marketing backgrounds. 
-Create a sophisticated banner SVG (700x200px) for business email headers.
-
-DESIGN BRIEF:
-- Theme: {tone}
-- Primary color: {color1}
-- Secondary color: {color2}
-- Effects requested: {', '.join(selected_effects)}
-
-DETAILED REQUIREMENTS:
-{chr(10).join(combined_description)}
-
-TECHNICAL SPECIFICATIONS:
-{chr(10).join(combined_specs)}
-
-REFERENCE EXAMPLES:
-{chr(10).join(combined_examples)}
 
-CRITICAL RULES:
-1. NO TEXT ELEMENTS - Pure visual design only
-2. Professional B2B aesthetic - avoid childish or overly decorative elements
-3. Maintain visual hierarchy - background should not overpower content
-4. Use provided colors as primary palette
-5. Ensure scalability and clean rendering
-6. Output complete, valid SVG code only
+def get_image_asset(raw_bytes):
+    """원본 바이트의 해시로 자산 조회 (없으면 1회 처리 후 저장)"""
+    store = get_asset_store()
+    digest = hashlib.sha256(raw_bytes).hexdigest()
+    asset = store.get(f"asset:{digest}")
+    if asset is None:
+        asset = encode_image_asset(raw_bytes)
+        asset['hash'] = digest
+        store.set(f"asset:{digest}", asset, namespace="asset")
+    return asset
 
-QUALITY STANDARDS:
-- Clean, semantic SVG structure
-- Optimized for email rendering
-- Cross-browser compatibility
-- Elegant and minimalist approach
-
-Generate the complete SVG code now:"""
+def _asset_alias(source):
+    """원본 식별자 (URL / 업로드 파일 ID / 파일 경로+수정시각) → (별칭 키, TTL)"""
+    if isinstance(source, str):
+        if source.startswith('http://') or source.startswith('https://'):
+            return f"url:{source}", ASSET_URL_TTL
+        if os.path.exists(source):
+            stat = os.stat(source)
+            return f"path:{os.path.abspath(source)}:{stat.st_mtime_ns}:{stat.st_size}", None
+        return None, None
+    file_id = getattr(source, 'file_id', None)
+    if file_id:
+        return f"upload:{file_id}", None
+    return None, None
 
-    try:
-        # 최대 3번 시도로 품질 향상
-        max_attempts = 3
-        best_svg = None
-        
-        for attempt in range(max_attempts):
-            response = safe_openai_call(
-                messages=[
-                    {"role": "system", "content": "You are a professional SVG designer with expertise in B2B marketing visuals. Focus on creating clean, elegant, and technically sound SVG code."},
-                    {"role": "user", "content": prompt}
-                ],
-                model="gpt-4",
-                max_tokens=1500,
-                temperature=0.3  # 낮은 temperature로 일관성 향상
-            )
-            
-            if response and response.choices:
-                svg_content = response.choices[0].message.content
-                
-                # 생성 로그 기록
-                print(f"SVG 생성 시도 {attempt + 1}: 효과={selected_effects}, 길이={len(svg_content)}")
-                
-                # SVG 품질 검증
-                if validate_svg_quality(svg_content, selected_effects):
-                    # 텍스트 요소 제거
-                    svg_content = re.sub(r'<text[^>]*>.*?</text>', '', svg_content, flags=re.IGNORECASE | re.DOTALL)
-                    svg_content = re.sub(r'your text here', '', svg_content, flags=re.IGNORECASE)
-                    
-                    svg_match = re.search(r"<svg[\s\S]*?</svg>", svg_content)
-                    if svg_match:
-                        best_svg = svg_match.group()
-                        print(f"✅ SVG 품질 검증 통과 (시도 {attempt + 1})")
-                        break  # 품질 검증 통과 시 즉시 반환
-                else:
-                    print(f"❌ SVG 품질 검증 실패 (시도 {attempt + 1})")
-                
-                # 재시도를 위한 프롬프트 개선
-                if attempt < max_attempts - 1:
-                    prompt += f"\n\nPREVIOUS ATTEMPT FAILED QUALITY CHECK. Please focus more on: {', '.join(selected_effects)} effects with higher precision."
-        
-        if best_svg:
-            return best_svg
-            
-    except Exception as e:
-        print(f"배너 SVG 생성 오류: {str(e)}")
-    
-    # 고품질 기본 배너 반환 (효과별 맞춤형)
-    return generate_fallback_svg(color1, color2, selected_effects)
+def _read_asset_source(source):
+    """URL 다운로드 / 파일 경로 / 파일 객체에서 원본 바이트 읽기"""
+    if isinstance(source, str):
+        if source.startswith('http://') or source.startswith('https://'):
+            return get_http_fetcher().fetch_bytes(source, timeout=10)
+        with open(source, 'rb') as f:
+            return f.read()
+    source.seek(0)
+    return source.read()
 
-def validate_svg_quality(svg_content, expected_effects):
-    """SVG 품질 검증 - 요청된 효과가 제대로 구현되었는지 확인"""
-    if not svg_content or len(svg_content.strip()) < 100:
-        return False
-    
-    if not re.search(r'<svg[^>]*>', svg_content, re.IGNORECASE):
-        return False
-    
-    quality_score = 0
-    total_checks = len(expected_effects)
-    
-    for effect in expected_effects:
-        if effect == "gradient":
-            if re.search(r'<linearGradient|<radialGradient', svg_content, re.IGNORECASE):
-                quality_score += 1
-        elif effect == "sparkles":
-            if re.search(r'<circle[^>]*r=["\']?[1-8]["\']?|<polygon', svg_content, re.IGNORECASE):
-                quality_score += 1
-        elif effect == "bokeh":
-            if re.search(r'<filter|feGaussianBlur', svg_content, re.IGNORECASE) and re.search(r'<circle', svg_content, re.IGNORECASE):
-                quality_score += 1
-        elif effect == "lines":
-            if re.search(r'<path[^>]*d=', svg_content, re.IGNORECASE):
-                quality_score += 1
-        elif effect == "abstract":
-            if re.search(r'<rect|<polygon|<circle', svg_content, re.IGNORECASE):
-                quality_score += 1
+def load_image_asset(source):
+    """파일 객체/URL/경로 → 이미지 자산 (같은 원본은 다시 읽거나 처리하지 않음)
     
-    if re.search(r'<text[^>]*>', svg_content, re.IGNORECASE):
-        quality_score -= 1
+    Returns:
+        dict: b64, format, width, height, mode, brightness, hash (실패 시 None)
+    """
+    if not source:
+        return None
     
-    return (quality_score / max(total_checks, 1)) >= 0.7
-
-def generate_fallback_svg(color1, color2, selected_effects):
-    """고품질 기본 SVG 생성 - 효과별 맞춤형"""
+    store = get_asset_store()
+    alias_key, alias_ttl = _asset_alias(source)
+    if alias_key:
+        digest = store.get(alias_key, ttl=alias_ttl)
+        if digest:
+            asset = store.get(f"asset:{digest}")
+            if asset is not None:
+                return asset
     
-    # 효과별 맞춤형 기본 SVG 템플릿
-    if "sparkles" in selected_effects:
-        return f"""<svg viewBox="0 0 700 200" xmlns="http://www.w3.org/2000/svg">
-            <defs>
-                <linearGradient id="grad1" x1="0%" y1="0%" x2="100%" y2="100%">
-                    <stop offset="0%" style="stop-color:{color1};stop-opacity:0.8" />
-                    <stop offset="100%" style="stop-color:{color2};stop-opacity:0.6" />
-                </linearGradient>
-            </defs>
-            <rect width="700" height="200" fill="url(#grad1)" />
-            <circle cx="100" cy="40" r="2" fill="white" opacity="0.8"/>
-            <circle cx="200" cy="80" r="1.5" fill="white" opacity="0.6"/>
-            <circle cx="350" cy="30" r="2.5" fill="white" opacity="0.7"/>
-            <circle cx="500" cy="60" r="1" fill="white" opacity="0.9"/>
-            <circle cx="600" cy="45" r="2" fill="white" opacity="0.5"/>
-            <polygon points="150,120 152,126 158,126 153,130 155,136 150,132 145,136 147,130 142,126 148,126" 
-                     fill="white" opacity="0.6" transform="scale(0.8)"/>
-            <polygon points="450,140 452,146 458,146 453,150 455,156 450,152 445,156 447,150 442,146 448,146" 
-                     fill="white" opacity="0.4" transform="scale(0.6)"/>
-        </svg>"""
-    
-    elif "bokeh" in selected_effects:
-        return f"""<svg viewBox="0 0 700 200" xmlns="http://www.w3.org/2000/svg">
-            <defs>
-                <linearGradient id="grad1" x1="0%" y1="0%" x2="100%" y2="0%">
-                    <stop offset="0%" style="stop-color:{color1};stop-opacity:1" />
-                    <stop offset="100%" style="stop-color:{color2};stop-opacity:1" />
-                </linearGradient>
-                <filter id="blur1">
-                    <feGaussianBlur stdDeviation="4"/>
-                </filter>
-                <filter id="blur2">
-                    <feGaussianBlur stdDeviation="6"/>
-                </filter>
-            </defs>
-            <rect width="700" height="200" fill="url(#grad1)" />
-            <circle cx="150" cy="60" r="30" fill="{color1}" opacity="0.3" filter="url(#blur1)"/>
-            <circle cx="400" cy="120" r="40" fill="{color2}" opacity="0.2" filter="url(#blur2)"/>
-            <circle cx="550" cy="50" r="25" fill="{color1}" opacity="0.25" filter="url(#blur1)"/>
-            <circle cx="80" cy="140" r="35" fill="{color2}" opacity="0.15" filter="url(#blur2)"/>
-        </svg>"""
-    
-    elif "lines" in selected_effects:
-        return f"""<svg viewBox="0 0 700 200" xmlns="http://www.w3.org/2000/svg">
-            <defs>
-                <linearGradient id="grad1" x1="0%" y1="0%" x2="100%" y2="0%">
-                    <stop offset="0%" style="stop-color:{color1};stop-opacity:1" />
-                    <stop offset="100%" style="stop-color:{color2};stop-opacity:1" />
-                </linearGradient>
-            </defs>
-            <rect width="700" height="200" fill="url(#grad1)" />
-            <path d="M0,100 Q175,60 350,100 T700,80" 
-                  stroke="white" stroke-width="2" fill="none" opacity="0.4" stroke-linecap="round"/>
-            <path d="M0,140 Q200,100 400,140 T700,120" 
-                  stroke="white" stroke-width="1.5" fill="none" opacity="0.3" stroke-linecap="round"/>
-            <path d="M0,60 Q150,20 300,60 T700,40" 
-                  stroke="white" stroke-width="1" fill="none" opacity="0.5" stroke-linecap="round"/>
-        </svg>"""
-    
-    elif "abstract" in selected_effects:
-        return f"""<svg viewBox="0 0 700 200" xmlns="http://www.w3.org/2000/svg">
-            <defs>
-                <linearGradient id="grad1" x1="0%" y1="0%" x2="100%" y2="100%">
-                    <stop offset="0%" style="stop-color:{color1};stop-opacity:1" />
-                    <stop offset="100%" style="stop-color:{color2};stop-opacity:1" />
-                </linearGradient>
-                <filter id="glow">
-                    <feGaussianBlur stdDeviation="2"/>
-                </filter>
-            </defs>
-            <rect width="700" height="200" fill="url(#grad1)" />
-            <rect x="500" y="30" width="100" height="60" rx="8" 
-                  fill="white" opacity="0.15" transform="rotate(12 550 60)" filter="url(#glow)"/>
-            <circle cx="150" cy="50" r="25" fill="white" opacity="0.1" filter="url(#glow)"/>
-            <polygon points="300,120 350,100 400,120 375,160 325,160" 
-                     fill="white" opacity="0.08" filter="url(#glow)"/>
-        </svg>"""
-    
-    else:  # 기본 그라데이션
-        return f"""<svg viewBox="0 0 700 200" xmlns="http://www.w3.org/2000/svg">
-            <defs>
-                <linearGradient id="grad1" x1="0%" y1="0%" x2="100%" y2="0%">
-                    <stop offset="0%" style="stop-color:{color1};stop-opacity:1" />
-                    <stop offset="50%" style="stop-color:{color1};stop-opacity:0.8" />
-                    <stop offset="100%" style="stop-color:{color2};stop-opacity:1" />
-                </linearGradient>
-                <radialGradient id="grad2" cx="70%" cy="30%">
-                    <stop offset="0%" style="stop-color:{color2};stop-opacity:0.3" />
-                    <stop offset="100%" style="stop-color:{color1};stop-opacity:0.1" />
-                </radialGradient>
-            </defs>
-            <rect width="700" height="200" fill="url(#grad1)" />
-            <rect width="700" height="200" fill="url(#grad2)" />
-        </svg>"""
+    try:
+        raw_bytes = _read_asset_source(source)
+    except Exception as e:
+        print(f"이미지 로드 오류: {str(e)}")
+        return None
+    if not raw_bytes:
+        return None
+    
+    asset = get_image_asset(raw_bytes)
+    if alias_key:
+        store.set(alias_key, asset['hash'], namespace="alias")
+    return asset
+
+def load_image_from_url(url):
+    """URL에서 이미지를 다운로드하고 base64로 변환"""
+    if not url:
+        return ""
+    asset = load_image_asset(url)
+    return asset['b64'] if asset else ""
+
+def load_image_base64(file_obj_or_url):
+    """파일 객체 또는 URL을 base64로 변환 (자산 저장소 재사용)"""
+    if file_obj_or_url is None:
+        return ""
+    asset = load_image_asset(file_obj_or_url)
+    return asset['b64'] if asset else ""
+
+def normalize_bg_effects(bg_elements):
+    """UI 배경 효과 설명을 효과 키(gradient/sparkles/bokeh/lines/abstract)로 변환"""
+    selected_effects = []
+    for element in bg_elements or []:
+        if "gradient" in element.lower():
+            selected_effects.append("gradient")
+        elif "sparkles" in element.lower():
+            selected_effects.append("sparkles")
+        elif "bokeh" in element.lower():
+            selected_effects.append("bokeh")
+        elif "lines" in element.lower():
+            selected_effects.append("lines")
+        elif "abstract" in element.lower():
+            selected_effects.append("abstract")
+    return selected_effects
+
+def select_banner_tone(bg_elements):
+    """배경 효과에 따른 배너 톤 결정"""
+    selected_effects = normalize_bg_effects(bg_elements)
+    if "sparkles" in selected_effects or "bokeh" in selected_effects:
+        return "bright and fresh"
+    elif "lines" in selected_effects or "abstract" in selected_effects:
+        return "tech-inspired"
+    return "clean and professional"
 
-    """AI 학습 개선된 배너 SVG 생성 (배경 효과별 전문 프롬프트)"""
+# 배너 SVG 후보 수와 후보별 temperature (EDM_SVG_CANDIDATES로 조정)
+SVG_CANDIDATE_COUNT = int(os.getenv("EDM_SVG_CANDIDATES", "3"))
+SVG_CANDIDATE_TEMPERATURES = (0.3, 0.5, 0.7, 0.9)
+
+def generate_enhanced_banner_svg(tone, color1, color2, bg_elements):
+    """AI 학습 개선된 배너 SVG 생성 (배너 풀에서 즉시 제공, 풀이 비어 있으면 직접 생성)"""
+    selected_effects = normalize_bg_effects(bg_elements) or ["gradient"]
+    svg_code = get_banner_pool().serve("llm", tone, color1, color2, selected_effects)
+    # 고품질 기본 배너 반환 (효과별 맞춤형)
+    return svg_code or generate_fallback_svg(color1, color2, selected_effects)
+
+def request_enhanced_banner_svg(tone, color1, color2, bg_elements, bypass_cache=None, candidate_count=None):
+    """배경 효과별 전문 프롬프트로 SVG 후보를 요청해 최고 후보 반환 (모두 실패 시 None)
+    
+    candidate_count가 주어지면 SVG_CANDIDATE_COUNT 대신 해당 수만큼만 후보를 요청합니다 (배너 풀 채우기는 1개).
+    """
     
     # 배경 효과별 전문 프롬프트 템플릿
     effect_templates = {
@@ -1565,77 +2737,680 @@ QUALITY STANDARDS:
 
 Generate the complete SVG code now:"""
 
+    messages = [
+        {"role": "system", "content": "You are a professional SVG designer with expertise in B2B marketing visuals. Focus on creating clean, elegant, and technically sound SVG code."},
+        {"role": "user", "content": prompt}
+    ]
+    
+    # 후보를 동시에 요청 (temperature를 달리해 다양성 확보, 낮은 값부터 일관성 우선)
+    temperatures = SVG_CANDIDATE_TEMPERATURES[:max(1, candidate_count or SVG_CANDIDATE_COUNT)]
+    
+    def request_candidate(temperature):
+        response = safe_openai_call(
+            messages=messages,
+            task="svg_banner",
+            temperature=temperature,
+            cache_site="banner_svg",
+            bypass_cache=bypass_cache
+        )
+        if response and response.choices:
+            return response.choices[0].message.content
+        return None
+    
+    best_svg, best_score = None, float("-inf")
+    executor = ThreadPoolExecutor(
+        max_workers=len(temperatures),
+        initializer=_attach_script_run_ctx,
+        initargs=(_current_script_run_ctx(),)
+    )
     try:
-        # 최대 3번 시도로 품질 향상
-        max_attempts = 3
-        best_svg = None
-        
-        for attempt in range(max_attempts):
-            response = safe_openai_call(
-                messages=[
-                    {"role": "system", "content": "You are a professional SVG designer with expertise in B2B marketing visuals. Focus on creating clean, elegant, and technically sound SVG code."},
-                    {"role": "user", "content": prompt}
-                ],
-                model="gpt-4",
-                max_tokens=1500,
-                temperature=0.3  # 낮은 temperature로 일관성 향상
-            )
-            
-            if response and response.choices:
-                svg_content = response.choices[0].message.content
-                
-                # 생성 로그 기록
-                print(f"SVG 생성 시도 {attempt + 1}: 효과={selected_effects}, 길이={len(svg_content)}")
-                
-                # SVG 품질 검증
-                if validate_svg_quality(svg_content, selected_effects):
-                    # 텍스트 요소 제거
-                    svg_content = re.sub(r'<text[^>]*>.*?</text>', '', svg_content, flags=re.IGNORECASE | re.DOTALL)
-                    svg_content = re.sub(r'your text here', '', svg_content, flags=re.IGNORECASE)
-                    
-                    svg_match = re.search(r"<svg[\s\S]*?</svg>", svg_content)
-                    if svg_match:
-                        best_svg = svg_match.group()
-                        print(f"✅ SVG 품질 검증 통과 (시도 {attempt + 1})")
-                        break  # 품질 검증 통과 시 즉시 반환
-                else:
-                    print(f"❌ SVG 품질 검증 실패 (시도 {attempt + 1})")
-                
-                # 재시도를 위한 프롬프트 개선
-                if attempt < max_attempts - 1:
-                    prompt += f"\n\nPREVIOUS ATTEMPT FAILED QUALITY CHECK. Please focus more on: {', '.join(selected_effects)} effects with higher precision."
-        
-        if best_svg:
-            return best_svg
+        futures = {executor.submit(request_candidate, t): t for t in temperatures}
+        for future in as_completed(futures):
+            try:
+                svg_content = future.result()
+            except Exception as e:
+                print(f"배너 SVG 생성 오류: {str(e)}")
+                continue
+            if not svg_content:
+                continue
             
-    except Exception as e:
-        print(f"배너 SVG 생성 오류: {str(e)}")
+            svg_code, score, passed = score_svg_candidate(svg_content, selected_effects)
+            print(f"SVG 후보 (temperature={futures[future]}): 효과={selected_effects}, 길이={len(svg_content)}, 점수={score}")
+            if svg_code and score > best_score:
+                best_svg, best_score = svg_code, score
+            if passed:
+                # 첫 통과 후보로 즉시 반환 (나머지 후보 결과는 기다리지 않음)
+                print(f"✅ SVG 품질 검증 통과 (temperature={futures[future]})")
+                return svg_code
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
     
-    # 고품질 기본 배너 반환 (효과별 맞춤형)
-    return generate_fallback_svg(color1, color2, selected_effects)
+    if best_svg:
+        print(f"⚠️ 품질 검증을 통과한 후보 없음, 최고 점수 후보 사용 (점수={best_score:.2f})")
+    return best_svg
 
-def generate_edm_content(edm_data, material_summary="", structured_pdf_content=None):
-    """EDM 콘텐츠 생성 함수 (구조화된 PDF 내용 활용)"""
-    edm_type = edm_data.get('edm_type')
-    core = edm_data.get('core')
-    target = edm_data.get('target')
-    title_suggestion = edm_data.get('title_suggestion', '')
+def score_svg_candidate(svg_content, expected_effects):
+    """배너 SVG 후보 정리 및 점수 계산 (효과 구현도 + 구조 검사)
     
-    # PDF 구조화 내용 활용 (문장 끊김 방지)
-    pdf_hint = ""
-    if structured_pdf_content:
-        pdf_desc = structured_pdf_content.get('product_desc', '')
-        pdf_features = structured_pdf_content.get('features', '')
-        pdf_benefits = structured_pdf_content.get('benefits', '')
-        
-        if pdf_desc or pdf_features or pdf_benefits:
-            pdf_hint = f"""
+    Returns:
+        (정리된 SVG 코드 또는 None, 점수, 품질 검증 통과 여부)
+    """
+    # 텍스트 요소 제거
+    svg_content = re.sub(r'<text[^>]*>.*?</text>', '', svg_content or "", flags=re.IGNORECASE | re.DOTALL)
+    svg_content = re.sub(r'your text here', '', svg_content, flags=re.IGNORECASE)
+    
+    svg_match = re.search(r"<svg[\s\S]*?</svg>", svg_content)
+    if not svg_match:
+        return None, float("-inf"), False
+    svg_code = svg_match.group()
+    
+    # 구조 검사: 올바른 XML이 아니거나 스크립트/외부 참조가 있으면 사용 불가
+    try:
+        ET.fromstring(svg_code)
+    except ET.ParseError:
+        return None, float("-inf"), False
+    if re.search(r'<script|<foreignObject|xlink:href=["\']https?:', svg_code, re.IGNORECASE):
+        return None, float("-inf"), False
+    
+    # 효과 구현도에 viewBox 누락, 이메일에 과도한 크기 감점
+    score = svg_effect_score(svg_code, expected_effects)
+    if not re.search(r'viewBox=', svg_code):
+        score -= 0.2
+    if len(svg_code) > 20000:
+        score -= 0.3
+    
+    return svg_code, score, validate_svg_quality(svg_code, expected_effects)
+
+def svg_effect_score(svg_content, expected_effects):
+    """요청된 효과 구현 비율 (0~1, 텍스트 요소가 있으면 감점)"""
+    quality_score = 0
+    total_checks = len(expected_effects)
+    
+    for effect in expected_effects:
+        if effect == "gradient":
+            if re.search(r'<linearGradient|<radialGradient', svg_content, re.IGNORECASE):
+                quality_score += 1
+        elif effect == "sparkles":
+            if re.search(r'<circle[^>]*r=["\']?[1-8]["\']?|<polygon', svg_content, re.IGNORECASE):
+                quality_score += 1
+        elif effect == "bokeh":
+            if re.search(r'<filter|feGaussianBlur', svg_content, re.IGNORECASE) and re.search(r'<circle', svg_content, re.IGNORECASE):
+                quality_score += 1
+        elif effect == "lines":
+            if re.search(r'<path[^>]*d=', svg_content, re.IGNORECASE):
+                quality_score += 1
+        elif effect == "abstract":
+            if re.search(r'<rect|<polygon|<circle', svg_content, re.IGNORECASE):
+                quality_score += 1
+    
+    if re.search(r'<text[^>]*>', svg_content, re.IGNORECASE):
+        quality_score -= 1
+    
+    return quality_score / max(total_checks, 1)
+
+def validate_svg_quality(svg_content, expected_effects):
+    """SVG 품질 검증 - 요청된 효과가 제대로 구현되었는지 확인"""
+    if not svg_content or len(svg_content.strip()) < 100:
+        return False
+    
+    if not re.search(r'<svg[^>]*>', svg_content, re.IGNORECASE):
+        return False
+    
+    return svg_effect_score(svg_content, expected_effects) >= 0.7
+
+# 배너 생성 방식 (procedural: 로컬 절차적 생성, scene: AI 장면 JSON + 로컬 렌더링, llm: AI SVG 생성)
+BANNER_MODES = {
+    "procedural": "⚡ 즉시 생성 (API 비용 없음)",
+    "scene": "🧩 AI 장면 설계 (빠름)",
+    "llm": "🤖 AI 생성"
+}
+DEFAULT_BANNER_MODE = os.getenv("EDM_BANNER_MODE", "procedural")
+
+BANNER_WIDTH, BANNER_HEIGHT = 700, 200
+
+def banner_seed(color1, color2, selected_effects, seed=0):
+    """색상/효과/사용자 시드로 결정되는 32비트 난수 시드 (같은 입력이면 같은 배너)"""
+    key = f"{color1}|{color2}|{','.join(selected_effects)}|{seed}"
+    return int(hashlib.sha256(key.encode("utf-8")).hexdigest()[:8], 16)
+
+def _fmt(value):
+    """SVG 좌표 값 문자열 (소수점 1자리, 불필요한 0 제거)"""
+    return f"{value:.1f}".rstrip("0").rstrip(".")
+
+def poisson_disk_points(rng, width, height, min_dist, max_points, batch=64, max_batches=30):
+    """최소 간격을 보장하는 점 샘플링 (배치 단위 다트 던지기, 벡터 연산)
+    
+    후보를 배치로 뽑아 이미 채택된 점, 같은 배치의 앞선 후보와의 거리를 한 번에 검사합니다.
+    """
+    import numpy as np
+    
+    points = np.empty((0, 2))
+    for _ in range(max_batches):
+        if len(points) >= max_points:
+            break
+        candidates = rng.uniform((0, 0), (width, height), size=(batch, 2))
+        if len(points):
+            dist = np.linalg.norm(candidates[:, None, :] - points[None, :, :], axis=2)
+            candidates = candidates[(dist >= min_dist).all(axis=1)]
+        if len(candidates) > 1:
+            # 같은 배치 안에서는 앞선 후보와 가까운 후보 제외 (보수적 판정)
+            inner = np.linalg.norm(candidates[:, None, :] - candidates[None, :, :], axis=2)
+            conflict = np.triu(inner < min_dist, k=1).any(axis=0)
+            candidates = candidates[~conflict]
+        points = np.vstack([points, candidates])
+    return points[:max_points]
+
+def _sparkle_elements(rng, color1, color2):
+    """반짝이: 포아송 디스크 배치 + 크기/투명도 분포, 일부는 별 모양"""
+    import numpy as np
+    
+    count = int(rng.integers(15, 26))
+    points = poisson_disk_points(rng, BANNER_WIDTH, BANNER_HEIGHT, min_dist=38, max_points=count)
+    radii = rng.uniform(1.0, 3.0, size=len(points))
+    opacity = rng.beta(5, 2, size=len(points)) * 0.8 + 0.1
+    is_star = rng.random(len(points)) < 0.3
+    
+    # 4각 별 꼭짓점 (외곽/내곽 반지름 교차)
+    angles = np.arange(8) * np.pi / 4 - np.pi / 2
+    scale = np.where(np.arange(8) % 2 == 0, 1.0, 0.35)
+    
+    elements = []
+    for (x, y), r, alpha, star in zip(points, radii, opacity, is_star):
+        fill = "white" if rng.random() < 0.7 else color1
+        if star:
+            size = r * 2.5
+            xs = x + np.cos(angles) * scale * size
+            ys = y + np.sin(angles) * scale * size
+            coords = " ".join(f"{_fmt(px)},{_fmt(py)}" for px, py in zip(xs, ys))
+            elements.append(f'<polygon points="{coords}" fill="{fill}" opacity="{alpha:.2f}"/>')
+        else:
+            elements.append(f'<circle cx="{_fmt(x)}" cy="{_fmt(y)}" r="{_fmt(r)}" fill="{fill}" opacity="{alpha:.2f}"/>')
+    return elements
+
+def _bokeh_elements(rng, color1, color2, id_prefix):
+    """빛망울: 로그정규 크기 분포, 큰 원일수록 낮은 투명도, 블러 필터"""
+    import numpy as np
+    
+    count = int(rng.integers(8, 15))
+    radii = np.clip(rng.lognormal(mean=3.4, sigma=0.4, size=count), 20, 80)
+    xs = rng.uniform(0, BANNER_WIDTH, size=count)
+    ys = rng.uniform(0, BANNER_HEIGHT, size=count)
+    opacity = np.clip(0.45 - (radii - 20) / 60 * 0.3 + rng.normal(0, 0.03, size=count), 0.1, 0.4)
+    blur = np.where(radii > 45, 2, 1)
+    palette = np.array([color1, color2, "white"])
+    fills = palette[rng.integers(0, 3, size=count)]
+    
+    defs = [
+        f'<filter id="{id_prefix}-blur1"><feGaussianBlur stdDeviation="4"/></filter>',
+        f'<filter id="{id_prefix}-blur2"><feGaussianBlur stdDeviation="7"/></filter>'
+    ]
+    elements = [
+        f'<circle cx="{_fmt(x)}" cy="{_fmt(y)}" r="{_fmt(r)}" fill="{fill}" opacity="{alpha:.2f}" filter="url(#{id_prefix}-blur{b})"/>'
+        for x, y, r, alpha, b, fill in zip(xs, ys, radii, opacity, blur, fills)
+    ]
+    return defs, elements
+
+def _line_elements(rng, color1, color2):
+    """곡선: 위상/진폭이 조금씩 다른 3차 베지어 물결 묶음"""
+    import numpy as np
+    
+    count = int(rng.integers(3, 6))
+    segments = 4
+    seg_width = BANNER_WIDTH / segments
+    base_y = np.linspace(50, 160, count) + rng.normal(0, 8, size=count)
+    amplitude = rng.uniform(15, 40, size=count)
+    phase = rng.uniform(0, 2 * np.pi, size=count)
+    widths = rng.uniform(1.0, 3.0, size=count)
+    opacity = rng.uniform(0.2, 0.55, size=count)
+    
+    # 세그먼트 끝점과 제어점 높이 (물결마다 위상만 다른 사인 형태)
+    knots = np.arange(segments + 1)
+    ends = base_y[:, None] + amplitude[:, None] * np.sin(knots[None, :] * np.pi / 2 + phase[:, None])
+    ctrl = amplitude[:, None] * np.cos(knots[None, :] * np.pi / 2 + phase[:, None]) * 0.6
+    
+    elements = []
+    for i in range(count):
+        d = [f"M0,{_fmt(ends[i, 0])}"]
+        for k in range(segments):
+            x0, x1 = k * seg_width, (k + 1) * seg_width
+            c1 = (x0 + seg_width / 3, ends[i, k] + ctrl[i, k])
+            c2 = (x1 - seg_width / 3, ends[i, k + 1] - ctrl[i, k + 1])
+            d.append(f"C{_fmt(c1[0])},{_fmt(c1[1])} {_fmt(c2[0])},{_fmt(c2[1])} {_fmt(x1)},{_fmt(ends[i, k + 1])}")
+        stroke = "white" if i % 2 == 0 else color1
+        elements.append(
+            f'<path d="{" ".join(d)}" stroke="{stroke}" stroke-width="{widths[i]:.1f}" fill="none" '
+            f'opacity="{opacity[i]:.2f}" stroke-linecap="round"/>'
+        )
+    return elements
+
+def _abstract_elements(rng, color1, color2, id_prefix):
+    """추상: 황금비 크기의 회전된 사각형/원/다각형 + 은은한 글로우"""
+    import numpy as np
+    
+    golden = (1 + 5 ** 0.5) / 2
+    count = int(rng.integers(3, 6))
+    kinds = rng.integers(0, 3, size=count)
+    sizes = rng.uniform(30, 90, size=count)
+    xs = rng.uniform(40, BANNER_WIDTH - 40, size=count)
+    ys = rng.uniform(20, BANNER_HEIGHT - 20, size=count)
+    angles = rng.uniform(-25, 25, size=count)
+    opacity = rng.uniform(0.08, 0.2, size=count)
+    
+    defs = [f'<filter id="{id_prefix}-glow"><feGaussianBlur stdDeviation="2"/></filter>']
+    elements = []
+    for kind, size, x, y, angle, alpha in zip(kinds, sizes, xs, ys, angles, opacity):
+        common = f'fill="white" opacity="{alpha:.2f}" filter="url(#{id_prefix}-glow)"'
+        if kind == 0:
+            w, h = size * golden, size
+            elements.append(
+                f'<rect x="{_fmt(x - w / 2)}" y="{_fmt(y - h / 2)}" width="{_fmt(w)}" height="{_fmt(h)}" rx="8" '
+                f'transform="rotate({_fmt(angle)} {_fmt(x)} {_fmt(y)})" {common}/>'
+            )
+        elif kind == 1:
+            elements.append(f'<circle cx="{_fmt(x)}" cy="{_fmt(y)}" r="{_fmt(size / 2)}" {common}/>')
+        else:
+            sides = int(rng.integers(3, 7))
+            theta = np.arange(sides) * 2 * np.pi / sides + np.radians(angle)
+            coords = " ".join(f"{_fmt(px)},{_fmt(py)}" for px, py in
+                              zip(x + np.cos(theta) * size / 2, y + np.sin(theta) * size / 2))
+            elements.append(f'<polygon points="{coords}" {common}/>')
+    return defs, elements
+
+def generate_procedural_banner_svg(color1, color2, selected_effects, seed=0):
+    """절차적 배너 SVG 생성 (API 호출 없음, 같은 색상/효과/시드면 항상 같은 결과)
+    
+    Args:
+        color1, color2: 메인/보조 색상
+        selected_effects: normalize_bg_effects 결과 (gradient, sparkles, bokeh, lines, abstract)
+        seed: 사용자 시드 (값을 바꾸면 같은 효과의 다른 배치)
+    """
+    import numpy as np
+    
+    selected_effects = list(selected_effects or []) or ["gradient"]
+    rng = np.random.default_rng(banner_seed(color1, color2, selected_effects, seed))
+    # 한 페이지에 배너가 여러 개 있어도 필터/그라데이션 ID가 겹치지 않도록 접두사 사용
+    id_prefix = f"pb{banner_seed(color1, color2, selected_effects, seed) % 100000}"
+    
+    angle_x2 = int(rng.integers(70, 101))
+    angle_y2 = 100 - angle_x2
+    defs = [
+        f'<linearGradient id="{id_prefix}-bg" x1="0%" y1="0%" x2="{angle_x2}%" y2="{angle_y2}%">'
+        f'<stop offset="0%" style="stop-color:{color1};stop-opacity:1" />'
+        f'<stop offset="50%" style="stop-color:{color1};stop-opacity:0.85" />'
+        f'<stop offset="100%" style="stop-color:{color2};stop-opacity:1" />'
+        f'</linearGradient>'
+    ]
+    layers = [f'<rect width="{BANNER_WIDTH}" height="{BANNER_HEIGHT}" fill="url(#{id_prefix}-bg)" />']
+    
+    if "gradient" in selected_effects:
+        cx, cy = rng.uniform(20, 80), rng.uniform(20, 60)
+        defs.append(
+            f'<radialGradient id="{id_prefix}-glow-bg" cx="{cx:.0f}%" cy="{cy:.0f}%">'
+            f'<stop offset="0%" style="stop-color:{color2};stop-opacity:0.35" />'
+            f'<stop offset="100%" style="stop-color:{color1};stop-opacity:0.05" />'
+            f'</radialGradient>'
+        )
+        layers.append(f'<rect width="{BANNER_WIDTH}" height="{BANNER_HEIGHT}" fill="url(#{id_prefix}-glow-bg)" />')
+    if "bokeh" in selected_effects:
+        effect_defs, elements = _bokeh_elements(rng, color1, color2, id_prefix)
+        defs.extend(effect_defs)
+        layers.extend(elements)
+    if "abstract" in selected_effects:
+        effect_defs, elements = _abstract_elements(rng, color1, color2, id_prefix)
+        defs.extend(effect_defs)
+        layers.extend(elements)
+    if "lines" in selected_effects:
+        layers.extend(_line_elements(rng, color1, color2))
+    if "sparkles" in selected_effects:
+        layers.extend(_sparkle_elements(rng, color1, color2))
+    
+    return (
+        f'<svg viewBox="0 0 {BANNER_WIDTH} {BANNER_HEIGHT}" xmlns="http://www.w3.org/2000/svg">'
+        f'<defs>{"".join(defs)}</defs>{"".join(layers)}</svg>'
+    )
+
+# AI 장면 설계 배너: 모델은 도형 목록만 JSON으로 반환하고 SVG는 로컬에서 렌더링
+BANNER_SCENE_SHAPES = ("circle", "rect", "star", "polygon", "wave")
+BANNER_SCENE_MAX_SHAPES = 24
+BANNER_SCENE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "gradient_angle": {"type": "number"},
+        "shapes": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "type": {"type": "string", "enum": list(BANNER_SCENE_SHAPES)},
+                    "x": {"type": "number"},
+                    "y": {"type": "number"},
+                    "size": {"type": "number"},
+                    "rotation": {"type": "number"},
+                    "color": {"type": "integer"},
+                    "opacity": {"type": "number"},
+                    "blur": {"type": "number"}
+                },
+                "required": ["type", "x", "y", "size", "rotation", "color", "opacity", "blur"],
+                "additionalProperties": False
+            }
+        }
+    },
+    "required": ["gradient_angle", "shapes"],
+    "additionalProperties": False
+}
+
+def _clamp(value, low, high, default):
+    """숫자로 변환 후 범위 제한 (변환 불가 시 기본값)"""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return default
+    if value != value:  # NaN
+        return default
+    return min(max(value, low), high)
+
+def render_banner_scene(scene, color1, color2):
+    """장면 JSON(도형 목록)을 700x200 캔버스에 맞춰 SVG로 렌더링
+    
+    좌표/크기/투명도/블러는 캔버스와 허용 범위로 제한하고, 알 수 없는 도형은 건너뜁니다.
+    """
+    palette = (color1, color2, "white")
+    angle = math.radians(_clamp(scene.get("gradient_angle"), 0, 180, 0))
+    id_prefix = "sc" + hashlib.sha256(json.dumps(scene, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:6]
+    
+    defs = [
+        f'<linearGradient id="{id_prefix}-bg" x1="0%" y1="0%" '
+        f'x2="{_fmt(50 + 50 * math.cos(angle))}%" y2="{_fmt(50 * math.sin(angle))}%">'
+        f'<stop offset="0%" style="stop-color:{color1};stop-opacity:1" />'
+        f'<stop offset="100%" style="stop-color:{color2};stop-opacity:1" />'
+        f'</linearGradient>'
+    ]
+    layers = [f'<rect width="{BANNER_WIDTH}" height="{BANNER_HEIGHT}" fill="url(#{id_prefix}-bg)" />']
+    blur_levels = set()
+    
+    for shape in (scene.get("shapes") or [])[:BANNER_SCENE_MAX_SHAPES]:
+        if not isinstance(shape, dict) or shape.get("type") not in BANNER_SCENE_SHAPES:
+            continue
+        kind = shape["type"]
+        x = _clamp(shape.get("x"), 0, BANNER_WIDTH, BANNER_WIDTH / 2)
+        y = _clamp(shape.get("y"), 0, BANNER_HEIGHT, BANNER_HEIGHT / 2)
+        size = _clamp(shape.get("size"), 1, 160, 10)
+        rotation = _clamp(shape.get("rotation"), -180, 180, 0)
+        opacity = _clamp(shape.get("opacity"), 0.05, 1, 0.3)
+        blur = int(round(_clamp(shape.get("blur"), 0, 10, 0)))
+        color = palette[int(_clamp(shape.get("color"), 0, len(palette) - 1, 0))]
+        
+        attrs = f'opacity="{opacity:.2f}"'
+        if blur:
+            blur_levels.add(blur)
+            attrs += f' filter="url(#{id_prefix}-blur{blur})"'
+        
+        if kind == "circle":
+            layers.append(f'<circle cx="{_fmt(x)}" cy="{_fmt(y)}" r="{_fmt(size / 2)}" fill="{color}" {attrs}/>')
+        elif kind == "rect":
+            w, h = size * 1.6, size
+            layers.append(
+                f'<rect x="{_fmt(x - w / 2)}" y="{_fmt(y - h / 2)}" width="{_fmt(w)}" height="{_fmt(h)}" rx="{_fmt(h / 8)}" '
+                f'fill="{color}" transform="rotate({_fmt(rotation)} {_fmt(x)} {_fmt(y)})" {attrs}/>'
+            )
+        elif kind in ("star", "polygon"):
+            # 별은 4각 별(외곽/내곽 교차), 다각형은 육각형
+            points = 8 if kind == "star" else 6
+            coords = []
+            for k in range(points):
+                theta = math.radians(rotation) + k * 2 * math.pi / points - math.pi / 2
+                radius = size / 2 * (0.35 if kind == "star" and k % 2 else 1.0)
+                coords.append(f"{_fmt(x + math.cos(theta) * radius)},{_fmt(y + math.sin(theta) * radius)}")
+            layers.append(f'<polygon points="{" ".join(coords)}" fill="{color}" {attrs}/>')
+        else:  # wave: y 높이에서 캔버스 전체를 가로지르는 물결 (size는 진폭, rotation은 위상)
+            amplitude = min(size / 2, BANNER_HEIGHT / 2)
+            phase = math.radians(rotation)
+            segment = BANNER_WIDTH / 4
+            ends = [y + amplitude * math.sin(k * math.pi / 2 + phase) for k in range(5)]
+            ctrl = [amplitude * 0.6 * math.cos(k * math.pi / 2 + phase) for k in range(5)]
+            d = [f"M0,{_fmt(ends[0])}"]
+            for k in range(4):
+                d.append(
+                    f"C{_fmt(k * segment + segment / 3)},{_fmt(ends[k] + ctrl[k])} "
+                    f"{_fmt((k + 1) * segment - segment / 3)},{_fmt(ends[k + 1] - ctrl[k + 1])} "
+                    f"{_fmt((k + 1) * segment)},{_fmt(ends[k + 1])}"
+                )
+            layers.append(f'<path d="{" ".join(d)}" stroke="{color}" stroke-width="2" fill="none" '
+                          f'stroke-linecap="round" {attrs}/>')
+    
+    defs.extend(
+        f'<filter id="{id_prefix}-blur{level}"><feGaussianBlur stdDeviation="{level}"/></filter>'
+        for level in sorted(blur_levels)
+    )
+    return (
+        f'<svg viewBox="0 0 {BANNER_WIDTH} {BANNER_HEIGHT}" xmlns="http://www.w3.org/2000/svg">'
+        f'<defs>{"".join(defs)}</defs>{"".join(layers)}</svg>'
+    )
+
+def generate_scene_banner_svg(tone, color1, color2, bg_elements, seed=0):
+    """AI 장면 설계 배너 (배너 풀에서 즉시 제공, 풀이 비어 있으면 직접 생성, 실패 시 절차적 배너)"""
+    selected_effects = normalize_bg_effects(bg_elements) or ["gradient"]
+    svg_code = get_banner_pool().serve("scene", tone, color1, color2, selected_effects)
+    return svg_code or generate_procedural_banner_svg(color1, color2, selected_effects, seed)
+
+def request_scene_banner_svg(tone, color1, color2, bg_elements, bypass_cache=None):
+    """AI가 설계한 장면 JSON을 로컬에서 SVG로 렌더링 (실패 시 None)"""
+    selected_effects = normalize_bg_effects(bg_elements) or ["gradient"]
+    effect_guides = {
+        "gradient": "gradient: choose gradient_angle for a smooth diagonal flow",
+        "sparkles": "sparkles: 12-18 small star/circle shapes, size 2-8, color 2 (white), opacity 0.5-0.9, blur 0, spread evenly",
+        "bokeh": "bokeh: 6-10 circles, size 40-160, opacity 0.1-0.4, blur 3-8, overlapping for depth",
+        "lines": "lines: 3-5 wave shapes at different y, size (amplitude) 20-70, opacity 0.2-0.6, blur 0",
+        "abstract": "abstract: 3-5 rect/polygon/circle shapes, size 40-120, rotation -30~30, opacity 0.1-0.3, blur 2"
+    }
+    prompt = f"""Design a professional B2B email header banner background as a compact scene description.
+Canvas: {BANNER_WIDTH}x{BANNER_HEIGHT}, origin top-left. Theme: {tone}.
+Colors: 0 = primary ({color1}), 1 = secondary ({color2}), 2 = white.
+Effects:
+{chr(10).join('- ' + effect_guides[effect] for effect in selected_effects)}
+
+Rules: no text, at most {BANNER_SCENE_MAX_SHAPES} shapes, keep the composition subtle so content stays readable.
+Return JSON only: {{"gradient_angle": 0-180, "shapes": [{{"type": {"|".join(BANNER_SCENE_SHAPES)}, "x", "y", "size", "rotation", "color": 0-2, "opacity": 0-1, "blur": 0-10}}]}}"""
+    
+    try:
+        scene, invalid_fields = request_structured_json(
+            [{"role": "user", "content": prompt}], "banner_scene", BANNER_SCENE_SCHEMA,
+            task="svg_scene", temperature=0.5, cache_site="banner_scene", bypass_cache=bypass_cache
+        )
+        if not invalid_fields and scene.get("shapes"):
+            svg_code, score, passed = score_svg_candidate(render_banner_scene(scene, color1, color2), selected_effects)
+            print(f"장면 배너 렌더링: 도형 {len(scene['shapes'])}개, 점수={score}, 검증={'통과' if passed else '미달'}")
+            if svg_code:
+                return svg_code
+    except Exception as e:
+        print(f"장면 배너 생성 오류: {str(e)}")
+    return None
+
+# 배너 풀: (방식, 톤, 색상, 효과 조합)별로 검증된 변형을 미리 생성해 두고 즉시 제공
+BANNER_POOL_SIZE = int(os.getenv("EDM_BANNER_POOL_SIZE", "3"))  # 0이면 풀 사용 안 함
+BANNER_POOL_MAX_KEYS = int(os.getenv("EDM_BANNER_POOL_KEYS", "200"))
+# 백그라운드 채우기 비용 제한: 프로세스당 시간당 생성 시도 수, 조합별 연속 검증 실패 허용 횟수
+BANNER_POOL_REFILLS_PER_HOUR = int(os.getenv("EDM_BANNER_POOL_REFILLS_PER_HOUR", "20"))
+BANNER_POOL_MAX_FAILURES = 3
+BANNER_POOL_GENERATORS = {
+    "llm": request_enhanced_banner_svg,
+    "scene": request_scene_banner_svg
+}
+# 채우기 요청은 후보 1개만 생성 (직접 생성 시에만 여러 후보 병렬 요청)
+BANNER_POOL_REFILL_OPTIONS = {
+    "llm": {"candidate_count": 1}
+}
+
+class BannerPool(PersistentCache):
+    """배너 변형 풀 (키별 최대 K개, 품질 점수/명도 메타데이터, 오래 사용되지 않은 키는 LRU 제거)"""
+
+    def __init__(self, size=BANNER_POOL_SIZE):
+        super().__init__("banner_pool", max_entries=BANNER_POOL_MAX_KEYS, memory_entries=100)
+        self.size = size
+        self.served = 0
+        self.generated_inline = 0
+        self._pool_lock = threading.Lock()
+        self._refilling = set()
+        self._refill_slots = threading.BoundedSemaphore(2)
+        self._refill_attempts = []  # 최근 1시간 생성 시도 시각
+        self._failures = {}  # 키 -> 연속 검증 실패 횟수
+
+    @staticmethod
+    def pool_key(mode, tone, color1, color2, selected_effects):
+        return f"{mode}|{tone}|{color1.lower()}|{color2.lower()}|{','.join(sorted(set(selected_effects)))}"
+
+    def take(self, key):
+        """점수가 가장 높은 변형 하나를 꺼냄 (없으면 None)"""
+        with self._pool_lock:
+            variants = self.get(key, default=[])
+            if not variants:
+                return None
+            variant = variants.pop(0)
+            self.set(key, variants, namespace=key.split("|", 1)[0])
+            return variant
+
+    def add_variant(self, key, svg_code, score):
+        """검증된 변형 추가 (중복/초과분 제외, 점수 내림차순 유지)"""
+        with self._pool_lock:
+            variants = self.get(key, default=[])
+            if len(variants) >= self.size or any(v["svg"] == svg_code for v in variants):
+                return
+            variants.append({
+                "svg": svg_code,
+                "score": round(score, 3),
+                "brightness": round(analyze_svg_brightness(svg_code), 1),
+                "created_at": time.time()
+            })
+            variants.sort(key=lambda v: v["score"], reverse=True)
+            self.set(key, variants, namespace=key.split("|", 1)[0])
+
+    def _reserve_attempt(self):
+        """시간당 생성 시도 예산에서 1회 차감 (예산 소진 시 False)"""
+        now = time.time()
+        with self._pool_lock:
+            self._refill_attempts = [t for t in self._refill_attempts if now - t < 3600]
+            if len(self._refill_attempts) >= BANNER_POOL_REFILLS_PER_HOUR:
+                return False
+            self._refill_attempts.append(now)
+            return True
+
+    def refill(self, mode, tone, color1, color2, selected_effects):
+        """백그라운드 스레드에서 변형 1개 보충 (키별 중복 작업 방지, 시간당 시도 예산 내에서 최대 2회 시도)
+        
+        헤드리스 실행(CLI)에서는 프로세스 종료 시 결과가 버려지므로 채우지 않으며,
+        검증 실패가 반복된 조합은 더 이상 채우지 않습니다.
+        """
+        if HEADLESS or self.size <= 0 or mode not in BANNER_POOL_GENERATORS:
+            return
+        key = self.pool_key(mode, tone, color1, color2, selected_effects)
+        with self._pool_lock:
+            if key in self._refilling or self._failures.get(key, 0) >= BANNER_POOL_MAX_FAILURES:
+                return
+            self._refilling.add(key)
+        
+        def worker():
+            try:
+                with self._refill_slots:
+                    # 변형마다 응답 캐시를 거치지 않고 새로 생성
+                    for _ in range(2):
+                        if len(self.get(key, default=[])) >= self.size or not self._reserve_attempt():
+                            break
+                        svg_content = BANNER_POOL_GENERATORS[mode](
+                            tone, color1, color2, selected_effects, bypass_cache=True,
+                            **BANNER_POOL_REFILL_OPTIONS.get(mode, {})
+                        )
+                        svg_code, score, passed = score_svg_candidate(svg_content, selected_effects)
+                        if svg_code:
+                            self.add_variant(key, svg_code, score)
+                        with self._pool_lock:
+                            self._failures[key] = 0 if passed else self._failures.get(key, 0) + 1
+                            failures = self._failures[key]
+                        if passed:
+                            break
+                        if failures >= BANNER_POOL_MAX_FAILURES:
+                            print(f"배너 풀 채우기 중단 ({key}): 검증 실패 {failures}회 연속")
+                            break
+            except Exception as e:
+                print(f"배너 풀 채우기 오류 ({key}): {str(e)}")
+            finally:
+                with self._pool_lock:
+                    self._refilling.discard(key)
+        
+        threading.Thread(target=worker, name=f"banner-pool-{mode}", daemon=True).start()
+
+    def serve(self, mode, tone, color1, color2, selected_effects):
+        """풀에서 변형을 즉시 제공하고 비동기로 1개 보충 (풀이 비어 있으면 직접 생성)"""
+        key = self.pool_key(mode, tone, color1, color2, selected_effects)
+        variant = self.take(key) if self.size > 0 else None
+        if variant:
+            self.served += 1
+            print(f"배너 풀 제공 ({key}): 점수={variant['score']}, 명도={variant['brightness']}")
+            svg_code = variant["svg"]
+        else:
+            self.generated_inline += 1
+            svg_code = BANNER_POOL_GENERATORS[mode](tone, color1, color2, selected_effects)
+        self.refill(mode, tone, color1, color2, selected_effects)
+        return svg_code
+
+    def pool_stats(self):
+        """풀 제공/직접 생성 횟수와 저장된 키 수"""
+        stats = self.stats()
+        return {"served": self.served, "generated_inline": self.generated_inline, "keys": stats["entries"]}
+
+@st.cache_resource
+def get_banner_pool():
+    """배너 풀 (프로세스당 1회 생성)"""
+    return BannerPool()
+
+def generate_fallback_svg(color1, color2, selected_effects, seed=0):
+    """고품질 기본 SVG 생성 - 효과별 절차적 배너 (AI 생성 실패 시, 미리보기)"""
+    return generate_procedural_banner_svg(color1, color2, selected_effects, seed)
+
+def generate_banner_svg(tone, color1, color2, bg_elements, mode=None, seed=0):
+    """배너 생성 방식에 따라 배너 SVG 생성 (procedural은 즉시, scene은 장면 JSON, llm은 AI 후보 생성)"""
+    mode = mode or DEFAULT_BANNER_MODE
+    if mode == "llm":
+        return generate_enhanced_banner_svg(tone, color1, color2, bg_elements)
+    if mode == "scene":
+        return generate_scene_banner_svg(tone, color1, color2, bg_elements, seed)
+    return generate_procedural_banner_svg(color1, color2, normalize_bg_effects(bg_elements), seed)
+
+def build_pdf_hint(structured_pdf_content):
+    """구조화된 PDF 내용을 프롬프트 참고 정보로 변환 (내용이 없으면 빈 문자열)"""
+    if not structured_pdf_content:
+        return ""
+    pdf_desc = structured_pdf_content.get('product_desc', '')
+    pdf_features = structured_pdf_content.get('features', '')
+    pdf_benefits = structured_pdf_content.get('benefits', '')
+    
+    if not (pdf_desc or pdf_features or pdf_benefits):
+        return ""
+    return f"""
 참고 PDF 정보 (완전한 문장으로 구성된 내용):
 - 제품 설명: {pdf_desc}
 - 주요 기능: {pdf_features}
 - 기대 효과: {pdf_benefits}
 
 위 정보를 참고하되, 모든 문장이 완전하고 자연스럽게 연결되도록 작성하세요."""
+
+# 콘텐츠/PDF 구조화 응답 스키마
+EDM_CONTENT_FIELDS = ('title', 'highlight', 'body', 'closing', 'cta')
+EDM_CONTENT_SCHEMA = string_fields_schema(EDM_CONTENT_FIELDS)
+PDF_STRUCTURE_SCHEMA = string_fields_schema(('product_desc', 'features', 'benefits'))
+
+def generate_edm_content(edm_data, material_summary="", structured_pdf_content=None, on_partial=None):
+    """EDM 콘텐츠 생성 함수 (구조화된 PDF 내용 활용)
+    
+    on_partial이 주어지면 본문을 스트리밍으로 생성하며, 필드가 채워질 때마다
+    지금까지 받은 {필드: 값}으로 on_partial을 호출합니다.
+    """
+    edm_type = edm_data.get('edm_type')
+    core = edm_data.get('core')
+    target = edm_data.get('target')
+    title_suggestion = edm_data.get('title_suggestion', '')
+    
+    # PDF 구조화 내용 활용 (문장 끊김 방지)
+    pdf_hint = build_pdf_hint(structured_pdf_content)
     
     # 타이틀 개선
     refined_title = title_suggestion
@@ -1656,7 +3431,7 @@ def generate_edm_content(edm_data, material_summary="", structured_pdf_content=N
         try:
             response = safe_openai_call(
                 messages=[{"role": "user", "content": title_refine_prompt}],
-                model="gpt-4"
+                task="title_refine"
             )
             if response:
                 refined_title = response.choices[0].message.content.strip().strip('"')
@@ -1666,6 +3441,9 @@ def generate_edm_content(edm_data, material_summary="", structured_pdf_content=N
                 refined_title = optimize_title_length(title_suggestion, 25)
         except:
             refined_title = optimize_title_length(title_suggestion, 25)
+        
+        if on_partial:
+            on_partial({'title': refined_title})
     
     
     # 메인 콘텐츠 생성
@@ -1695,63 +3473,260 @@ def generate_edm_content(edm_data, material_summary="", structured_pdf_content=N
 핵심: {core}
 정보: {info}{title_hint}{material_hint}{pdf_hint}
 
-주의사항:
-- 제공된 타이틀이 있으면 반드시 그대로 사용
-- 비즈니스 B2B 톤으로 전문적이고 신뢰감 있게 작성
-- 모든 문장은 완전하게 구성 (문장이 끊기지 않도록)
-- PDF 정보가 있으면 적극 활용
-- body는 접속사(그리고, 또한, 더불어, 아울러 등)로 시작하지 않고 명사나 주어로 시작
+주의사항:
+- 제공된 타이틀이 있으면 반드시 그대로 사용
+- 비즈니스 B2B 톤으로 전문적이고 신뢰감 있게 작성
+- 모든 문장은 완전하게 구성 (문장이 끊기지 않도록)
+- PDF 정보가 있으면 적극 활용
+- body는 접속사(그리고, 또한, 더불어, 아울러 등)로 시작하지 않고 명사나 주어로 시작
+
+다음 형식으로 응답해주세요:
+{{"title": "제목", "highlight": "핵심 메시지", "body": "본문 내용", "closing": "마무리 멘트", "cta": "버튼 텍스트"}}"""
+    
+    try:
+        messages = [{"role": "user", "content": prompt}]
+        response_text = None
+        if on_partial:
+            response_text = safe_openai_stream(
+                messages=messages,
+                task="content_body",
+                json_schema=("edm_content", EDM_CONTENT_SCHEMA),
+                on_delta=lambda text: on_partial(extract_partial_json_fields(text, EDM_CONTENT_FIELDS))
+            )
+        
+        # 스키마 검증 후 누락/잘못된 필드만 재요청
+        content, invalid_fields = request_structured_json(
+            messages, "edm_content", EDM_CONTENT_SCHEMA, task="content_body", response_text=response_text
+        )
+        
+        if content:
+            # 끝까지 채워지지 않은 필드는 기본 콘텐츠로 보완
+            if invalid_fields:
+                default_content = build_default_edm_content(edm_data, refined_title)
+                content.update({field: default_content[field] for field in invalid_fields})
+            
+            if edm_data.get('cta'):
+                content['cta'] = edm_data.get('cta')
+                
+            return content
+        else:
+            # API 호출 실패 시 기본 콘텐츠 반환 (개선됨)
+            return build_default_edm_content(edm_data, refined_title)
+    except Exception as e:
+        st.error(f"콘텐츠 생성 오류: {str(e)}")
+        return build_default_edm_content(edm_data, refined_title)
+
+def build_edm_info(edm_type, text, sessions=None, features_data=None, expected_effects=""):
+    """EDM 유형별 콘텐츠 생성용 정보 문자열 (초청의 글 또는 제품 설명 기반)"""
+    if edm_type == "초청형":
+        return f"초청의 글: {text}\n세션 제목들: {[s['title'] for s in sessions or [] if s['title']]}"
+    return f"{text}\n기능들: {[f['feature_name'] for f in features_data or []]}\n기대효과: {expected_effects}"
+
+def build_default_edm_content(edm_data, refined_title=""):
+    """API 호출 실패/타임아웃 시 사용할 기본 콘텐츠"""
+    core = edm_data.get('core')
+    target = edm_data.get('target')
+    return {
+        "title": refined_title or (core[:20] + "..." if len(core) > 20 else core) if core else "새로운 솔루션 소개",
+        "highlight": core or "혁신적인 솔루션으로 비즈니스 성장을 지원합니다",
+        "body": f"{target}을 위한 전문 솔루션을 소개합니다. {core}" if core and target else "전문적인 솔루션으로 고객의 비즈니스 성장을 지원합니다.",
+        "closing": "자세한 내용은 아래 버튼을 통해 확인해보세요.",
+        "cta": edm_data.get('cta', '자세히 보기')
+    }
+
+# EDM HTML 템플릿 (모듈 로드 시 1회 컴파일, 렌더링 시 슬롯만 채움)
+# 모든 슬롯은 자동 이스케이프되며, 이미 렌더링된 HTML 조각(섹션, 로고, 배너 SVG, CSS)만 Markup으로 전달
+TEMPLATE_ENV = Environment(autoescape=True, keep_trailing_newline=True, finalize=lambda value: "" if value is None else value)
+
+LOGO_PAIR_TEMPLATE = TEMPLATE_ENV.from_string("""
+            <img src="data:image/png;base64,{{ company_logo }}" alt="Company Logo" class="logo" style="margin-right: auto;">
+            <img src="data:image/png;base64,{{ partner_logo }}" alt="Partner Logo" class="logo" style="margin-left: auto;">
+        """)
+
+LOGO_SINGLE_TEMPLATE = TEMPLATE_ENV.from_string("""
+            <img src="data:image/png;base64,{{ company_logo }}" alt="Company Logo" class="logo" style="margin-left: auto;">
+        """)
+
+HERO_SVG_TEMPLATE = TEMPLATE_ENV.from_string("""
+        <div class="hero-section">
+            <div class="hero-background">{{ bg_svg }}</div>
+            <div class="hero-content">
+                <div class="logo-section">
+                    {{ logos }}
+                </div>
+                <div class="title-content">
+                    <h1 class="hero-title">{{ title }}</h1>
+                </div>
+            </div>
+        </div>""")
+
+HERO_IMAGE_TEMPLATE = TEMPLATE_ENV.from_string("""
+        <div class="hero-section hero-image" style="background-image:url(data:image/png;base64,{{ bg_b64 }});">
+            <div class="hero-content">
+                <div class="logo-section">
+                    {{ logos }}
+                </div>
+                <div class="title-content">
+                    <h1 class="hero-title">{{ title }}</h1>
+                </div>
+            </div>
+        </div>""")
+
+HEADER_TEMPLATE = TEMPLATE_ENV.from_string("""
+        <div class="header" style="background:linear-gradient(135deg, {{ theme_color }}, {{ theme_color }}aa);">
+            <div class="logo-section">
+                {{ logos }}
+            </div>
+            <div class="title-content">
+                <h1 class="header-title">{{ title }}</h1>
+            </div>
+        </div>""")
+
+FEATURES_SECTION_TEMPLATE = TEMPLATE_ENV.from_string("""
+        <div class="features-section">
+            <h3 style="color: {{ theme_color }}; margin-bottom: 20px;">{{ heading }}</h3>
+            <div class="features-grid" style="grid-template-columns: repeat({{ cols_per_row }}, 1fr);">{{ items }}</div></div>""")
+
+FEATURE_ITEM_TEMPLATE = TEMPLATE_ENV.from_string("""
+            <div class="feature-item">
+                <div class="feature-icon">
+                    <i class="bi bi-{{ icon }}"></i>
+                </div>
+                <h4 class="feature-title" style="color: {{ theme_color }};">{{ name }}</h4>
+                <p class="feature-desc">{{ desc }}</p>
+            </div>""")
+
+EFFECTS_SECTION_TEMPLATE = TEMPLATE_ENV.from_string("""
+        <div class="section effects-section">
+            <h3 style="color: {{ theme_color }}; margin-bottom: 15px;">{{ heading }}</h3>
+            <ul class="effects-list">
+                {{ items }}
+            </ul>
+        </div>""")
+
+EFFECT_ITEM_TEMPLATE = TEMPLATE_ENV.from_string("<li class='expected-effect-item'>{{ text }}</li>")
+EFFECT_TITLED_ITEM_TEMPLATE = TEMPLATE_ENV.from_string("<li class='expected-effect-item'><strong>{{ title }}:</strong> {{ desc }}</li>")
 
-다음 형식으로 응답해주세요:
-{{"title": "제목", "highlight": "핵심 메시지", "body": "본문 내용", "closing": "마무리 멘트", "cta": "버튼 텍스트"}}"""
-    
-    try:
-        response = safe_openai_call(
-            messages=[{"role": "user", "content": prompt}],
-            model="gpt-4"
-        )
-        
-        if response:
-            j = re.search(r"\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}", response.choices[0].message.content, re.DOTALL)
-            content = json.loads(j.group()) if j else {}
+EVENT_INFO_TEMPLATE = TEMPLATE_ENV.from_string("""
+        <div class="event-info-box" style="background: {{ theme_color }}dd;">
+            <h3 style="color: white; margin-bottom: 15px;">{{ heading }}</h3>
+            <table class="event-info-table">
+                <tr><td><strong>{{ date_label }}</strong></td><td>{{ date }}</td></tr>
+                <tr><td><strong>{{ location_label }}</strong></td><td>{{ location }}</td></tr>
+                <tr><td><strong>{{ target_label }}</strong></td><td>{{ target }}</td></tr>
+                <tr><td><strong>{{ host_label }}</strong></td><td>{{ host }}</td></tr>
+            </table>
+        </div>""")
+
+AGENDA_SECTION_TEMPLATE = TEMPLATE_ENV.from_string("""
+        <div class="section agenda-section">
+            <h3 style="color: {{ theme_color }}; margin-bottom: 15px;">{{ heading }}</h3>
+            <table class="agenda-table">
+                <thead>
+                    <tr>
+                        <th>{{ time_label }}</th>
+                        <th>{{ session_label }}</th>
+                        <th>{{ speaker_label }}</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {{ rows }}
+                </tbody>
+            </table>
+        </div>""")
+
+AGENDA_ROW_TEMPLATE = TEMPLATE_ENV.from_string("""
+            <tr>
+                <td class="agenda-time">{{ time }}</td>
+                <td class="agenda-title">{{ title }}</td>
+                <td class="agenda-speaker">{{ speaker }}</td>
+            </tr>""")
+
+EDM_DOCUMENT_TEMPLATE = TEMPLATE_ENV.from_string("""<!DOCTYPE html>
+<html lang='{{ lang_code }}'>
+<head>
+    <meta charset='UTF-8'>
+    <meta name='viewport' content='width=device-width, initial-scale=1.0'>
+    <title>{{ page_title }}</title>
+    <link href="https://cdn.jsdelivr.net/npm/bootstrap-icons@1.11.0/font/bootstrap-icons.css" rel="stylesheet">
+    {{ css }}
+    <script>
+        document.addEventListener('DOMContentLoaded', function() {
+            // 반응형 높이 조정
+            const heroSection = document.querySelector('.hero-section, .hero-image');
             
-            if edm_data.get('cta'):
-                content['cta'] = edm_data.get('cta')
+            if (heroSection) {
+                const adjustHeroHeight = () => {
+                    const baseHeight = window.innerWidth <= 600 ? 160 : 
+                                     window.innerWidth <= 768 ? 180 : 220;
+                    heroSection.style.minHeight = baseHeight + 'px';
+                    
+                    // hero-background도 같이 조정
+                    const heroBackground = document.querySelector('.hero-background');
+                    if (heroBackground) {
+                        heroBackground.style.height = baseHeight + 'px';
+                    }
+                };
                 
-            return content
-        else:
-            # API 호출 실패 시 기본 콘텐츠 반환 (개선됨)
-            return {
-                "title": refined_title or (core[:20] + "..." if len(core) > 20 else core) if core else "새로운 솔루션 소개",
-                "highlight": core or "혁신적인 솔루션으로 비즈니스 성장을 지원합니다",
-                "body": f"{target}을 위한 전문 솔루션을 소개합니다. {core}" if core and target else "전문적인 솔루션으로 고객의 비즈니스 성장을 지원합니다.",
-                "closing": "자세한 내용은 아래 버튼을 통해 확인해보세요.",
-                "cta": edm_data.get('cta', '자세히 보기')
+                // 초기 조정
+                adjustHeroHeight();
+                
+                // 창 크기 변경 시 재조정
+                window.addEventListener('resize', adjustHeroHeight);
             }
-    except Exception as e:
-        st.error(f"콘텐츠 생성 오류: {str(e)}")
-        return {
-            "title": refined_title or (core[:20] + "..." if core and len(core) > 20 else core) if core else "새로운 솔루션 소개",
-            "highlight": core or "혁신적인 솔루션으로 비즈니스 성장을 지원합니다",
-            "body": f"{target}을 위한 전문 솔루션을 소개합니다. {core}" if core and target else "전문적인 솔루션으로 고객의 비즈니스 성장을 지원합니다.",
-            "closing": "자세한 내용은 아래 버튼을 통해 확인해보세요.",
-            "cta": edm_data.get('cta', '자세히 보기')
-        }
+        });
+    </script>
+</head>
+<body class="lang-{{ target_language }}">
+    <div class='container'>
+        {{ header_section }}
+        {{ event_info_html }}
+        <div class='section highlight-section'>
+            <strong class="highlight-text">{{ highlight }}</strong>
+        </div>
+        <div class='section main-content'>
+            {{ body }}
+        </div>
+        {{ features_html }}
+        {{ effects_html }}
+        {{ agenda_html }}
+        <div class='section closing-section'>
+            {{ closing }}
+        </div>
+        <div class='cta'>
+            <a href='{{ cta_url }}' class='cta-button'>{{ cta }}</a>
+        </div>
+        <div class='footer-bar'>
+            <img src="data:image/png;base64,{{ company_logo }}" style="height:40px;" alt="Company Logo">
+            <div style="text-align:right; line-height:1.8;">
+                <div class="footer-company-info" style="text-align:right;">{{ company_name }}</div>
+                <div class="footer-address" style="text-align:right;">{{ address }}</div>
+                <div style="text-align:right;"><a href="https://{{ website }}" class="footer-website">{{ website }}</a> | <span class="footer-contact">{{ contact }}</span></div>
+            </div>
+        </div>
+    </div>
+</body>
+</html>""")
+
+# CSS/인라인 스타일에 그대로 들어가는 테마 컬러는 HEX 형식만 허용 (<style> 안은 이스케이프로 막을 수 없음)
+HEX_COLOR_PATTERN = re.compile(r"^#[0-9a-fA-F]{3,8}$")
+DEFAULT_THEME_COLOR = "#8EC5FC"
+
+def sanitize_theme_color(theme_color):
+    """HEX 컬러가 아니면 기본 테마 컬러로 대체"""
+    theme_color = str(theme_color or "").strip()
+    return theme_color if HEX_COLOR_PATTERN.match(theme_color) else DEFAULT_THEME_COLOR
 
 def create_logo_html(company_logo_b64, partner_logo_b64):
     """로고 위치 개선 - 회사 로고는 항상 우측, 솔루션 로고가 있으면 회사 로고는 좌측으로"""
     if partner_logo_b64:
         # 솔루션 로고가 있는 경우: 회사 로고(좌측) + 솔루션 로고(우측)
-        return f"""
-            <img src="data:image/png;base64,{company_logo_b64}" alt="Company Logo" class="logo" style="margin-right: auto;">
-            <img src="data:image/png;base64,{partner_logo_b64}" alt="Partner Logo" class="logo" style="margin-left: auto;">
-        """
+        return LOGO_PAIR_TEMPLATE.render(company_logo=company_logo_b64, partner_logo=partner_logo_b64)
     else:
         # 회사 로고만 있는 경우: 우측에 배치
-        return f"""
-            <img src="data:image/png;base64,{company_logo_b64}" alt="Company Logo" class="logo" style="margin-left: auto;">
-        """
+        return LOGO_SINGLE_TEMPLATE.render(company_logo=company_logo_b64)
 
+@functools.lru_cache(maxsize=64)
 def get_enhanced_css_styles(theme_color):
     """향상된 CSS 스타일"""
     return f"""
@@ -2327,250 +4302,580 @@ def get_enhanced_css_styles(theme_color):
         }}
     </style>"""
 
-def create_improved_html_edm(content, edm_type, company_logo_light, company_logo_dark, 
-                           partner_logo, cta_url, sessions=None, theme_color="#8EC5FC", 
-                           bg_image_path=None, event_info=None, features_data=None, 
-                           layout_option="자동", bg_svg_code=None, expected_effects="", 
-                           target_language="ko", material_summary="", footer_info=None):
-    """개선된 HTML EDM 생성 (Footer 개선 포함)"""
+def add_section_tasks(scheduler, edm_type, features_data, expected_effects, material_summary):
+    """기능 카드(아이콘, 설명)와 기대효과 AI 향상 작업을 스케줄러에 등록
     
-    # 개선된 배경 분석 기반 로고 선택 (URL 기반)
-    selected_logo_url = select_logo_by_background_analysis(
-        theme_color, bg_svg_code, bg_image_path, 
-        company_logo_light, company_logo_dark
-    )
-    company_logo_b64 = load_image_base64(selected_logo_url) if selected_logo_url else ""
-    partner_logo_b64 = load_image_base64(partner_logo) if partner_logo else ""
+    각 기능의 아이콘 선택/설명 향상과 기대효과 향상은 서로 독립적이므로 병렬로 실행되며,
+    결과는 'sections' 작업에서 {'feature_items': [...], 'effects_list': [...]}로 조립됩니다.
+    """
+    feature_tasks = []
+    if edm_type == "소개형" and features_data:
+        valid_features = [f for f in features_data if f['feature_name'].strip()]
+        for i, feature in enumerate(valid_features):
+            # Bootstrap Icon 선택
+            icon_task = scheduler.add(
+                f"icon_{i}",
+                lambda keyword=feature['icon_keyword']: select_bootstrap_icon(keyword),
+                timeout=30,
+                default="gear-fill"
+            )
+            # AI로 기능 설명 향상
+            desc_task = scheduler.add(
+                f"feature_desc_{i}",
+                lambda f=feature: generate_enhanced_feature_description(f['feature_name'], f['feature_desc'], material_summary),
+                timeout=45,
+                default=feature['feature_desc']
+            )
+            feature_tasks.append((feature, icon_task, desc_task))
+    
+    effects_task = None
+    if expected_effects and edm_type == "소개형":
+        # AI로 기대효과 향상
+        effects_task = scheduler.add(
+            "effects",
+            lambda: generate_enhanced_expected_effects(expected_effects, material_summary),
+            timeout=60,
+            default=expected_effects
+        )
+    
+    deps = [name for _, icon_task, desc_task in feature_tasks for name in (icon_task, desc_task)]
+    if effects_task:
+        deps.append(effects_task)
+    
+    def assemble(*values):
+        feature_items = []
+        for i, (feature, _, _) in enumerate(feature_tasks):
+            icon_class, enhanced_desc = values[2 * i], values[2 * i + 1]
+            feature_items.append({'icon': icon_class, 'name': feature['feature_name'], 'desc': enhanced_desc})
+        
+        effects_list = []
+        if effects_task:
+            enhanced_effects = values[-1] or expected_effects
+            effects_list = [effect.strip() for effect in enhanced_effects.split('\n') if effect.strip()]
+        
+        return {'feature_items': feature_items, 'effects_list': effects_list}
+    
+    return scheduler.add("sections", assemble, deps=deps)
 
-    # 다국어 번역 적용
-    translated_fixed = get_fixed_translations(target_language)
-    if target_language != "ko":
-        try:
-            content, translated_fixed = translate_all_content(content, target_language)
-        except Exception as e:
-            print(f"번역 오류: {str(e)}")
+# 콘텐츠·기능·기대효과를 한 번의 요청으로 생성 (EDM_BUNDLED_GENERATION=0이면 섹션별 개별 요청)
+BUNDLED_GENERATION = os.getenv("EDM_BUNDLED_GENERATION", "1") == "1"
+
+def build_default_sections(edm_type, features_data, expected_effects):
+    """AI 향상 전 입력값 그대로의 기능 카드/기대효과 (미리보기, 실패 시 기본값)"""
+    feature_items, effects_list = [], []
+    if edm_type == "소개형":
+        feature_items = [
+            {'icon': DEFAULT_ICON, 'name': f['feature_name'], 'desc': f['feature_desc']}
+            for f in features_data or [] if f['feature_name'].strip()
+        ]
+        effects_list = [effect.strip() for effect in (expected_effects or "").split('\n') if effect.strip()]
+    return {'feature_items': feature_items, 'effects_list': effects_list}
+
+def generate_sections(edm_type, features_data, expected_effects, material_summary):
+    """기능 카드/기대효과를 섹션별 개별 요청으로 병렬 생성 (일괄 생성 실패 시 대체 경로)"""
+    scheduler = TaskScheduler()
+    add_section_tasks(scheduler, edm_type, features_data, expected_effects, material_summary)
+    return scheduler.run().get("sections")
+
+def generate_edm_bundle(edm_data, material_summary="", structured_pdf_content=None,
+                        features_data=None, expected_effects="", on_partial=None):
+    """타이틀·본문·기능 설명·아이콘·기대효과를 공통 맥락의 한 번의 구조화 요청으로 생성
+    
+    검증에 실패한 섹션(기능 설명, 아이콘, 기대효과)만 개별 요청으로 대체합니다.
+    
+    Returns:
+        {'content': {...}, 'sections': {'feature_items': [...], 'effects_list': [...]}} 또는 None (요청 실패 시)
+    """
+    edm_type = edm_data.get('edm_type')
+    core = edm_data.get('core')
+    target = edm_data.get('target')
+    title_suggestion = edm_data.get('title_suggestion', '')
+    info = edm_data.get('info', '')
+    
+    valid_features = []
+    effects_input = ""
+    if edm_type == "소개형":
+        valid_features = [f for f in features_data or [] if f['feature_name'].strip()]
+        effects_input = (expected_effects or "").strip()
+    
+    # 인덱스/메모로 결정되지 않는 아이콘만 AI에게 선택 요청
+    icons = [resolve_icon_locally(f['icon_keyword']) for f in valid_features]
+    
+    properties = {field: {"type": "string"} for field in EDM_CONTENT_FIELDS}
+    if valid_features:
+        properties["features"] = {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"desc": {"type": "string"}, "icon": {"type": "string"}},
+                "required": ["desc", "icon"],
+                "additionalProperties": False
+            }
+        }
+    if effects_input:
+        properties["expected_effects"] = {"type": "array", "items": {"type": "string"}}
+    schema = {"type": "object", "properties": properties, "required": list(properties), "additionalProperties": False}
+    
+    material_hint = f"\n참고자료: {material_summary}" if material_summary else ""
+    pdf_hint = build_pdf_hint(structured_pdf_content)
+    
+    if title_suggestion:
+        title_rule = f'- 타이틀 제안 "{title_suggestion}"을 B2B 마케팅에 맞게 전문적이고 임팩트 있게 다듬어 title로 사용 (20자 이내)'
+    else:
+        title_rule = "- 핵심 메시지를 바탕으로 전문적이고 임팩트 있는 title 작성 (20자 이내)"
+    
+    if edm_type == "초청형":
+        body_rules = """- body는 제공된 '초청의 글'을 기반으로 비즈니스 정중체로 작성
+- 행사 목적, 주요 내용을 간결하고 신뢰감 있게 표현"""
+    else:
+        body_rules = """- 비즈니스 B2B 톤으로 전문적이고 신뢰감 있게 작성
+- PDF 정보가 있으면 적극 활용"""
+    
+    sections_prompt = ""
+    if valid_features:
+        feature_lines = "\n".join(
+            f"{i + 1}. 기능명: {f['feature_name']} / 기본 설명: {f['feature_desc']} / "
+            f"아이콘: {'선택 필요 (키워드: ' + f['icon_keyword'] + ')' if icons[i] is None else '지정됨'}"
+            for i, f in enumerate(valid_features)
+        )
+        sections_prompt += f"""
+
+[주요 기능] features 배열에 아래 {len(valid_features)}개 기능을 같은 순서로 작성
+{feature_lines}
+- desc: 기능을 설명하는 50자 이내의 완성된 한 문장, 비즈니스 가치와 혜택 강조, 따옴표 및 "기능명: 설명" 형식 금지
+- icon: 아이콘이 '선택 필요'인 기능만 다음 아이콘 키워드 중 가장 적합한 하나, 나머지는 빈 문자열
+  아이콘 키워드: {', '.join(BOOTSTRAP_ICONS.keys())}"""
+    if effects_input:
+        sections_prompt += f"""
+
+[기대효과] expected_effects 배열에 기본 기대효과를 구체적이고 설득력 있는 완성형 문장으로 작성
+기본 기대효과: {effects_input}
+- 각 항목은 이모티콘(📈, 💰, 📊, ⚡, 🎯, 🔧 등)으로 시작하는 "제목: 설명." 형식
+- 구체적인 수치나 예시 포함 (가능한 경우), 마침표로 끝나는 완전한 문장"""
+    
+    prompt = f"""다음 정보를 바탕으로 {edm_type} eDM의 모든 문구를 하나의 JSON으로 생성해주세요:
+타겟: {target}
+핵심: {core}
+정보: {info}{material_hint}{pdf_hint}
+
+[타이틀]
+{title_rule}
+
+[본문]
+{body_rules}
+- 모든 문장은 완전하게 구성 (문장이 끊기지 않도록)
+- body는 접속사(그리고, 또한, 더불어, 아울러 등)로 시작하지 않고 명사나 주어로 시작
+- highlight는 핵심 메시지, closing은 마무리 멘트, cta는 버튼 텍스트{sections_prompt}
+
+다음 키를 가진 JSON 객체로만 응답해주세요: {', '.join(properties)}"""
+    
+    messages = [{"role": "user", "content": prompt}]
+    response_text = None
+    if on_partial:
+        response_text = safe_openai_stream(
+            messages=messages,
+            task="content_body",
+            json_schema=("edm_bundle", schema),
+            on_delta=lambda text: on_partial(extract_partial_json_fields(text, EDM_CONTENT_FIELDS))
+        )
+    data, invalid_fields = request_structured_json(messages, "edm_bundle", schema, task="content_body",
+                                                   response_text=response_text)
+    content = {field: data[field] for field in EDM_CONTENT_FIELDS if field in data}
+    if not content:
+        return None
+    
+    # 콘텐츠: 누락 필드는 기본 콘텐츠로 보완
+    default_content = build_default_edm_content(edm_data, optimize_title_length(title_suggestion, 25) if title_suggestion else "")
+    for field in EDM_CONTENT_FIELDS:
+        content.setdefault(field, default_content[field])
+    content['title'] = optimize_title_length(content['title'].strip('"'), 25)
+    if edm_data.get('cta'):
+        content['cta'] = edm_data.get('cta')
+    
+    # 기능/기대효과: 섹션별 검증 후 실패한 부분만 개별 요청으로 대체
+    fallback = TaskScheduler()
+    raw_features = data.get("features") if isinstance(data.get("features"), list) else []
+    feature_items = []
+    for i, feature in enumerate(valid_features):
+        item = raw_features[i] if i < len(raw_features) and isinstance(raw_features[i], dict) else {}
+        desc = clean_feature_description(item.get("desc"), "")
+        icon = icons[i]
+        if icon is None and isinstance(item.get("icon"), str) and item["icon"].strip():
+            icon = remember_icon_choice(feature['icon_keyword'], item["icon"].strip().strip('"'))
+        feature_items.append({'icon': icon, 'name': feature['feature_name'], 'desc': desc})
+        
+        if not desc:
+            fallback.add(f"feature_desc_{i}",
+                         lambda f=feature: generate_enhanced_feature_description(f['feature_name'], f['feature_desc'], material_summary),
+                         timeout=45, default=feature['feature_desc'])
+        if icon is None:
+            fallback.add(f"icon_{i}", lambda keyword=feature['icon_keyword']: select_bootstrap_icon(keyword),
+                         timeout=30, default=DEFAULT_ICON)
+    
+    effects_list = []
+    if effects_input:
+        raw_effects = [e for e in data.get("expected_effects") or [] if isinstance(e, str) and e.strip()]
+        if raw_effects:
+            effects_list = normalize_effect_lines("\n".join(raw_effects), effects_input).split('\n')
+        else:
+            fallback.add("effects", lambda: generate_enhanced_expected_effects(effects_input, material_summary),
+                         timeout=60, default=effects_input)
+    
+    if fallback.tasks:
+        print(f"일괄 생성 검증 실패 섹션 개별 요청: {list(fallback.tasks)}")
+        results = fallback.run()
+        for name, value in results.items():
+            if name == "effects":
+                effects_list = [effect.strip() for effect in (value or effects_input).split('\n') if effect.strip()]
+            elif name.startswith("icon_"):
+                feature_items[int(name[5:])]['icon'] = value or DEFAULT_ICON
+            elif name.startswith("feature_desc_"):
+                feature_items[int(name[13:])]['desc'] = value
+    
+    return {'content': content, 'sections': {'feature_items': feature_items, 'effects_list': effects_list}}
+
+def generate_edm_assets(edm_data, material_summary="", structured_pdf_content=None,
+                        features_data=None, expected_effects="", banner_args=None, on_progress=None):
+    """콘텐츠, 배너, 기능/기대효과 향상을 의존성에 따라 병렬 생성
+    
+    Args:
+        edm_data: generate_edm_content 입력
+        material_summary: 자료 요약
+        structured_pdf_content: PDF 구조화 내용
+        features_data: 기능 입력 목록 (소개형)
+        expected_effects: 기대효과 입력 (소개형)
+        banner_args: (tone, color1, color2, bg_elements, banner_mode, banner_seed) - None이면 배너 생성 생략
+        on_progress: 중간 결과 콜백 (content, bg_svg_code, sections) - 호출 스레드에서 변경 시마다 호출
+    
+    Returns:
+        (content, bg_svg_code, prepared_sections, trace)
+    """
+    scheduler = TaskScheduler()
+    edm_type = edm_data.get('edm_type')
+    
+    # 진행 상황 (입력값으로 시작해 작업이 끝날 때마다 AI 결과로 교체)
+    progress_lock = threading.Lock()
+    progress = {'content': {}, 'bg_svg_code': None, 'changed': True}
+    default_sections = build_default_sections(edm_type, features_data, expected_effects)
+    progress['feature_items'] = [dict(item) for item in default_sections['feature_items']]
+    progress['effects_list'] = list(default_sections['effects_list'])
+    initial_title = edm_data.get('title_suggestion') or build_default_edm_content(edm_data)['title']
+    progress['content'] = {'title': initial_title, 'cta': edm_data.get('cta') or '자세히 보기'}
+    
+    def update_content(fields):
+        with progress_lock:
+            if any(progress['content'].get(key) != value for key, value in fields.items()):
+                progress['content'].update(fields)
+                progress['changed'] = True
+    
+    def on_result(name, value):
+        with progress_lock:
+            if name == "content" and value:
+                progress['content'] = dict(value)
+            elif name == "banner":
+                progress['bg_svg_code'] = value
+            elif name.startswith("icon_"):
+                progress['feature_items'][int(name[5:])]['icon'] = value
+            elif name.startswith("feature_desc_"):
+                progress['feature_items'][int(name[13:])]['desc'] = value
+            elif name == "sections" and value:
+                progress['feature_items'] = list(value.get('feature_items', []))
+                progress['effects_list'] = list(value.get('effects_list', []))
+            else:
+                return
+            progress['changed'] = True
+    
+    def flush_progress():
+        with progress_lock:
+            if not progress['changed']:
+                return
+            progress['changed'] = False
+            snapshot = (
+                dict(progress['content']),
+                progress['bg_svg_code'],
+                {'feature_items': [dict(item) for item in progress['feature_items']],
+                 'effects_list': list(progress['effects_list'])}
+            )
+        on_progress(*snapshot)
+    
+    on_partial = update_content if on_progress else None
+    default_content = build_default_edm_content(edm_data, edm_data.get('title_suggestion', ''))
+    
+    if BUNDLED_GENERATION:
+        # 한 번의 요청으로 전체 문구 생성, 요청 자체가 실패하면 기존 개별 요청 경로로 대체
+        scheduler.add(
+            "bundle",
+            lambda: generate_edm_bundle(edm_data, material_summary, structured_pdf_content,
+                                        features_data, expected_effects, on_partial=on_partial),
+            timeout=240
+        )
+        scheduler.add(
+            "content",
+            lambda bundle: bundle['content'] if bundle else generate_edm_content(
+                edm_data, material_summary, structured_pdf_content, on_partial=on_partial),
+            deps=["bundle"],
+            timeout=180,
+            default=default_content
+        )
+        scheduler.add(
+            "sections",
+            lambda bundle: bundle['sections'] if bundle else generate_sections(
+                edm_type, features_data, expected_effects, material_summary),
+            deps=["bundle"],
+            timeout=120,
+            default=default_sections
+        )
+    else:
+        # 타이틀 다듬기 → 본문 생성은 generate_edm_content 내부에서 순차 처리 (미리보기가 있으면 스트리밍)
+        scheduler.add(
+            "content",
+            lambda: generate_edm_content(edm_data, material_summary, structured_pdf_content, on_partial=on_partial),
+            timeout=180,
+            default=default_content
+        )
+        add_section_tasks(scheduler, edm_type, features_data, expected_effects, material_summary)
+    
+    if banner_args:
+        tone, color1, color2, bg_elements, mode, seed = banner_args
+        scheduler.add(
+            "banner",
+            lambda: generate_banner_svg(tone, color1, color2, bg_elements, mode, seed),
+            timeout=180
+        )
+    
+    if on_progress:
+        flush_progress()  # 입력값 기반 첫 미리보기 즉시 표시
+        results = scheduler.run(on_result=on_result, on_tick=flush_progress)
+    else:
+        results = scheduler.run()
+    
+    bg_svg_code = None
+    if banner_args:
+        bg_svg_code = results.get("banner") or generate_fallback_svg(
+            banner_args[1], banner_args[2], normalize_bg_effects(banner_args[3]), banner_args[5]
+        )
+    
+    # 같은 입력으로 다시 렌더링할 때(AI 수정 등) 기능/기대효과를 새로 생성하지 않도록 등록
+    if results.get("sections"):
+        get_section_memo().put("sections", (edm_type, features_data, expected_effects, material_summary),
+                               results["sections"])
+    
+    return results.get("content"), bg_svg_code, results.get("sections"), scheduler.trace
+
+# 렌더링 섹션 메모이제이션 항목 수 (섹션 이름 + 입력 해시 단위)
+SECTION_MEMO_ENTRIES = int(os.getenv("EDM_SECTION_MEMO_ENTRIES", "512"))
+
+class SectionMemo:
+    """EDM 렌더링 섹션 메모이제이션 (섹션 이름 + 입력 해시 → 출력, 메모리 LRU)
+    
+    AI 수정 후 다시 렌더링할 때 입력이 바뀐 섹션만 다시 계산합니다.
+    """
+
+    def __init__(self, max_entries=SECTION_MEMO_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(section, args):
+        canonical = json.dumps(args, sort_keys=True, ensure_ascii=False, default=str, separators=(",", ":"))
+        return section, hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def put(self, section, args, value):
+        """섹션 출력 저장 (다른 경로에서 계산한 결과를 같은 입력으로 등록할 때도 사용)"""
+        key = self.key(section, args)
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
 
-    # 1. 로고 위치 개선 - 헤더 섹션 생성
+    def render(self, section, fn, *args):
+        """fn(*args) 결과를 입력 해시로 재사용 (예외가 나면 저장하지 않음)"""
+        key = self.key(section, args)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        return self.put(section, args, fn(*args))
+
+@st.cache_resource
+def get_section_memo():
+    """렌더링 섹션 메모 (프로세스당 1회 생성)"""
+    return SectionMemo()
+
+def render_header_section(bg_svg_code, bg_image_path, theme_color, logos_html, title):
+    """헤더 섹션 (AI 배너 SVG > 업로드 배경 이미지 > 테마 컬러 순, 로고 위치 개선)"""
     if bg_svg_code:
-        header_section = f"""
-        <div class="hero-section">
-            <div class="hero-background">{bg_svg_code}</div>
-            <div class="hero-content">
-                <div class="logo-section">
-                    {create_logo_html(company_logo_b64, partner_logo_b64)}
-                </div>
-                <div class="title-content">
-                    <h1 class="hero-title">{content.get('title', '')}</h1>
-                </div>
-            </div>
-        </div>"""
-    elif bg_image_path and os.path.exists(bg_image_path):
+        return HERO_SVG_TEMPLATE.render(bg_svg=Markup(bg_svg_code), logos=Markup(logos_html), title=title)
+    if bg_image_path and os.path.exists(bg_image_path):
         with open(bg_image_path, 'rb') as f:
             bg_b64 = base64.b64encode(f.read()).decode()
-        header_section = f"""
-        <div class="hero-section hero-image" style="background-image:url(data:image/png;base64,{bg_b64});">
-            <div class="hero-content">
-                <div class="logo-section">
-                    {create_logo_html(company_logo_b64, partner_logo_b64)}
-                </div>
-                <div class="title-content">
-                    <h1 class="hero-title">{content.get('title', '')}</h1>
-                </div>
-            </div>
-        </div>"""
-    else:
-        header_section = f"""
-        <div class="header" style="background:linear-gradient(135deg, {theme_color}, {theme_color}aa);">
-            <div class="logo-section">
-                {create_logo_html(company_logo_b64, partner_logo_b64)}
-            </div>
-            <div class="title-content">
-                <h1 class="header-title">{content.get('title', '')}</h1>
-            </div>
-        </div>"""
+        return HERO_IMAGE_TEMPLATE.render(bg_b64=bg_b64, logos=Markup(logos_html), title=title)
+    return HEADER_TEMPLATE.render(theme_color=theme_color, logos=Markup(logos_html), title=title)
 
-    # 2. Bootstrap Icons 기반 기능 섹션 생성 (개선됨)
-    features_html = ""
-    if edm_type == "소개형" and features_data:
-        valid_features = [f for f in features_data if f['feature_name'].strip()]
-        if valid_features:
-            if layout_option == "1xN (세로)":
-                cols_per_row = 1
-            elif layout_option == "2xN (2열)":
-                cols_per_row = 2
-            elif layout_option == "3xN (3열)":
-                cols_per_row = 3
-            else:  # 자동
-                cols_per_row = 3 if len(valid_features) > 4 else 2 if len(valid_features) > 2 else 1
-            
-            features_html = f"""
-            <div class="features-section">
-                <h3 style="color: {theme_color}; margin-bottom: 20px;">{translated_fixed['주요 기능']}</h3>
-                <div class="features-grid" style="grid-template-columns: repeat({cols_per_row}, 1fr);">"""
-            
-            for i, feature in enumerate(valid_features):
-                # Bootstrap Icon 선택
-                icon_class = select_bootstrap_icon(feature['icon_keyword'])
-                
-                # AI로 기능 설명 향상
-                enhanced_desc = generate_enhanced_feature_description(
-                    feature['feature_name'], 
-                    feature['feature_desc'], 
-                    material_summary
-                )
-                
-                # 다국어 번역
-                if target_language != "ko":
-                    try:
-                        enhanced_desc = translate_text(enhanced_desc, target_language)
-                        feature_name = translate_text(feature['feature_name'], target_language)
-                    except:
-                        feature_name = feature['feature_name']
-                else:
-                    feature_name = feature['feature_name']
-                
-                features_html += f"""
-                <div class="feature-item">
-                    <div class="feature-icon">
-                        <i class="bi bi-{icon_class}"></i>
-                    </div>
-                    <h4 class="feature-title" style="color: {theme_color};">{feature_name}</h4>
-                    <p class="feature-desc">{enhanced_desc}</p>
-                </div>"""
-            
-            features_html += "</div></div>"
+def render_features_section(feature_items, layout_option, theme_color, heading):
+    """Bootstrap Icons 기반 기능 섹션 (기능이 없으면 빈 문자열)"""
+    if not feature_items:
+        return ""
+    if layout_option == "1xN (세로)":
+        cols_per_row = 1
+    elif layout_option == "2xN (2열)":
+        cols_per_row = 2
+    elif layout_option == "3xN (3열)":
+        cols_per_row = 3
+    else:  # 자동
+        cols_per_row = 3 if len(feature_items) > 4 else 2 if len(feature_items) > 2 else 1
+    
+    items_html = "".join(
+        FEATURE_ITEM_TEMPLATE.render(icon=item['icon'], theme_color=theme_color, name=item['name'], desc=item['desc'])
+        for item in feature_items
+    )
+    return FEATURES_SECTION_TEMPLATE.render(
+        theme_color=theme_color, heading=heading, cols_per_row=cols_per_row, items=Markup(items_html)
+    )
 
-    # 5. 기대효과 섹션 생성 (주요 기능 다음에 위치)
-    effects_html = ""
-    if expected_effects and edm_type == "소개형":
-        # AI로 기대효과 향상
-        enhanced_effects = generate_enhanced_expected_effects(expected_effects, material_summary)
-        
-        effects_list = [effect.strip() for effect in enhanced_effects.split('\n') if effect.strip()]
-        effects_items = ""
-        
-        for effect in effects_list:
-            if effect:
-                # 다국어 번역 (각 항목별로)
-                translated_effect = effect
-                if target_language != "ko":
-                    try:
-                        translated_effect = translate_text(effect, target_language)
-                    except:
-                        translated_effect = effect
-                
-                # **제목**: 설명 형식을 HTML로 변환
-                if '**' in translated_effect and ':' in translated_effect:
-                    # 이모티콘과 Bold 제목 처리
-                    parts = translated_effect.split(':', 1)
-                    if len(parts) == 2:
-                        title_part = parts[0].strip()
-                        desc_part = parts[1].strip()
-                        # **제목** 형식을 <strong>제목</strong>으로 변환
-                        title_part = title_part.replace('**', '')
-                        effects_items += f"<li class='expected-effect-item'><strong>{title_part}:</strong> {desc_part}</li>"
-                    else:
-                        effects_items += f"<li class='expected-effect-item'>{translated_effect}</li>"
-                else:
-                    effects_items += f"<li class='expected-effect-item'>{translated_effect}</li>"
-        
-        effects_html = f"""
-        <div class="section effects-section">
-            <h3 style="color: {theme_color}; margin-bottom: 15px;">{translated_fixed['기대효과']}</h3>
-            <ul class="effects-list">
-                {effects_items}
-            </ul>
-        </div>"""
+def render_effects_section(effects_list, theme_color, heading):
+    """기대효과 섹션 (주요 기능 다음에 위치, 항목이 없으면 빈 문자열)"""
+    if not effects_list:
+        return ""
+    effects_items = []
+    for translated_effect in effects_list:
+        # **제목**: 설명 형식을 <strong>제목:</strong> 설명으로 변환
+        if '**' in translated_effect and ':' in translated_effect:
+            title_part, desc_part = translated_effect.split(':', 1)
+            effects_items.append(EFFECT_TITLED_ITEM_TEMPLATE.render(
+                title=title_part.strip().replace('**', ''), desc=desc_part.strip()
+            ))
+        else:
+            effects_items.append(EFFECT_ITEM_TEMPLATE.render(text=translated_effect))
+    
+    return EFFECTS_SECTION_TEMPLATE.render(theme_color=theme_color, heading=heading, items=Markup("".join(effects_items)))
+
+def render_event_info_section(event_fields, theme_color, labels):
+    """초청형 행사 정보 박스 (행사 정보가 없으면 빈 문자열)"""
+    if not event_fields:
+        return ""
+    return EVENT_INFO_TEMPLATE.render(
+        theme_color=theme_color, heading=labels['행사 정보'],
+        date_label=labels['일시'], date=event_fields['date'],
+        location_label=labels['장소'], location=event_fields['location'],
+        target_label=labels['대상'], target=event_fields['target'],
+        host_label=labels['주최'], host=event_fields['host']
+    )
+
+def render_agenda_section(valid_sessions, theme_color, labels):
+    """아젠다 섹션 (세션이 없으면 빈 문자열)"""
+    if not valid_sessions:
+        return ""
+    rows = "".join(
+        AGENDA_ROW_TEMPLATE.render(time=session['time'], title=session['title'], speaker=session['speaker'])
+        for session in valid_sessions
+    )
+    return AGENDA_SECTION_TEMPLATE.render(
+        theme_color=theme_color, heading=labels['세션 일정'],
+        time_label=labels['시간'], session_label=labels['세션'],
+        speaker_label=labels['발표자'], rows=Markup(rows)
+    )
+
+def translation_segment_hash(text):
+    """번역 세그먼트 원문 해시 (이전 번역본 재사용 기준)"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+def translate_model_segments(segments, target_language, translations=None, usage=None):
+    """구조화 콘텐츠 필드를 세그먼트로 일괄 번역 (이전 번역은 원문 해시로 재사용)
+    
+    Args:
+        segments: 번역할 필드 값 리스트
+        target_language: 대상 언어 코드
+        translations: {원문 해시: 번역문} - 재사용할 번역, 이번 세그먼트의 번역만 남도록 갱신됨 (선택)
+        usage: 토큰 사용량을 누적할 딕셔너리 (선택)
+    
+    Returns:
+        {원문: 번역문}
+    """
+    translations = {} if translations is None else translations
+    unique = [segment for segment in dict.fromkeys(segments) if isinstance(segment, str) and segment.strip()]
+    hashes = {segment: translation_segment_hash(segment) for segment in unique}
+    
+    changed = [segment for segment in unique if hashes[segment] not in translations]
+    if changed:
+        for source, translated in zip(changed, translate_batch(changed, target_language, usage=usage)):
+            translations[hashes[source]] = translated
+    print(f"구조화 번역 ({target_language}): 세그먼트 {len(unique)}개 중 {len(changed)}개 번역, "
+          f"{len(unique) - len(changed)}개 재사용")
+    
+    current = set(hashes.values())
+    for key in [key for key in translations if key not in current]:
+        del translations[key]
+    return {segment: translations[hashes[segment]] for segment in unique}
 
-    # 초청형 행사 정보 박스
-    event_info_html = ""
+def create_improved_html_edm(content, edm_type, company_logo_light, company_logo_dark, 
+                           partner_logo, cta_url, sessions=None, theme_color="#8EC5FC", 
+                           bg_image_path=None, event_info=None, features_data=None, 
+                           layout_option="자동", bg_svg_code=None, expected_effects="", 
+                           target_language="ko", material_summary="", footer_info=None,
+                           prepared_sections=None, translations=None, translation_usage=None, memoize=True):
+    """개선된 HTML EDM 생성 (Footer 개선 포함)
+    
+    prepared_sections가 주어지면 기능/기대효과 AI 향상 결과를 재사용하고, 없으면 같은 입력으로
+    이전에 계산한 결과(섹션 메모)를 사용합니다. 각 HTML 섹션도 입력이 바뀐 경우에만 다시 만듭니다.
+    target_language가 한국어가 아니면 렌더링 전에 필드 값을 번역하며, translations({원문 해시: 번역문})가
+    주어지면 바뀐 필드만 번역하고 결과를 같은 딕셔너리에 반영합니다.
+    memoize=False이면 섹션 메모를 조회/저장하지 않습니다 (생성 중 단계별 미리보기처럼 일회성 렌더링).
+    """
+    theme_color = sanitize_theme_color(theme_color)
+    if memoize:
+        render_section = get_section_memo().render
+    else:
+        def render_section(section, fn, *args):
+            return fn(*args)
+    
+    # 개선된 배경 분석 기반 로고 선택 (URL 기반)
+    selected_logo_url = select_logo_by_background_analysis(
+        theme_color, bg_svg_code, bg_image_path, 
+        company_logo_light, company_logo_dark
+    )
+    
+    # 로고 로드(자산 저장소 재사용)와 기능/기대효과 AI 향상을 병렬 실행
+    scheduler = TaskScheduler()
+    scheduler.add("company_logo", lambda: load_image_base64(selected_logo_url) if selected_logo_url else "", default="")
+    scheduler.add("partner_logo", lambda: load_image_base64(partner_logo) if partner_logo else "", default="")
+    if prepared_sections is None:
+        scheduler.add(
+            "sections",
+            lambda: render_section("sections", generate_sections, edm_type, features_data, expected_effects, material_summary),
+            default={}
+        )
+    results = scheduler.run()
+    
+    company_logo_b64 = results["company_logo"]
+    partner_logo_b64 = results["partner_logo"]
+    
+    # 기능/기대효과 (번역 전 한국어 원문)
+    sections = prepared_sections or results.get("sections") or {}
+    feature_items = list(sections.get('feature_items', []))
+    effects_list = list(sections.get('effects_list', []))
+    
+    event_fields = {}
     if edm_type == "초청형" and event_info:
-        # 다국어 번역
-        if target_language != "ko":
-            try:
-                event_date = translate_text(event_info.get('date', '미정'), target_language)
-                event_location = translate_text(event_info.get('location', '미정'), target_language)
-                event_target = translate_text(event_info.get('target', '미정'), target_language)
-                event_host = translate_text(event_info.get('host', '미정'), target_language)
-            except:
-                event_date = event_info.get('date', '미정')
-                event_location = event_info.get('location', '미정')
-                event_target = event_info.get('target', '미정')
-                event_host = event_info.get('host', '미정')
-        else:
-            event_date = event_info.get('date', '미정')
-            event_location = event_info.get('location', '미정')
-            event_target = event_info.get('target', '미정')
-            event_host = event_info.get('host', '미정')
-        
-        event_info_html = f"""
-        <div class="event-info-box" style="background: {theme_color}dd;">
-            <h3 style="color: white; margin-bottom: 15px;">{translated_fixed['행사 정보']}</h3>
-            <table class="event-info-table">
-                <tr><td><strong>{translated_fixed['일시']}</strong></td><td>{event_date}</td></tr>
-                <tr><td><strong>{translated_fixed['장소']}</strong></td><td>{event_location}</td></tr>
-                <tr><td><strong>{translated_fixed['대상']}</strong></td><td>{event_target}</td></tr>
-                <tr><td><strong>{translated_fixed['주최']}</strong></td><td>{event_host}</td></tr>
-            </table>
-        </div>"""
-
-    # 아젠다 섹션
-    agenda_html = ""
+        event_fields = {key: event_info.get(key, '미정') for key in ('date', 'location', 'target', 'host')}
+    
+    valid_sessions = []
     if edm_type == "초청형" and sessions:
         valid_sessions = [s for s in sessions if s['title'].strip()]
-        if valid_sessions:
-            rows = ""
-            for session in valid_sessions:
-                # 다국어 번역
-                if target_language != "ko":
-                    try:
-                        session_title = translate_text(session['title'], target_language)
-                        session_speaker = translate_text(session['speaker'], target_language)
-                    except:
-                        session_title = session['title']
-                        session_speaker = session['speaker']
-                else:
-                    session_title = session['title']
-                    session_speaker = session['speaker']
-                
-                rows += f"""
-                <tr>
-                    <td class="agenda-time">{session['time']}</td>
-                    <td class="agenda-title">{session_title}</td>
-                    <td class="agenda-speaker">{session_speaker}</td>
-                </tr>"""
-            
-            agenda_html = f"""
-            <div class="section agenda-section">
-                <h3 style="color: {theme_color}; margin-bottom: 15px;">{translated_fixed['세션 일정']}</h3>
-                <table class="agenda-table">
-                    <thead>
-                        <tr>
-                            <th>{translated_fixed['시간']}</th>
-                            <th>{translated_fixed['세션']}</th>
-                            <th>{translated_fixed['발표자']}</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-                        {rows}
-                    </tbody>
-                </table>
-            </div>"""
-
+    
     # Footer 정보 처리 (개선됨)
     if footer_info:
         company_name = footer_info.get('company_name', '㈜웅진')
         address = footer_info.get('address', '서울특별시 중구 청계천로24 케이스퀘어시티 7층')
         website = footer_info.get('website', 'www.woongjin.com')
         contact = footer_info.get('contact', '02-2250-1000')
-        
-        # 다국어 번역
-        if target_language != "ko":
-            try:
-                company_name = translate_text(company_name, target_language)
-                address = translate_text(address, target_language)
-            except:
-                pass
     else:
         # 기본값 (한국어)
         company_name = '㈜웅진'
@@ -2578,6 +4883,50 @@ def create_improved_html_edm(content, edm_type, company_logo_light, company_logo
         website = 'www.woongjin.com'
         contact = '02-2250-1000'
 
+    # 다국어 번역 적용 (모든 세그먼트를 한 번의 일괄 요청으로 번역)
+    translated_fixed = get_fixed_translations(target_language)
+    if target_language != "ko":
+        try:
+            content_keys = [key for key, value in content.items() if value and isinstance(value, str)]
+            segments = [content[key] for key in content_keys]
+            segments += [item['name'] for item in feature_items] + [item['desc'] for item in feature_items]
+            segments += effects_list
+            segments += list(event_fields.values())
+            for session in valid_sessions:
+                segments += [session['title'], session['speaker']]
+            if footer_info:
+                segments += [company_name, address]
+            
+            translated_map = translate_model_segments(segments, target_language, translations, translation_usage)
+            
+            def tr(text):
+                return translated_map.get(text, text)
+            
+            content = dict(content)
+            content.update({key: tr(content[key]) for key in content_keys})
+            feature_items = [dict(item, name=tr(item['name']), desc=tr(item['desc'])) for item in feature_items]
+            effects_list = [tr(effect) for effect in effects_list]
+            event_fields = {key: tr(value) for key, value in event_fields.items()}
+            valid_sessions = [dict(session, title=tr(session['title']), speaker=tr(session['speaker'])) for session in valid_sessions]
+            if footer_info:
+                company_name, address = tr(company_name), tr(address)
+        except Exception as e:
+            print(f"번역 오류: {str(e)}")
+
+    # 사용자/AI 입력은 모두 이스케이프 후 템플릿 슬롯에 채움 (섹션별로 입력이 같으면 재사용)
+    logos_html = create_logo_html(company_logo_b64, partner_logo_b64)
+    if bg_image_path and not bg_svg_code:
+        # 업로드 배경 이미지는 같은 경로에 다른 파일이 저장될 수 있어 매번 읽음
+        header_section = render_header_section(bg_svg_code, bg_image_path, theme_color, logos_html, content.get('title', ''))
+    else:
+        header_section = render_section("header", render_header_section, bg_svg_code, bg_image_path, theme_color,
+                                        logos_html, content.get('title', ''))
+    features_html = render_section("features", render_features_section, feature_items, layout_option, theme_color,
+                                   translated_fixed['주요 기능'])
+    effects_html = render_section("effects", render_effects_section, effects_list, theme_color, translated_fixed['기대효과'])
+    event_info_html = render_section("event_info", render_event_info_section, event_fields, theme_color, translated_fixed)
+    agenda_html = render_section("agenda", render_agenda_section, valid_sessions, theme_color, translated_fixed)
+
     # 언어 코드 설정
     language_codes = {
         "ko": "ko", "en": "en", "ja": "ja",
@@ -2585,464 +4934,355 @@ def create_improved_html_edm(content, edm_type, company_logo_light, company_logo
     }
     lang_code = language_codes.get(target_language, "ko")
 
-    # 향상된 CSS 스타일
-    enhanced_css = get_enhanced_css_styles(theme_color)
+    return EDM_DOCUMENT_TEMPLATE.render(
+        lang_code=lang_code,
+        page_title=content.get('title', 'EDM'),
+        css=Markup(get_enhanced_css_styles(theme_color)),  # 테마 컬러별 1회 생성 후 재사용
+        target_language=target_language,
+        header_section=Markup(header_section),
+        event_info_html=Markup(event_info_html),
+        highlight=content.get('highlight', ''),
+        body=Markup('<br>').join((content.get('body') or '').split(chr(10))),  # 줄마다 이스케이프 후 줄바꿈
+        features_html=Markup(features_html),
+        effects_html=Markup(effects_html),
+        agenda_html=Markup(agenda_html),
+        closing=content.get('closing', ''),
+        cta_url=cta_url,
+        cta=content.get('cta', '자세히 보기'),
+        company_logo=company_logo_b64,
+        company_name=company_name,
+        address=address,
+        website=website,
+        contact=contact
+    )
 
-    return f"""<!DOCTYPE html>
-<html lang='{lang_code}'>
-<head>
-    <meta charset='UTF-8'>
-    <meta name='viewport' content='width=device-width, initial-scale=1.0'>
-    <title>{content.get('title', 'EDM')}</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap-icons@1.11.0/font/bootstrap-icons.css" rel="stylesheet">
-    {enhanced_css}
-    <script>
-        document.addEventListener('DOMContentLoaded', function() {{
-            // 반응형 높이 조정
-            const heroSection = document.querySelector('.hero-section, .hero-image');
-            
-            if (heroSection) {{
-                const adjustHeroHeight = () => {{
-                    const baseHeight = window.innerWidth <= 600 ? 160 : 
-                                     window.innerWidth <= 768 ? 180 : 220;
-                    heroSection.style.minHeight = baseHeight + 'px';
-                    
-                    // hero-background도 같이 조정
-                    const heroBackground = document.querySelector('.hero-background');
-                    if (heroBackground) {{
-                        heroBackground.style.height = baseHeight + 'px';
-                    }}
-                }};
-                
-                // 초기 조정
-                adjustHeroHeight();
-                
-                // 창 크기 변경 시 재조정
-                window.addEventListener('resize', adjustHeroHeight);
-            }}
-        }});
-    </script>
-</head>
-<body class="lang-{target_language}">
-    <div class='container'>
-        {header_section}
-        {event_info_html}
-        <div class='section highlight-section'>
-            <strong class="highlight-text">{content.get('highlight', '')}</strong>
-        </div>
-        <div class='section main-content'>
-            {content.get('body', '').replace(chr(10), '<br>')}
-        </div>
-        {features_html}
-        {effects_html}
-        {agenda_html}
-        <div class='section closing-section'>
-            {content.get('closing', '')}
-        </div>
-        <div class='cta'>
-            <a href='{cta_url}' class='cta-button'>{content.get('cta', '자세히 보기')}</a>
-        </div>
-        <div class='footer-bar'>
-            <img src="data:image/png;base64,{company_logo_b64}" style="height:40px;" alt="Company Logo">
-            <div style="text-align:right; line-height:1.8;">
-                <div class="footer-company-info" style="text-align:right;">{company_name}</div>
-                <div class="footer-address" style="text-align:right;">{address}</div>
-                <div style="text-align:right;"><a href="https://{website}" class="footer-website">{website}</a> | <span class="footer-contact">{contact}</span></div>
-            </div>
-        </div>
-    </div>
-</body>
-</html>"""
+
+# 번역 제외 영역(로고, 배너, 웹사이트 URL)과 텍스트를 번역하지 않는 태그
+TRANSLATION_EXCLUDED_CLASSES = {'logo-section', 'hero-background', 'footer-website'}
+TRANSLATION_SKIPPED_TAGS = {'head', 'script', 'style', 'svg', 'noscript'}
+# 세그먼트 우선순위 (조상 중 가장 높은 우선순위 기준, 일괄 번역 요청에서 앞쪽에 배치)
+TRANSLATION_PRIORITY = {
+    key: index for index, key in enumerate((
+        'expected-effect-item', 'feature-title', 'feature-desc', 'highlight-text', 'cta-button',
+        'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'strong', 'em', 'p', 'th', 'td', 'li', 'span'
+    ))
+}
+
+def parse_edm_html(html_content):
+    """EDM HTML 파싱 (lxml 파서 우선, 설치되지 않았으면 html.parser)"""
+    try:
+        return BeautifulSoup(html_content, 'lxml')
+    except FeatureNotFound:
+        return BeautifulSoup(html_content, 'html.parser')
+
+def is_translatable_text(text):
+    """번역 대상 텍스트 여부 (2자 이상, 숫자만 있는 텍스트와 태그 문자열 제외)"""
+    if len(text) <= 1 or '<' in text or '>' in text:
+        return False
+    return not text.replace(' ', '').replace('-', '').replace(':', '').replace('.', '').isdigit()
+
+def extract_translation_segments(soup):
+    """EDM DOM을 한 번 순회하며 텍스트 노드를 분류하고 번역 세그먼트 표 생성
+    
+    Returns:
+        (segments, units) - segments는 중복 제거된 원문 리스트 (우선순위, 문서 순서),
+        units는 텍스트 노드별 (노드, 원문, 제목 없는 기대효과 항목 여부)
+    """
+    units = []
+    first_seen = {}  # 원문 -> (우선순위, 처음 나온 순서)
+    default_priority = len(TRANSLATION_PRIORITY)
+    
+    stack = [(soup.body or soup, default_priority)]
+    while stack:
+        node, priority = stack.pop()
+        
+        if isinstance(node, NavigableString):
+            if isinstance(node, PreformattedString):  # 주석, DOCTYPE 등
+                continue
+            text = node.strip()
+            if is_translatable_text(text):
+                first_seen.setdefault(text, (priority, len(first_seen)))
+                parent = node.parent
+                plain_effect = (parent.name == 'li' and 'expected-effect-item' in parent.get('class', [])
+                                and parent.find('strong') is None)
+                units.append((node, text, plain_effect))
+            continue
+        
+        classes = node.get('class', [])
+        if node.name in TRANSLATION_SKIPPED_TAGS or TRANSLATION_EXCLUDED_CLASSES.intersection(classes):
+            continue
+        matched = [TRANSLATION_PRIORITY[key] for key in (node.name, *classes) if key in TRANSLATION_PRIORITY]
+        if matched:
+            priority = min(priority, *matched)
+        # 문서 순서대로 꺼내도록 역순으로 쌓기
+        stack.extend((child, priority) for child in reversed(node.contents))
+    
+    segments = sorted(first_seen, key=first_seen.get)
+    return segments, units
+
+def apply_translation_segments(soup, units, translations):
+    """텍스트 노드 참조로 번역문 적용 (앞뒤 공백 유지, 제목 없는 기대효과 항목은 '제목:'을 강조)"""
+    for node, source, plain_effect in units:
+        translated = translations.get(source) or source
+        raw = str(node)
+        leading = raw[:len(raw) - len(raw.lstrip())]
+        trailing = raw[len(raw.rstrip()):]
+        
+        if plain_effect and ':' in translated:
+            title_part, desc_part = translated.split(':', 1)
+            strong_tag = soup.new_tag('strong')
+            strong_tag.string = f"{title_part.strip()}:"
+            node.replace_with(strong_tag)
+            if desc_part.strip():
+                strong_tag.insert_after(NavigableString(f" {desc_part.strip()}{trailing}"))
+        else:
+            node.replace_with(NavigableString(f"{leading}{translated}{trailing}"))
+
+def translate_edm_soup(soup, target_language, translations=None):
+    """파싱된 EDM DOM을 번역하여 HTML 문자열 반환
+    
+    translations(원문 → 번역문)가 주어지면 API 호출 없이 해당 번역을 적용하며,
+    그 외에 개별 번역한 텍스트는 같은 딕셔너리에 추가됩니다.
+    """
+    segments, units = extract_translation_segments(soup)
+    
+    if translations is None:
+        translations = dict(zip(segments, translate_batch(segments, target_language)))
+    
+    # 일괄 번역 결과에 없는 세그먼트는 개별 번역
+    for segment in segments:
+        if segment not in translations:
+            translations[segment] = translate_text(segment, target_language)
+    
+    apply_translation_segments(soup, units, translations)
+    
+    # body 태그에 언어 클래스 추가
+    body_tag = soup.find('body')
+    if body_tag:
+        current_classes = body_tag.get('class', [])
+        # 기존 언어 클래스 제거
+        current_classes = [cls for cls in current_classes if not cls.startswith('lang-')]
+        # 새 언어 클래스 추가
+        current_classes.append(f'lang-{target_language}')
+        body_tag['class'] = current_classes
+    
+    return str(soup)
 
 def translate_edm_content(html_content, target_language):
     """생성된 EDM을 다른 언어로 완전 번역 - 모든 텍스트 포함"""
     try:
         # HTML에서 텍스트 추출
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # 번역할 요소들 찾기 - 더 포괄적으로
-        translatable_selectors = [
-            'h1', 'h2', 'h3', 'h4', 'h5', 'h6',  # 제목들
-            'p',  # 문단
-            '.highlight-text',  # 하이라이트 박스
-            '.cta-button',  # CTA 버튼
-            '.feature-title',  # 기능 제목
-            '.feature-description',  # 기능 설명
-            '.expected-effect-item',  # 기대효과 항목
-            '.effects-section h3',  # 기대효과 섹션 제목 (특별 처리)
-            '.footer-company-info',  # Footer 회사명
-            '.footer-address',  # Footer 주소
-            '.footer-contact',  # Footer 연락처
-            'td',  # 테이블 셀
-            'li',  # 리스트 항목
-            '.section',  # 섹션 내용
-            'strong',  # 강조 텍스트
-            'em',  # 기울임 텍스트
-            'span'  # 스팬 텍스트
-        ]
-        
-        # 번역 제외할 클래스/ID (로고, 이미지, 웹사이트 URL 등)
-        exclude_classes = ['logo-section', 'hero-background', 'footer-website']
-        
-        # 모든 번역 대상 요소 수집
-        translatable_elements = []
-        
-        for selector in translatable_selectors:
-            elements = soup.select(selector)
-            for element in elements:
-                # 제외할 클래스가 있는지 확인
-                if any(cls in element.get('class', []) for cls in exclude_classes):
-                    continue
-                
-                # 부모 요소가 제외 클래스인지 확인
-                parent_excluded = False
-                for parent in element.parents:
-                    if any(cls in parent.get('class', []) for cls in exclude_classes):
-                        parent_excluded = True
-                        break
-                
-                if parent_excluded:
-                    continue
-                
-                # 텍스트가 있고 자식 요소가 없는 경우만 번역
-                text_content = element.get_text().strip()
-                if text_content and len(text_content) > 1:
-                    # 숫자만 있는 경우 제외
-                    if not text_content.replace(' ', '').replace('-', '').replace(':', '').replace('.', '').isdigit():
-                        translatable_elements.append(element)
-        
-        # 중복 제거 및 번역 우선순위 설정
-        seen_texts = set()
-        unique_elements = []
-        
-        # 요소별 우선순위 설정 (더 구체적인 요소를 우선)
-        priority_order = [
-            '.effects-section h3',  # 기대효과 섹션 제목 (최우선)
-            '.expected-effect-item', '.feature-title', '.feature-description',
-            '.highlight-text', '.cta-button', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
-            'strong', 'em', 'p', 'td', 'li', 'span', '.section'
-        ]
-        
-        # 우선순위에 따라 정렬
-        sorted_elements = []
-        for priority in priority_order:
-            for element in translatable_elements:
-                # CSS 선택자 매칭 개선
-                matches = False
-                
-                if priority.startswith('.'):
-                    # 클래스 선택자 처리
-                    if ' ' in priority:
-                        # 복합 선택자 (예: .effects-section h3)
-                        parts = priority.split()
-                        parent_class = parts[0][1:]  # 점 제거
-                        child_tag = parts[1]
-                        
-                        # 부모에 해당 클래스가 있고, 현재 요소가 해당 태그인지 확인
-                        if element.name == child_tag:
-                            for parent in element.parents:
-                                if parent_class in parent.get('class', []):
-                                    matches = True
-                                    break
-                    else:
-                        # 단일 클래스 선택자
-                        class_name = priority[1:]  # 점 제거
-                        matches = class_name in element.get('class', [])
-                else:
-                    # 태그 선택자
-                    matches = element.name == priority
-                
-                if matches:
-                    text = element.get_text().strip()
-                    if text not in seen_texts and len(text) > 1:
-                        # 숫자만 있는 경우 제외
-                        if not text.replace(' ', '').replace('-', '').replace(':', '').replace('.', '').isdigit():
-                            seen_texts.add(text)
-                            sorted_elements.append(element)
-        
-        # 나머지 요소들 추가
-        for element in translatable_elements:
-            text = element.get_text().strip()
-            if text not in seen_texts and len(text) > 1:
-                if not text.replace(' ', '').replace('-', '').replace(':', '').replace('.', '').isdigit():
-                    seen_texts.add(text)
-                    sorted_elements.append(element)
-        
-        # 기대효과 섹션 특별 처리 (구조 완전 보존)
-        effects_section = soup.find('div', class_='effects-section')
-        if effects_section:
-            try:
-                # 기대효과 섹션 제목 번역
-                section_title = effects_section.find('h3')
-                if section_title and section_title.get_text().strip():
-                    title_text = section_title.get_text().strip()
-                    translated_title = translate_text(title_text, target_language)
-                    section_title.string = translated_title
-                
-                # effects-list 내의 모든 expected-effect-item 처리
-                effects_list = effects_section.find('ul', class_='effects-list')
-                if effects_list:
-                    effect_items = effects_list.find_all('li', class_='expected-effect-item')
-                    
-                    for item in effect_items:
-                        try:
-                            original_text = item.get_text().strip()
-                            if not original_text:
-                                continue
-                                
-                            # strong 태그 확인
-                            strong_tag = item.find('strong')
-                            
-                            if strong_tag:
-                                # 기존 strong 태그가 있는 경우
-                                strong_text = strong_tag.get_text().strip()
-                                
-                                # strong 태그 이후의 텍스트 추출
-                                remaining_text = ""
-                                for content in item.contents:
-                                    if hasattr(content, 'name') and content.name == 'strong':
-                                        continue
-                                    elif isinstance(content, str):
-                                        remaining_text += content.strip()
-                                
-                                # 각각 번역
-                                translated_strong = translate_text(strong_text, target_language)
-                                translated_remaining = translate_text(remaining_text, target_language) if remaining_text else ""
-                                
-                                # 구조 재구성
-                                item.clear()
-                                new_strong = soup.new_tag('strong')
-                                new_strong.string = translated_strong
-                                item.append(new_strong)
-                                
-                                if translated_remaining:
-                                    from bs4 import NavigableString
-                                    item.append(NavigableString(f" {translated_remaining}"))
-                                    
-                            else:
-                                # strong 태그가 없는 경우 - 새로 생성하되 최소한 띄어쓰기로 구분
-                                full_translated = translate_text(original_text, target_language)
-                                
-                                # 콜론 기준 분리
-                                if ':' in full_translated:
-                                    colon_index = full_translated.find(':')
-                                    title_part = full_translated[:colon_index+1].strip()
-                                    desc_part = full_translated[colon_index+1:].strip()
-                                    
-                                    item.clear()
-                                    strong_tag = soup.new_tag('strong')
-                                    strong_tag.string = title_part
-                                    item.append(strong_tag)
-                                    
-                                    if desc_part:
-                                        from bs4 import NavigableString
-                                        item.append(NavigableString(f" {desc_part}"))
-                                else:
-                                    # 콜론이 없는 경우 - 이모티콘 기준으로 분리 시도
-                                    emoji_match = re.search(r'([\U0001F300-\U0001F9FF][^:]*:?)', full_translated)
-                                    if emoji_match:
-                                        title_part = emoji_match.group(1).strip()
-                                        desc_part = full_translated[emoji_match.end():].strip()
-                                        
-                                        item.clear()
-                                        strong_tag = soup.new_tag('strong')
-                                        strong_tag.string = title_part
-                                        item.append(strong_tag)
-                                        
-                                        if desc_part:
-                                            from bs4 import NavigableString
-                                            item.append(NavigableString(f" {desc_part}"))
-                                    else:
-                                        # 최후의 수단: 전체를 strong으로 처리하되 띄어쓰기 추가
-                                        item.clear()
-                                        
-                                        # 문장을 적절히 나누어 띄어쓰기 확보
-                                        sentences = re.split(r'([.!?])', full_translated)
-                                        formatted_text = ""
-                                        for i in range(0, len(sentences)-1, 2):
-                                            if i < len(sentences):
-                                                sentence = sentences[i].strip()
-                                                punctuation = sentences[i+1] if i+1 < len(sentences) else ""
-                                                if sentence:
-                                                    formatted_text += sentence + punctuation + " "
-                                        
-                                        if not formatted_text.strip():
-                                            formatted_text = full_translated
-                                        
-                                        strong_tag = soup.new_tag('strong')
-                                        strong_tag.string = formatted_text.strip()
-                                        item.append(strong_tag)
-                                    
-                        except Exception as e:
-                            print(f"개별 기대효과 항목 처리 오류: {str(e)}")
-                            # 오류 발생 시에도 최소한 띄어쓰기는 확보
-                            try:
-                                original_text = item.get_text().strip()
-                                translated_text = translate_text(original_text, target_language)
-                                
-                                # 최소한의 띄어쓰기 처리
-                                formatted_text = re.sub(r'([.!?])([A-Z가-힣])', r'\1 \2', translated_text)
-                                formatted_text = re.sub(r'([:])\s*([A-Z가-힣])', r'\1 \2', formatted_text)
-                                
-                                item.clear()
-                                item.string = formatted_text
-                            except:
-                                continue
-                            
-            except Exception as e:
-                print(f"기대효과 섹션 전체 처리 오류: {str(e)}")
-                # 섹션 전체 오류 시 최소한 텍스트 내용에 띄어쓰기 추가
-                try:
-                    effects_text = effects_section.get_text()
-                    if effects_text:
-                        # 기본적인 띄어쓰기 개선
-                        improved_text = re.sub(r'([.!?])([A-Z가-힣])', r'\1 \2', effects_text)
-                        improved_text = re.sub(r'([:])\s*([A-Z가-힣])', r'\1 \2', improved_text)
-                        
-                        # 이모티콘 뒤에 띄어쓰기 추가
-                        improved_text = re.sub(r'([\U0001F300-\U0001F9FF])([A-Z가-힣])', r'\1 \2', improved_text)
-                        
-                        effects_section.string = improved_text
-                except:
-                    pass
-        
-        # 각 요소를 번역
-        translated_texts = {}  # 번역 캐시
-        
-        for element in sorted_elements:
-            original_text = element.get_text().strip()
-            if original_text and len(original_text) > 1:
-                try:
-                    # 특수 문자나 HTML 태그가 포함된 경우 건너뛰기
-                    if '<' in original_text or '>' in original_text:
-                        continue
-                    
-                    # 이미 번역된 텍스트인지 확인
-                    if original_text in translated_texts:
-                        translated_text = translated_texts[original_text]
-                    else:
-                        translated_text = translate_text(original_text, target_language)
-                        translated_texts[original_text] = translated_text
-                    
-                    # expected-effect-item 클래스를 가진 li 요소 특별 처리 (완전 개선)
-                    if element.name == 'li' and 'expected-effect-item' in element.get('class', []):
-                        try:
-                            # 원본 HTML 구조 완전 분석
-                            original_html = str(element)
-                            has_strong = element.find('strong')
-                            
-                            if has_strong:
-                                # strong 태그 내용과 나머지 텍스트 분리
-                                strong_text = has_strong.get_text().strip()
-                                
-                                # strong 태그 이후의 모든 텍스트 수집
-                                remaining_text = ""
-                                for content in element.contents:
-                                    if hasattr(content, 'name') and content.name == 'strong':
-                                        continue
-                                    elif isinstance(content, str):
-                                        remaining_text += content.strip()
-                                
-                                # 각각 개별 번역
-                                translated_strong = translate_text(strong_text, target_language)
-                                if remaining_text:
-                                    translated_remaining = translate_text(remaining_text, target_language)
-                                else:
-                                    translated_remaining = ""
-                                
-                                # HTML 구조 완전 재구성 (한국어 버전과 동일하게)
-                                element.clear()
-                                
-                                # strong 태그 생성 및 추가
-                                new_strong = soup.new_tag('strong')
-                                new_strong.string = translated_strong
-                                element.append(new_strong)
-                                
-                                # 나머지 텍스트 추가 (공백 포함)
-                                if translated_remaining:
-                                    from bs4 import NavigableString
-                                    element.append(NavigableString(f" {translated_remaining}"))
-                                
-                            else:
-                                # strong 태그가 없는 경우 - 전체 번역 후 구조 생성
-                                full_translated = translate_text(original_text, target_language)
-                                
-                                # 콜론을 기준으로 제목과 설명 분리
-                                if ':' in full_translated:
-                                    colon_index = full_translated.find(':')
-                                    title_part = full_translated[:colon_index+1].strip()  # 콜론 포함
-                                    desc_part = full_translated[colon_index+1:].strip()
-                                    
-                                    # HTML 구조 생성 (한국어 버전과 완전 동일)
-                                    element.clear()
-                                    
-                                    # strong 태그로 제목 부분 감싸기
-                                    strong_tag = soup.new_tag('strong')
-                                    strong_tag.string = title_part
-                                    element.append(strong_tag)
-                                    
-                                    # 설명 부분 추가 (공백 포함)
-                                    if desc_part:
-                                        from bs4 import NavigableString
-                                        element.append(NavigableString(f" {desc_part}"))
-                                else:
-                                    # 콜론이 없는 경우 전체를 strong으로 처리
-                                    element.clear()
-                                    strong_tag = soup.new_tag('strong')
-                                    strong_tag.string = full_translated
-                                    element.append(strong_tag)
-                                    
-                        except Exception as e:
-                            print(f"기대효과 항목 번역 오류: {str(e)}")
-                            # 오류 발생 시에도 구조 유지
-                            try:
-                                element.clear()
-                                strong_tag = soup.new_tag('strong')
-                                strong_tag.string = translated_text if translated_text else original_text
-                                element.append(strong_tag)
-                            except:
-                                # 최후의 수단
-                                if element.string:
-                                    element.string = translated_text if translated_text else original_text
-                    else:
-                        # 번역된 텍스트로 교체
-                        if element.string:
-                            element.string = translated_text
-                        else:
-                            # 자식 요소가 있는 경우 직접 텍스트 노드 교체
-                            if element.contents:
-                                # 텍스트 노드만 찾아서 교체
-                                for i, content in enumerate(element.contents):
-                                    if isinstance(content, str) and content.strip():
-                                        element.contents[i] = translated_text
-                                        break
-                                else:
-                                    # 텍스트 노드가 없으면 새로 추가
-                                    element.clear()
-                                    element.string = translated_text
-                            else:
-                                element.string = translated_text
-                            
-                except Exception as e:
-                    print(f"개별 번역 오류 ({original_text}): {str(e)}")
-                    continue
-        
-        # body 태그에 언어 클래스 추가
-        body_tag = soup.find('body')
-        if body_tag:
-            current_classes = body_tag.get('class', [])
-            # 기존 언어 클래스 제거
-            current_classes = [cls for cls in current_classes if not cls.startswith('lang-')]
-            # 새 언어 클래스 추가
-            current_classes.append(f'lang-{target_language}')
-            body_tag['class'] = current_classes
-        
-        return str(soup)
+        soup = parse_edm_html(html_content)
+        return translate_edm_soup(soup, target_language)
         
     except Exception as e:
         print(f"번역 오류: {str(e)}")
         return html_content
 
+def translate_edm_incremental(html_content, target_language, previous_segments=None):
+    """이전 번역본의 세그먼트 번역을 원문 해시 기준으로 재사용하고 바뀐 세그먼트만 번역
+    
+    Args:
+        html_content: 한국어 EDM HTML
+        target_language: 대상 언어 코드
+        previous_segments: 이전 번역본의 {원문 해시: 번역문} (같은 언어)
+    
+    Returns:
+        (번역된 HTML, {원문 해시: 번역문}) - 번역 실패 시 원본 HTML과 이전 세그먼트
+    """
+    previous_segments = previous_segments or {}
+    try:
+        soup = parse_edm_html(html_content)
+        segments, _ = extract_translation_segments(soup)
+        
+        translations = {}
+        changed = []
+        for segment in segments:
+            previous = previous_segments.get(translation_segment_hash(segment))
+            if previous is not None:
+                translations[segment] = previous
+            elif segment not in changed:
+                changed.append(segment)
+        
+        if changed:
+            translations.update(zip(changed, translate_batch(changed, target_language)))
+        print(f"증분 번역 ({target_language}): 세그먼트 {len(segments)}개 중 {len(changed)}개 번역, "
+              f"{len(segments) - len(changed)}개 재사용")
+        
+        translated_html = translate_edm_soup(soup, target_language, translations)
+        return translated_html, {translation_segment_hash(source): text for source, text in translations.items()}
+    
+    except Exception as e:
+        print(f"번역 오류: {str(e)}")
+        return html_content, previous_segments
+
+def build_edm_render_kwargs(state):
+    """저장된 구조화 콘텐츠 모델(session_state 등)로 create_improved_html_edm 인자 구성
+    
+    원본 콘텐츠가 없으면 None (번역 시 HTML 기반 경로 사용)
+    """
+    if not state.get('original_content'):
+        return None
+    return {
+        'content': state.get('original_content'),
+        'edm_type': state.get('edm_type', '소개형'),
+        'company_logo_light': state.get('company_logo_light'),
+        'company_logo_dark': state.get('company_logo_dark'),
+        'partner_logo': state.get('partner_logo'),
+        'cta_url': state.get('cta_url', '#'),
+        'sessions': state.get('sessions'),
+        'theme_color': state.get('bg_main_color', '#667eea'),
+        'bg_image_path': state.get('bg_image_path'),
+        'event_info': state.get('event_info_dict'),
+        'features_data': state.get('features_data'),
+        'layout_option': state.get('layout_option', '자동'),
+        'bg_svg_code': state.get('bg_svg_code'),
+        'expected_effects': state.get('expected_effects', ''),
+        'material_summary': state.get('material_summary', ''),
+        'footer_info': state.get('footer_info'),
+        'prepared_sections': state.get('prepared_sections')
+    }
+
+def apply_korean_content_edit(state, edited_content):
+    """수정된 콘텐츠를 원본(original_content)으로 저장하고 한국어 EDM을 다시 렌더링
+    
+    번역/전체 언어 번역은 항상 original_content에서 시작하므로, 한국어·다국어 어느 쪽에서
+    수정하든 이 함수로 원본을 갱신합니다. 이전 전체 언어 번역 결과는 폐기합니다.
+    
+    Returns:
+        다시 렌더링한 한국어 HTML
+    """
+    state['original_content'] = edited_content
+    html_content = create_improved_html_edm(**build_edm_render_kwargs(state))
+    state['html_content'] = html_content
+    state.pop('all_translations', None)
+    return html_content
+
+def translate_edm_model(render_kwargs, target_language, previous_segments=None, usage=None):
+    """구조화 콘텐츠 모델을 필드 단위로 번역한 뒤 같은 템플릿으로 다시 렌더링 (HTML 파싱 없음)
+    
+    Args:
+        render_kwargs: build_edm_render_kwargs 결과
+        target_language: 대상 언어 코드
+        previous_segments: 이전 번역본의 {원문 해시: 번역문} (같은 언어)
+        usage: 토큰 사용량을 누적할 딕셔너리 (선택)
+    
+    Returns:
+        (번역된 HTML, {원문 해시: 번역문})
+    """
+    translations = dict(previous_segments or {})
+    translated_html = create_improved_html_edm(
+        **render_kwargs, target_language=target_language,
+        translations=translations, translation_usage=usage
+    )
+    return translated_html, translations
+
+def apply_translated_content_edit(state, edited_content):
+    """다국어 EDM 수정 반영: 한국어 원본을 먼저 갱신한 뒤 같은 언어로 증분 번역
+    
+    번역본만 고치면 이후 번역/전체 언어 번역에서 수정이 사라지므로,
+    항상 original_content를 거쳐 번역본을 다시 만듭니다.
+    
+    Returns:
+        다시 번역한 HTML
+    """
+    apply_korean_content_edit(state, edited_content)
+    translated_html, translated_segments = translate_edm_model(
+        build_edm_render_kwargs(state), state.get('translated_language', 'en'), state.get('translated_segments')
+    )
+    state['translated_html'] = translated_html
+    state['translated_segments'] = translated_segments
+    return translated_html
+
+def translate_edm_all_languages(html_content, languages=None, render_kwargs=None):
+    """한국어 EDM을 여러 언어로 동시 번역 (언어별 번역 병렬 실행)
+    
+    render_kwargs가 주어지면 언어별로 구조화 모델을 번역해 다시 렌더링하고,
+    없으면 HTML에서 세그먼트를 한 번만 추출해 언어별 번역을 적용합니다.
+    
+    Returns:
+        {언어 코드: {'html', 'seconds', 'usage', 'cost', 'segments'}} - 실패한 언어는 제외
+    """
+    languages = [lang for lang in (languages or TRANSLATION_LANGUAGES) if lang in TRANSLATION_LANGUAGES]
+    if not languages:
+        return {}
+    
+    if render_kwargs is not None:
+        def render_language(lang):
+            usage = {}
+            started_at = time.perf_counter()
+            translated_html, translations = translate_edm_model(render_kwargs, lang, usage=usage)
+            return translated_html, translations, usage, time.perf_counter() - started_at
+        
+        scheduler = TaskScheduler(max_workers=len(languages))
+        for lang in languages:
+            scheduler.add(lang, lambda lang=lang: render_language(lang), timeout=600)
+        results = scheduler.run()
+        
+        outputs = {}
+        for lang in languages:
+            if not results.get(lang):
+                print(f"전체 번역 실패: {lang}")
+                continue
+            translated_html, translations, usage, seconds = results[lang]
+            outputs[lang] = {
+                'html': translated_html,
+                'seconds': seconds,
+                'usage': usage,
+                'cost': estimate_usage_cost(usage, "translate_long"),
+                'segments': len(translations)
+            }
+        return outputs
+    
+    # 번역 세그먼트는 한 번만 추출
+    soup = parse_edm_html(html_content)
+    segments, _ = extract_translation_segments(soup)
+    
+    def translate_language(lang):
+        usage = {}
+        started_at = time.perf_counter()
+        translations = dict(zip(segments, translate_batch(segments, lang, usage=usage)))
+        return translations, usage, time.perf_counter() - started_at
+    
+    scheduler = TaskScheduler(max_workers=len(languages))
+    for lang in languages:
+        scheduler.add(lang, lambda lang=lang: translate_language(lang), timeout=600)
+    results = scheduler.run()
+    
+    outputs = {}
+    for lang in languages:
+        if not results.get(lang):
+            print(f"전체 번역 실패: {lang}")
+            continue
+        
+        translations, usage, seconds = results[lang]
+        try:
+            # 번역 결과 적용 (API 호출 없음)
+            lang_soup = parse_edm_html(html_content)
+            translated_html = translate_edm_soup(lang_soup, lang, translations)
+        except Exception as e:
+            print(f"번역 적용 오류 ({lang}): {str(e)}")
+            continue
+        
+        outputs[lang] = {
+            'html': translated_html,
+            'seconds': seconds,
+            'usage': usage,
+            'cost': estimate_usage_cost(usage, "translate_long"),
+            'segments': len(segments)
+        }
+    
+    return outputs
+
+def build_translation_zip(korean_html, translated_outputs, edm_type="default"):
+    """한국어 + 번역본 HTML을 zip 파일(bytes)로 묶기"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(f"edm_{edm_type}_ko.html", korean_html)
+        for lang, output in translated_outputs.items():
+            zf.writestr(f"edm_{edm_type}_{lang}.html", output['html'])
+    return buffer.getvalue()
+
 def create_ai_edit_prompt(original_content, edit_request, target_language="ko"):
     """AI 수정 요청을 위한 프롬프트 생성"""
     language_prompts = {
@@ -3098,6 +5338,9 @@ Return the modified content in JSON format:
     
     return language_prompts.get(target_language, language_prompts["ko"])
 
+# AI 수정 대상 필드 표시 이름
+EDIT_FIELD_LABELS = {'title': '제목', 'highlight': '하이라이트', 'body': '본문', 'closing': '마무리', 'cta': 'CTA'}
+
 def apply_ai_edits(content, edit_request, target_language="ko"):
     """AI를 사용하여 EDM 내용 수정 - 요청된 부분만 수정"""
     try:
@@ -3127,13 +5370,12 @@ def apply_ai_edits(content, edit_request, target_language="ko"):
         current_parts = []
         for field in fields_to_edit:
             if field in content and content[field]:
-                field_name = {'title': '제목', 'highlight': '하이라이트', 'body': '본문', 
-                             'closing': '마무리', 'cta': 'CTA'}[field]
-                current_parts.append(f"{field_name}: {content[field]}")
+                current_parts.append(f"{EDIT_FIELD_LABELS[field]}: {content[field]}")
         
         current_content = "\n".join(current_parts)
         
         # 개선된 프롬프트 - 요청된 부분만 수정하도록 명시
+        json_format = ",\n".join(f'    "{field}": "수정된 {EDIT_FIELD_LABELS[field]}"' for field in fields_to_edit)
         prompt = f"""다음은 현재 EDM의 일부 내용입니다:
 
 {current_content}
@@ -3144,62 +5386,31 @@ def apply_ai_edits(content, edit_request, target_language="ko"):
 
 수정된 내용을 다음 JSON 형식으로만 응답해주세요:
 {{
-    "modified_fields": ["수정된_필드명들"],
-    "title": "수정된 제목 (제목 수정 요청시만)",
-    "highlight": "수정된 하이라이트 (하이라이트 수정 요청시만)",
-    "body": "수정된 본문 (본문 수정 요청시만)",
-    "closing": "수정된 마무리 (마무리 수정 요청시만)",
-    "cta": "수정된 CTA (CTA 수정 요청시만)"
-}}
-
-수정하지 않은 필드는 JSON에서 제외하세요."""
+{json_format}
+}}"""
         
-        response = safe_openai_call(
-            messages=[
+        # 수정 대상 필드만 필수로 하는 스키마로 요청, 잘못된 필드만 재요청
+        edited_data, invalid_fields = request_structured_json(
+            [
                 {"role": "system", "content": "당신은 전문 마케팅 카피라이터입니다. 사용자의 요청에 따라 EDM의 특정 부분만 정확히 수정합니다. 요청되지 않은 부분은 절대 변경하지 않습니다."},
                 {"role": "user", "content": prompt}
             ],
-            model="gpt-4",
+            "edm_edit", string_fields_schema(fields_to_edit),
+            task="edit",
             temperature=0.7,
             max_tokens=1500
         )
         
-        if not response:
+        if not edited_data:
             st.error("AI 수정 요청 처리에 실패했습니다.")
-            return content, []
-        
-        result = response.choices[0].message.content.strip()
-        
-        # JSON 파싱
-        try:
-            # JSON 블록 추출
-            if "```json" in result:
-                json_start = result.find("```json") + 7
-                json_end = result.find("```", json_start)
-                json_str = result[json_start:json_end].strip()
-            elif "{" in result and "}" in result:
-                json_start = result.find("{")
-                json_end = result.rfind("}") + 1
-                json_str = result[json_start:json_end]
-            else:
-                json_str = result
-            
-            edited_data = json.loads(json_str)
-            
-            # 기존 내용 복사
-            updated_content = content.copy()
-            
-            # 수정된 필드만 업데이트
-            modified_fields = edited_data.get('modified_fields', [])
-            for field in ['title', 'highlight', 'body', 'closing', 'cta']:
-                if field in edited_data and edited_data[field] and edited_data[field].strip():
-                    updated_content[field] = edited_data[field]
-            
-            return updated_content
-            
-        except json.JSONDecodeError as e:
-            print(f"JSON 파싱 실패: {str(e)}, 원본 내용 유지")
             return content
+        if invalid_fields:
+            print(f"AI 수정 응답에서 유효하지 않은 필드 (원본 유지): {invalid_fields}")
+        
+        # 기존 내용 복사 후 수정된 필드만 업데이트
+        updated_content = content.copy()
+        updated_content.update(edited_data)
+        return updated_content
             
     except Exception as e:
         print(f"AI 수정 오류: {str(e)}")
@@ -3223,9 +5434,8 @@ def main():
     </div>
     """, unsafe_allow_html=True)
     
-
-    
-
+    # OpenAI 연결 상태 (연결 확인은 백그라운드에서 수행되어 화면 표시를 지연시키지 않음)
+    render_openai_status_badge()
     
     # 2열 레이아웃
     col1, col2 = st.columns([1, 1])
@@ -3375,7 +5585,7 @@ def main():
                 with col_cta:
                     cta = st.text_input("버튼 문구", "신청하기")
                 
-                info = f"초청의 글: {invitation_text}\n세션 제목들: {[s['title'] for s in sessions if s['title']]}"
+                info = build_edm_info(edm_type, invitation_text, sessions=sessions)
                 cta_url = event_url
                 
                 if invitation_text:
@@ -3519,7 +5729,7 @@ def main():
                 with col_cta:
                     cta = st.text_input("버튼 문구", "문의하기")
                 
-                info = f"{desc}\n기능들: {[f['feature_name'] for f in valid_features]}\n기대효과: {expected_effects}"
+                info = build_edm_info(edm_type, desc, features_data=valid_features, expected_effects=expected_effects)
                 cta_url = product_url
                 
                 if desc:
@@ -3551,24 +5761,27 @@ def main():
                 if st.checkbox("추상", key="bg_shapes"):
                     bg_elements.append("abstract glowing shapes")
             
+            banner_mode_options = list(BANNER_MODES)
+            banner_mode = st.radio(
+                "배너 생성 방식",
+                banner_mode_options,
+                index=banner_mode_options.index(DEFAULT_BANNER_MODE) if DEFAULT_BANNER_MODE in BANNER_MODES else 0,
+                format_func=BANNER_MODES.get,
+                horizontal=True,
+                key="banner_mode"
+            )
+            banner_seed_value = 0
+            if banner_mode == "procedural":
+                banner_seed_value = int(st.number_input("배너 시드 (값을 바꾸면 다른 배치)", min_value=0, step=1,
+                                                        value=0, key="banner_seed"))
+            
             # 실시간 미리보기
             if bg_elements:
                 st.markdown("**🎨 배경 효과 미리보기**")
-                selected_effects = []
-                for element in bg_elements:
-                    if "gradient" in element.lower():
-                        selected_effects.append("gradient")
-                    elif "sparkles" in element.lower():
-                        selected_effects.append("sparkles")
-                    elif "bokeh" in element.lower():
-                        selected_effects.append("bokeh")
-                    elif "lines" in element.lower():
-                        selected_effects.append("lines")
-                    elif "abstract" in element.lower():
-                        selected_effects.append("abstract")
+                selected_effects = normalize_bg_effects(bg_elements)
                 
-                # 미리보기 SVG 생성 (기본 템플릿 사용)
-                preview_svg = generate_fallback_svg(bg_main_color, f"{bg_main_color}aa", selected_effects)
+                # 미리보기 SVG 생성 (즉시 생성 방식은 실제 배너와 동일)
+                preview_svg = generate_fallback_svg(bg_main_color, f"{bg_main_color}aa", selected_effects, banner_seed_value)
                 
                 # 미리보기 표시
                 st.markdown(f"""
@@ -3589,8 +5802,8 @@ def main():
         with st.expander("🏷️ 5단계: 로고 설정", expanded=True):
             
             # 기본 웅진IT 로고 URL 설정
-            company_logo_light_url = "https://raw.githubusercontent.com/Gina-cloud/edm-generator/main/woongjinit_logo1.png"  # 어두운 배경용 (밝은 로고)
-            company_logo_dark_url = "https://raw.githubusercontent.com/Gina-cloud/edm-generator/main/woongjinit_logo2.png"   # 밝은 배경용 (어두운 로고)
+            company_logo_light_url = DEFAULT_COMPANY_LOGO_LIGHT_URL  # 어두운 배경용 (밝은 로고)
+            company_logo_dark_url = DEFAULT_COMPANY_LOGO_DARK_URL   # 밝은 배경용 (어두운 로고)
             
             st.markdown("**회사 로고 (웅진IT 기본 설정)**")
             st.info("✅ 웅진IT 로고가 자동으로 설정되어 배경에 따라 최적의 로고가 선택됩니다.")
@@ -3685,7 +5898,28 @@ def main():
         
         # 생성 버튼
         st.markdown("---")
+        st.checkbox("🔄 저장된 AI 결과를 사용하지 않고 새로 생성", key="bypass_llm_cache",
+                    help="같은 입력으로 다시 생성할 때 캐시된 응답(기능 설명, 기대효과, 배너, PDF 분석) 대신 새 결과를 요청합니다.")
         generate_btn = st.button("🚀 AI EDM 생성하기", use_container_width=True, type="primary")
+        
+        llm_cache_stats = get_llm_cache().site_stats()
+        if llm_cache_stats:
+            with st.expander("📊 AI 응답 캐시 현황"):
+                total_hits = sum(row["hits"] for row in llm_cache_stats)
+                total_calls = total_hits + sum(row["misses"] for row in llm_cache_stats)
+                st.caption(f"적중률 {total_hits / total_calls:.0%} ({total_hits}/{total_calls}회 재사용)")
+                st.dataframe(llm_cache_stats, use_container_width=True)
+        
+        route_summary = get_route_metrics().summary()
+        if route_summary:
+            with st.expander("⏱️ 작업별 AI 모델 호출 지표"):
+                st.caption("작업별 평균 지연 시간과 예상 비용 (EDM_MODEL_ROUTES로 모델 라우팅 조정)")
+                st.dataframe(route_summary, use_container_width=True)
+        
+        banner_pool_stats = get_banner_pool().pool_stats()
+        if banner_pool_stats["served"] or banner_pool_stats["generated_inline"]:
+            st.caption(f"🎨 배너 풀: 즉시 제공 {banner_pool_stats['served']}회 / 직접 생성 "
+                       f"{banner_pool_stats['generated_inline']}회 / 준비된 조합 {banner_pool_stats['keys']}개")
     
     with col2:
         st.markdown('<div class="section-header"><h2>👀 EDM 미리보기</h2></div>', unsafe_allow_html=True)
@@ -3718,6 +5952,9 @@ def main():
                 }
             </style>
             """, unsafe_allow_html=True)
+            
+            # 생성 중 단계별 미리보기 영역 (섹션이 준비될 때마다 갱신)
+            progressive_preview = st.empty()
         
         if 'html_content' in st.session_state and st.session_state.html_content:
             # 한국어 EDM 미리보기 창
@@ -3744,8 +5981,20 @@ def main():
             if translate_btn:
                 with st.spinner("번역 중..."):
                     try:
-                        translated_html = translate_edm_content(st.session_state.html_content, translate_language)
+                        previous_segments = (st.session_state.get('translated_segments')
+                                             if st.session_state.get('translated_language') == translate_language else None)
+                        render_kwargs = build_edm_render_kwargs(st.session_state)
+                        if render_kwargs:
+                            # 구조화 콘텐츠를 번역해 다시 렌더링 (한국어 EDM과 같은 구조)
+                            translated_html, translated_segments = translate_edm_model(
+                                render_kwargs, translate_language, previous_segments
+                            )
+                        else:
+                            translated_html, translated_segments = translate_edm_incremental(
+                                st.session_state.html_content, translate_language, previous_segments
+                            )
                         st.session_state.translated_html = translated_html
+                        st.session_state.translated_segments = translated_segments
                         st.session_state.translated_language = translate_language
                         st.session_state.show_multilang_preview = True
 
@@ -3754,6 +6003,51 @@ def main():
                     except Exception as e:
                         st.error(f"번역 중 오류가 발생했습니다: {str(e)}")
             
+            # 전체 언어 동시 번역
+            st.markdown("#### 🌐 전체 언어 번역")
+            fanout_languages = st.multiselect(
+                "번역할 언어들",
+                list(TRANSLATION_LANGUAGES),
+                default=list(TRANSLATION_LANGUAGES),
+                format_func=lambda x: {"en": "English", "ja": "일본어", "zh": "중국어", 
+                                      "es": "스페인어", "fr": "프랑스어", "ms": "말레이시아어"}[x],
+                key="fanout_languages"
+            )
+            
+            if st.button("선택한 언어 모두 번역하기", key="translate_all_btn", use_container_width=True) and fanout_languages:
+                with st.spinner(f"{len(fanout_languages)}개 언어로 동시 번역 중..."):
+                    started_at = time.perf_counter()
+                    st.session_state.all_translations = translate_edm_all_languages(
+                        st.session_state.html_content, fanout_languages,
+                        render_kwargs=build_edm_render_kwargs(st.session_state)
+                    )
+                    st.session_state.all_translations_seconds = time.perf_counter() - started_at
+            
+            if st.session_state.get('all_translations'):
+                all_translations = st.session_state.all_translations
+                st.dataframe([
+                    {
+                        "언어": lang,
+                        "소요 시간(초)": round(output['seconds'], 1),
+                        "요청 수": output['usage'].get('requests', 0),
+                        "토큰(입력/출력)": f"{output['usage'].get('prompt_tokens', 0)}/{output['usage'].get('completion_tokens', 0)}",
+                        "예상 비용(USD)": round(output['cost'], 4)
+                    }
+                    for lang, output in all_translations.items()
+                ], use_container_width=True)
+                st.caption(f"전체 소요 시간: {st.session_state.get('all_translations_seconds', 0):.1f}초 · "
+                           f"총 예상 비용: ${sum(o['cost'] for o in all_translations.values()):.4f}")
+                
+                st.download_button(
+                    "📦 전체 언어 HTML 다운로드 (zip)",
+                    build_translation_zip(st.session_state.html_content, all_translations,
+                                          st.session_state.get('edm_type', 'default')),
+                    file_name=f"edm_{st.session_state.get('edm_type', 'default')}_all_languages.zip",
+                    mime="application/zip",
+                    use_container_width=True,
+                    key="download_all_languages"
+                )
+            
             # AI 수정 요청 프롬프트 입력창
             st.markdown("#### ⚙️ AI 수정 요청")
             korean_edit_request = st.text_area(
@@ -3769,32 +6063,9 @@ def main():
                         if 'original_content' in st.session_state:
                             edited_content = apply_ai_edits(st.session_state.original_content, korean_edit_request, "ko")
                             
-                            # 수정된 HTML 생성
-                            edited_html = create_improved_html_edm(
-                                edited_content, 
-                                st.session_state.get('edm_type', '소개형'),
-                                st.session_state.get('company_logo_light'),
-                                st.session_state.get('company_logo_dark'),
-                                st.session_state.get('partner_logo'),
-                                st.session_state.get('cta_url', '#'),
-                                st.session_state.get('sessions'),
-                                st.session_state.get('bg_main_color', '#667eea'),
-                                st.session_state.get('bg_image_path'),
-                                st.session_state.get('event_info_dict'),
-                                st.session_state.get('features_data'),
-                                st.session_state.get('layout_option', 'auto'),
-                                st.session_state.get('bg_svg_code'),
-                                st.session_state.get('expected_effects', ''),
-                                "ko",
-                                st.session_state.get('material_summary', ''),
-                                st.session_state.get('footer_info')
-                            )
-                            
-                            # 수정된 내용으로 업데이트
-                            st.session_state.html_content = edited_html
-                            st.session_state.original_content = edited_content
+                            # 수정된 내용으로 원본/한국어 HTML 갱신 (저장된 기능/기대효과 섹션 재사용, AI 재생성 없음)
+                            apply_korean_content_edit(st.session_state, edited_content)
                             
-
                             st.rerun()
                             
                     except Exception as e:
@@ -3840,34 +6111,10 @@ def main():
                         if 'original_content' in st.session_state:
                             edited_content = apply_ai_edits(st.session_state.original_content, korean_edit_request, "ko")
                             
-                            # 수정된 HTML 생성 후 번역
-                            edited_html = create_improved_html_edm(
-                                edited_content, 
-                                st.session_state.get('edm_type', '소개형'),
-                                st.session_state.get('company_logo_light'),
-                                st.session_state.get('company_logo_dark'),
-                                st.session_state.get('partner_logo'),
-                                st.session_state.get('cta_url', '#'),
-                                st.session_state.get('sessions'),
-                                st.session_state.get('bg_main_color', "#002df4"),
-                                st.session_state.get('bg_image_path'),
-                                st.session_state.get('event_info_dict'),
-                                st.session_state.get('features_data'),
-                                st.session_state.get('layout_option', 'auto'),
-                                st.session_state.get('bg_svg_code'),
-                                st.session_state.get('expected_effects', ''),
-                                "ko",
-                                st.session_state.get('material_summary', ''),
-                                st.session_state.get('footer_info')
-                            )
-                            
-                            # 수정된 HTML을 번역
-                            translated_edited_html = translate_edm_content(edited_html, st.session_state.get('translated_language', 'en'))
-                            
-                            # 번역된 수정 내용으로 업데이트
-                            st.session_state.translated_html = translated_edited_html
+                            # 수정 내용을 한국어 원본에 반영한 뒤, 갱신된 원본을 번역해 다시 렌더링
+                            # (바뀐 필드만 번역, 나머지는 이전 번역본 재사용)
+                            apply_translated_content_edit(st.session_state, edited_content)
                             
-
                             st.rerun()
                             
                     except Exception as e:
@@ -3927,16 +6174,9 @@ def main():
                 material_summary = st.session_state.get('material_summary', '')
                 structured_pdf_content = st.session_state.get('structured_pdf_content', None)
                 
-                # 콘텐츠 생성
-                content = generate_edm_content(edm_data, material_summary, structured_pdf_content)
-                
-                # session_state에 원본 콘텐츠 저장 (AI 수정용)
-                st.session_state.original_content = content
-                st.session_state.edm_type = edm_type
-                
                 # 배경 이미지 처리
                 bg_image_path = None
-                bg_svg_code = None
+                banner_args = None
                 
                 if uploaded_bg:
                     bg_path = f"images/uploaded_bg_{uploaded_bg.name}"
@@ -3945,18 +6185,10 @@ def main():
                     bg_image_path = bg_path
                 else:
                     # 배경 효과에 따른 톤 결정
-                    if bg_elements:
-                        if "sparkles" in str(bg_elements) or "bokeh-style dots" in str(bg_elements):
-                            tone = "bright and fresh"
-                        elif "soft lines" in str(bg_elements) or "abstract glowing shapes" in str(bg_elements):
-                            tone = "tech-inspired"
-                        else:
-                            tone = "clean and professional"
-                    else:
-                        tone = "clean and professional"
+                    tone = select_banner_tone(bg_elements)
                     
                     color1, color2 = bg_main_color, f"{bg_main_color}aa"
-                    bg_svg_code = generate_enhanced_banner_svg(tone, color1, color2, bg_elements)
+                    banner_args = (tone, color1, color2, bg_elements, banner_mode, banner_seed_value)
                 
                 # 초청형 행사 정보 준비
                 event_info_dict = None
@@ -3973,6 +6205,30 @@ def main():
                 if edm_type == "소개형" and hasattr(st.session_state, 'features_data'):
                     features_data = st.session_state.features_data
                 
+                # 준비된 섹션부터 미리보기에 채워 넣기 (제목/본문은 스트리밍)
+                def render_progressive_preview(partial_content, partial_svg_code, partial_sections):
+                    preview_html = create_improved_html_edm(
+                        partial_content, edm_type, company_logo_light, company_logo_dark, partner_logo, cta_url,
+                        sessions if edm_type == "초청형" else None,
+                        bg_main_color, bg_image_path, event_info_dict, features_data, layout_option, partial_svg_code,
+                        expected_effects if edm_type == "소개형" else "", "ko", material_summary, footer_info,
+                        prepared_sections=partial_sections, memoize=False  # 부분 제목/배너마다 메모 항목이 쌓이지 않도록
+                    )
+                    with progressive_preview.container():
+                        st.components.v1.html(preview_html, height=600, scrolling=True)
+                
+                # 콘텐츠, 배너, 기능/기대효과 향상을 병렬 생성
+                content, bg_svg_code, prepared_sections, generation_trace = generate_edm_assets(
+                    edm_data, material_summary, structured_pdf_content,
+                    features_data, expected_effects if edm_type == "소개형" else "", banner_args,
+                    on_progress=render_progressive_preview
+                )
+                st.session_state.generation_trace = generation_trace
+                
+                # session_state에 원본 콘텐츠 저장 (AI 수정용)
+                st.session_state.original_content = content
+                st.session_state.edm_type = edm_type
+                
                 # session_state에 모든 설정 저장 (AI 수정 및 번역용)
                 st.session_state.company_logo_light = company_logo_light
                 st.session_state.company_logo_dark = company_logo_dark
@@ -3982,17 +6238,21 @@ def main():
                 st.session_state.bg_main_color = bg_main_color
                 st.session_state.bg_image_path = bg_image_path
                 st.session_state.features_data = features_data
+                st.session_state.event_info_dict = event_info_dict
                 st.session_state.layout_option = layout_option
                 st.session_state.bg_svg_code = bg_svg_code
                 st.session_state.expected_effects = expected_effects if edm_type == "소개형" else ""
                 st.session_state.footer_info = footer_info
+                st.session_state.prepared_sections = prepared_sections
+                st.session_state.pop('translated_segments', None)
                 
                 # HTML EDM 생성 (최종 개선된 함수 사용)
                 html_content = create_improved_html_edm(
                     content, edm_type, company_logo_light, company_logo_dark, partner_logo, cta_url,
                     sessions if edm_type == "초청형" else None,
                     bg_main_color, bg_image_path, event_info_dict, features_data, layout_option, bg_svg_code,
-                    expected_effects if edm_type == "소개형" else "", target_language, material_summary, footer_info
+                    expected_effects if edm_type == "소개형" else "", target_language, material_summary, footer_info,
+                    prepared_sections=prepared_sections
                 )
                 
                 # 로고 선택 결과 디버깅 정보 (개발 모드에서만 표시)
@@ -4008,9 +6268,13 @@ def main():
                         else:
                             st.write(f"- 배경 유형: 기본 그라데이션")
                             st.write(f"- 테마 컬러: {bg_main_color}")
+                    
+                    with st.expander("⏱️ 생성 작업 실행 기록"):
+                        st.dataframe(generation_trace, use_container_width=True)
                 
                 # session_state에 HTML 저장 (상시 미리보기용)
                 st.session_state.html_content = html_content
+                st.session_state.pop('all_translations', None)
                 
                 # EDM 생성 완료 - 로딩 스피너 제거
                 st.session_state.edm_generating = False
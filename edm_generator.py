@@ -0,0 +1,211 @@
+"""e-DM 일괄 생성 CLI (Streamlit UI 없이 실행)
+
+사용법:
+    python -m edm_generator batch manifest.jsonl --out dist/ --workers 4
+    python -m edm_generator batch manifest.csv --out dist/ --workers 4
+
+매니페스트 각 행은 UI 입력과 같은 구조를 가집니다 (CSV는 중첩 값을 JSON 문자열로 작성):
+    {
+        "id": "seoul-it-manager",
+        "edm_data": {"edm_type": "소개형", "core": "...", "target": "...", "title_suggestion": "", "cta": "문의하기"},
+        "desc": "제품/서비스 설명 (소개형) 또는 초청의 글 (초청형)",
+        "features_data": [{"icon_keyword": "실시간", "feature_name": "...", "feature_desc": "..."}],
+        "expected_effects": "재고 관리 효율화\\n운영비용 절감",
+        "sessions": [{"time": "14:00-15:00", "title": "...", "speaker": "..."}],
+        "event_info_dict": {"date": "...", "location": "...", "target": "...", "host": "..."},
+        "footer_info": {"company_name": "...", "address": "...", "website": "...", "contact": "..."},
+        "cta_url": "https://...",
+        "bg_main_color": "#354F9B",
+        "bg_elements": ["gradient", "sparkles"],
+        "banner_mode": "procedural",
+        "banner_seed": 0,
+        "layout_option": "자동",
+        "material_summary": ""
+    }
+
+완료된 행은 <out>/progress.jsonl에 기록되며, 다시 실행하면 이미 완료된 행은 건너뜁니다.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# app 모듈을 Streamlit UI 없이 불러오기 (오류 시 st.stop 대신 예외 발생)
+os.environ.setdefault("EDM_HEADLESS", "1")
+
+import app  # noqa: E402
+
+# CSV에서 JSON 문자열로 전달되는 열
+JSON_COLUMNS = ("edm_data", "features_data", "sessions", "event_info_dict", "footer_info", "bg_elements")
+EDM_DATA_COLUMNS = ("edm_type", "core", "target", "title_suggestion", "info", "cta")
+
+
+def load_manifest(path):
+    """JSONL/CSV 매니페스트를 행 딕셔너리 리스트로 로드"""
+    rows = []
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            for row in csv.DictReader(f):
+                row = {key: value for key, value in row.items() if key and value not in (None, "")}
+                for column in JSON_COLUMNS:
+                    if isinstance(row.get(column), str):
+                        row[column] = json.loads(row[column])
+                rows.append(row)
+    else:
+        with open(path, encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rows.append(json.loads(line))
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{path}:{line_no} JSON 파싱 실패: {e}")
+
+    for index, row in enumerate(rows, 1):
+        row.setdefault("id", f"row-{index:05d}")
+        # CSV의 평면 열(edm_type, core, ...)을 edm_data로 묶기
+        edm_data = dict(row.get("edm_data") or {})
+        for column in EDM_DATA_COLUMNS:
+            if column in row and column not in edm_data:
+                edm_data[column] = row[column]
+        row["edm_data"] = edm_data
+    return rows
+
+
+def load_progress(out_dir):
+    """이미 완료된 행 ID 집합"""
+    completed = set()
+    progress_path = os.path.join(out_dir, "progress.jsonl")
+    if not os.path.exists(progress_path):
+        return completed
+    with open(progress_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("status") == "ok" and os.path.exists(os.path.join(out_dir, record.get("file", ""))):
+                completed.add(record["id"])
+    return completed
+
+
+def generate_row(row, out_dir):
+    """매니페스트 한 행으로 EDM HTML 생성 후 파일로 저장"""
+    edm_data = dict(row["edm_data"])
+    edm_type = edm_data.get("edm_type", "소개형")
+    edm_data["edm_type"] = edm_type
+
+    if not (edm_data.get("core") or "").strip():
+        raise ValueError("edm_data.core (핵심 메시지)가 비어 있습니다.")
+
+    features_data = row.get("features_data") if edm_type == "소개형" else None
+    expected_effects = row.get("expected_effects", "") if edm_type == "소개형" else ""
+    sessions = row.get("sessions") if edm_type == "초청형" else None
+    event_info_dict = row.get("event_info_dict") if edm_type == "초청형" else None
+
+    if "info" not in edm_data:
+        valid_features = [f for f in features_data or [] if f.get("feature_name", "").strip()]
+        edm_data["info"] = app.build_edm_info(edm_type, row.get("desc", ""), sessions=sessions,
+                                              features_data=valid_features, expected_effects=expected_effects)
+
+    bg_main_color = row.get("bg_main_color", "#354F9B")
+    bg_elements = row.get("bg_elements") or []
+    bg_image_path = row.get("bg_image_path")
+    banner_args = None
+    if not bg_image_path:
+        banner_args = (app.select_banner_tone(bg_elements), bg_main_color, f"{bg_main_color}aa", bg_elements,
+                       row.get("banner_mode", app.DEFAULT_BANNER_MODE), int(row.get("banner_seed", 0)))
+
+    material_summary = row.get("material_summary", "")
+    content, bg_svg_code, prepared_sections, _ = app.generate_edm_assets(
+        edm_data, material_summary, row.get("structured_pdf_content"),
+        features_data, expected_effects, banner_args
+    )
+
+    html_content = app.create_improved_html_edm(
+        content, edm_type,
+        row.get("company_logo_light", app.DEFAULT_COMPANY_LOGO_LIGHT_URL),
+        row.get("company_logo_dark", app.DEFAULT_COMPANY_LOGO_DARK_URL),
+        row.get("partner_logo"),
+        row.get("cta_url", "#"),
+        sessions, bg_main_color, bg_image_path, event_info_dict, features_data,
+        row.get("layout_option", "자동"), bg_svg_code, expected_effects,
+        row.get("target_language", "ko"), material_summary, row.get("footer_info"),
+        prepared_sections=prepared_sections
+    )
+
+    file_name = f"{row['id']}.html"
+    with open(os.path.join(out_dir, file_name), "w", encoding="utf-8") as f:
+        f.write(html_content)
+    return file_name
+
+
+def run_batch(manifest, out_dir, workers=4, force=False):
+    """매니페스트 전체를 워커 풀로 생성 (완료된 행은 건너뜀). 실패한 행 수 반환"""
+    os.makedirs(out_dir, exist_ok=True)
+    rows = load_manifest(manifest)
+
+    ids = [row["id"] for row in rows]
+    duplicates = {row_id for row_id in ids if ids.count(row_id) > 1}
+    if duplicates:
+        raise ValueError(f"중복된 행 ID: {sorted(duplicates)}")
+
+    completed = set() if force else load_progress(out_dir)
+    todo = [row for row in rows if row["id"] not in completed]
+    print(f"전체 {len(rows)}행 / 완료 {len(rows) - len(todo)}행 건너뜀 / 생성 {len(todo)}행 (워커 {workers}개)")
+
+    progress_lock = threading.Lock()
+    progress_path = os.path.join(out_dir, "progress.jsonl")
+    failures = 0
+
+    def process(row):
+        started_at = time.perf_counter()
+        try:
+            file_name = generate_row(row, out_dir)
+            return {"id": row["id"], "status": "ok", "file": file_name,
+                    "seconds": round(time.perf_counter() - started_at, 2)}
+        except Exception as e:
+            return {"id": row["id"], "status": "error", "error": str(e),
+                    "seconds": round(time.perf_counter() - started_at, 2)}
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = [executor.submit(process, row) for row in todo]
+        for done_count, future in enumerate(as_completed(futures), 1):
+            record = future.result()
+            with progress_lock:
+                with open(progress_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            if record["status"] == "ok":
+                print(f"[{done_count}/{len(todo)}] ✅ {record['id']} ({record['seconds']}초)")
+            else:
+                failures += 1
+                print(f"[{done_count}/{len(todo)}] ❌ {record['id']}: {record['error']}")
+
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="edm_generator", description="AI 기반 e-DM 일괄 생성")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    batch_parser = subparsers.add_parser("batch", help="CSV/JSONL 매니페스트로 EDM 일괄 생성")
+    batch_parser.add_argument("manifest", help="매니페스트 파일 경로 (.jsonl 또는 .csv)")
+    batch_parser.add_argument("--out", required=True, help="HTML 출력 디렉터리")
+    batch_parser.add_argument("--workers", type=int, default=4, help="동시에 생성할 행 수 (기본값: 4)")
+    batch_parser.add_argument("--force", action="store_true", help="완료 기록을 무시하고 모든 행을 다시 생성")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "batch":
+        failures = run_batch(args.manifest, args.out, args.workers, args.force)
+        return 1 if failures else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
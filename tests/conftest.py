@@ -0,0 +1,48 @@
+import os
+import sys
+import tempfile
+
+# app 모듈을 Streamlit UI/API 키 없이 불러오기
+os.environ.setdefault("EDM_HEADLESS", "1")
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.setdefault("EDM_CACHE_DIR", tempfile.mkdtemp(prefix="edm_cache_"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+import app  # noqa: E402
+
+
+@pytest.fixture
+def fake_translate(monkeypatch):
+    """번역 API 대신 [언어]원문 형식으로 번역하고 요청한 세그먼트를 기록"""
+    requested = []
+
+    def translate_batch(texts, target_language, max_retries=2, usage=None):
+        texts = list(texts)
+        requested.append(texts)
+        if usage is not None:
+            usage["requests"] = usage.get("requests", 0) + 1
+        return [f"[{target_language}]{text}" for text in texts]
+
+    monkeypatch.setattr(app, "translate_batch", translate_batch)
+    return requested
+
+
+@pytest.fixture
+def state():
+    """EDM 생성 직후 session_state에 저장되는 구조화 콘텐츠 모델"""
+    state = {
+        "original_content": {"title": "스마트 재고 관리", "highlight": "지금 시작하세요", "body": "첫 줄\n둘째 줄",
+                             "closing": "감사합니다", "cta": "문의하기"},
+        "edm_type": "초청형",
+        "cta_url": "#",
+        "sessions": [{"time": "14:00-15:00", "title": "기조연설", "speaker": "홍길동"}],
+        "bg_main_color": "#354F9B",
+        "event_info_dict": {"date": "2025.07.07", "location": "문봉교실", "target": "IT 담당자", "host": "웅진"},
+        "footer_info": {"company_name": "㈜웅진", "address": "서울 중구", "website": "www.woongjin.com",
+                        "contact": "02-2250-1000"},
+        "prepared_sections": {"feature_items": [], "effects_list": []},
+    }
+    state["html_content"] = app.create_improved_html_edm(**app.build_edm_render_kwargs(state))
+    return state
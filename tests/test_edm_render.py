@@ -0,0 +1,70 @@
+import app
+
+
+def test_korean_edit_reuses_prepared_sections(state, monkeypatch):
+    state["edm_type"] = "소개형"
+    state["features_data"] = [{"icon_keyword": "실시간", "feature_name": "실시간 재고", "feature_desc": "입력 설명"}]
+    state["expected_effects"] = "재고 효율"
+    state["prepared_sections"] = {
+        "feature_items": [{"icon": "clock-fill", "name": "실시간 재고", "desc": "AI가 다듬은 설명"}],
+        "effects_list": ["**재고 효율**: 회전율 향상"],
+    }
+
+    # 섹션 메모가 비어 있어도(LRU에서 제거됨) 기능/기대효과를 다시 생성하지 않아야 함
+    monkeypatch.setattr(app, "get_section_memo", app.SectionMemo)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("prepared_sections가 있는데 섹션을 다시 생성함")
+
+    monkeypatch.setattr(app, "generate_sections", fail)
+
+    html_content = app.apply_korean_content_edit(state, dict(state["original_content"], title="새 제목"))
+
+    assert "새 제목" in html_content
+    assert "AI가 다듬은 설명" in html_content
+    assert "회전율 향상" in html_content
+
+
+def test_preview_render_skips_section_memo(state, monkeypatch):
+    memo = app.SectionMemo()
+    monkeypatch.setattr(app, "get_section_memo", lambda: memo)
+    kwargs = app.build_edm_render_kwargs(state)
+
+    for partial_title in ("스", "스마트", "스마트 재고"):
+        app.create_improved_html_edm(**dict(kwargs, content={"title": partial_title}), memoize=False)
+    assert len(memo._entries) == 0
+
+    app.create_improved_html_edm(**kwargs)
+    assert len(memo._entries) > 0
+
+
+PAYLOAD = "<script>alert(1)</script>\"'"
+
+
+def test_every_text_slot_is_autoescaped(state):
+    state["original_content"] = {field: f"{field}{PAYLOAD}" for field in app.EDM_CONTENT_FIELDS}
+    state["cta_url"] = f"#{PAYLOAD}"
+    state["bg_main_color"] = f"#354F9B{PAYLOAD}"
+    state["sessions"] = [{"time": f"time{PAYLOAD}", "title": f"session{PAYLOAD}", "speaker": f"speaker{PAYLOAD}"}]
+    state["event_info_dict"] = {key: f"{key}{PAYLOAD}" for key in ("date", "location", "target", "host")}
+    state["footer_info"] = {key: f"{key}{PAYLOAD}" for key in ("company_name", "address", "website", "contact")}
+    state["prepared_sections"] = {
+        "feature_items": [{"icon": f"gear{PAYLOAD}", "name": f"name{PAYLOAD}", "desc": f"desc{PAYLOAD}"}],
+        "effects_list": [f"**effect{PAYLOAD}**: detail{PAYLOAD}", f"plain{PAYLOAD}"],
+    }
+
+    for edm_type in ("초청형", "소개형"):
+        state["edm_type"] = edm_type
+        html_content = app.create_improved_html_edm(**app.build_edm_render_kwargs(state))
+
+        assert "<script>alert(1)" not in html_content
+        assert "\"'" not in html_content
+        assert html_content.count("<script") == 1  # 템플릿 자체의 반응형 스크립트만 존재
+        assert "&lt;script&gt;alert(1)&lt;/script&gt;" in html_content
+
+
+def test_body_line_breaks_are_kept_after_escaping(state):
+    state["original_content"] = dict(state["original_content"], body="첫 줄 <b>굵게</b>\n둘째 줄")
+    html_content = app.create_improved_html_edm(**app.build_edm_render_kwargs(state))
+
+    assert "첫 줄 &lt;b&gt;굵게&lt;/b&gt;<br>둘째 줄" in html_content
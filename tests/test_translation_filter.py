@@ -0,0 +1,33 @@
+import pytest
+
+import app
+
+
+@pytest.mark.parametrize("text", [
+    "Opening Remarks", "Coffee Break", "Keynote", "Networking", "Lunch",
+    "Data Analytics Platform", "Digital Transformation", "Real-time Inventory Management", "Hello",
+    "Get Started Now", "Learn More", "Contact Us", "Book a demo today", "SmartStock Pro", "PM",
+])
+@pytest.mark.parametrize("target_language", ["ja", "es"])
+def test_latin_copy_is_translated(text, target_language):
+    assert app.needs_translation(text, target_language)
+
+
+@pytest.mark.parametrize("text", [
+    "14:00-15:00", "2025.07.07", "02-2250-1000", "Tel. 02-2250-1000", "www.woongjin.com",
+    "https://example.com/a?b=1", "info@woongjin.com", "㈜웅진", "Woongjin", "📈", "3PM",
+])
+def test_non_linguistic_segments_are_skipped(text):
+    assert not app.needs_translation(text, "ja")
+
+
+def test_korean_is_always_translated():
+    assert app.needs_translation("기조연설", "en")
+    assert app.needs_translation("홍길동", "en")
+
+
+def test_text_already_in_target_language_is_skipped():
+    assert not app.needs_translation("Manage your inventory with ease", "en")
+    assert app.needs_translation("Manage your inventory with ease", "fr")
+    assert not app.needs_translation("リアルタイム在庫", "ja")
+    assert app.needs_translation("在庫管理", "en")
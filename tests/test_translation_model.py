@@ -0,0 +1,70 @@
+import pytest
+
+import app
+
+
+def test_translated_edit_updates_korean_source(state, fake_translate):
+    state["translated_language"] = "en"
+    state["translated_html"], state["translated_segments"] = app.translate_edm_model(
+        app.build_edm_render_kwargs(state), "en"
+    )
+
+    edited = dict(state["original_content"], title="AI 재고 혁신")
+    translated_html = app.apply_translated_content_edit(state, edited)
+
+    assert state["original_content"]["title"] == "AI 재고 혁신"
+    assert "AI 재고 혁신" in state["html_content"]
+    assert "[en]AI 재고 혁신" in translated_html
+    # 바뀐 필드만 다시 번역
+    assert fake_translate[-1] == ["AI 재고 혁신"]
+
+
+def test_translate_all_keeps_translated_side_edit(state, fake_translate):
+    state["translated_language"] = "en"
+    state["translated_html"], state["translated_segments"] = app.translate_edm_model(
+        app.build_edm_render_kwargs(state), "en"
+    )
+    app.apply_translated_content_edit(state, dict(state["original_content"], title="AI 재고 혁신"))
+
+    outputs = app.translate_edm_all_languages(
+        state["html_content"], ["ja", "fr"], render_kwargs=app.build_edm_render_kwargs(state)
+    )
+
+    assert set(outputs) == {"ja", "fr"}
+    for lang, output in outputs.items():
+        assert f"[{lang}]AI 재고 혁신" in output["html"]
+        assert "스마트 재고 관리" not in output["html"]
+
+
+def test_translated_edm_has_same_structure_as_korean(state, fake_translate):
+    translated_html, _ = app.translate_edm_model(app.build_edm_render_kwargs(state), "en")
+
+    assert "Session Schedule" in translated_html
+    assert "[en]기조연설" in translated_html
+    assert translated_html.count("<tr") == state["html_content"].count("<tr")
+    assert translated_html.count("<div") == state["html_content"].count("<div")
+
+
+def test_translation_cost_prices_each_route_with_its_model(monkeypatch):
+    from types import SimpleNamespace
+
+    def fake_call(messages, task=None, **kwargs):
+        # 일괄 번역은 세그먼트를 빠뜨려 개별 번역(translate_short)으로 대체되도록 함
+        content = "{}" if task == "translate_long" else "Cost test segment"
+        tokens = (100, 50) if task == "translate_long" else (10, 5)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(prompt_tokens=tokens[0], completion_tokens=tokens[1]),
+        )
+
+    monkeypatch.setattr(app, "safe_openai_call", fake_call)
+    usage = {}
+    assert app.translate_batch(["비용 계산 테스트 세그먼트"], "en", usage=usage) == ["Cost test segment"]
+
+    routes = usage["routes"]
+    assert routes["translate_long"]["requests"] == 3
+    assert routes["translate_short"]["requests"] == 1
+    expected = (app.estimate_cost(app.get_model_route("translate_long")["model"], routes["translate_long"])
+                + app.estimate_cost(app.get_model_route("translate_short")["model"], routes["translate_short"]))
+    assert app.estimate_usage_cost(usage, "translate_long") == pytest.approx(expected)
+    assert usage["requests"] == 4